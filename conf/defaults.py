@@ -18,6 +18,73 @@ CATALOGS = {
     "ASSET_INDEX": "stac-assets",
 }
 
+# Search each catalog concurrently when more than one is configured.
+# A catalog may set its own TIMEOUT and ELASTICSEARCH_CONNECTION.
+FEDERATED_SEARCH = False
+FEDERATED_SEARCH_TIMEOUT = 10
+
+# Seconds to cache the index mappings used to type queryables and filters
+MAPPING_CACHE_TTL = 600
+
+# Seconds to cache facet counts for a search, shared by every page, and to
+# wait for the collection facets of a search before leaving them out
+FACET_CACHE_TTL = 300
+FACET_TIMEOUT = 10
+
+# Item sort order when a search has no sortby or free text query. Index
+# sorting the item indexes to match lets these searches terminate early.
+DEFAULT_SORTBY = ["-datetime"]
+
+# geo_point field aggregated by the /grid endpoint, filled from the bbox when
+# items are written. Grid aggregations over the spatial.bbox geo_shape need a
+# licensed cluster.
+GRID_FIELD = "centroid"
+GRID_MAX_CELLS = 10000
+GRID_CACHE_TTL = 300
+
+# Seconds to cache /histogram buckets per filter and interval
+HISTOGRAM_CACHE_TTL = 300
+
+# Most assets embedded in an item. Items with more link to the paged
+# /collection/{collection_id}/items/{item_id}/assets listing instead.
+MAX_EMBEDDED_ASSETS = 1000
+
+# Directory mirroring the STAC schemas as <host>/<path>, so transactions
+# validate without fetching them. Other schemas are only fetched over https
+# from STAC_SCHEMA_HOSTS, and failures retried after SCHEMA_FAILURE_CACHE_TTL
+# seconds. The item and collection schemas reference the GeoJSON schemas on
+# geojson.org. Collections found when validating items are remembered for
+# COLLECTION_EXISTS_CACHE_TTL seconds.
+STAC_SCHEMA_DIR = None
+STAC_SCHEMA_HOSTS = ["schemas.stacspec.org", "stac-extensions.github.io", "geojson.org"]
+SCHEMA_FAILURE_CACHE_TTL = 60
+COLLECTION_EXISTS_CACHE_TTL = 300
+
+# Search bboxes with range filters on the numeric bbox_* fields rather than a
+# geo_shape query. Existing documents need the fields, see
+# scripts/backfill_bbox_fields.py
+BBOX_FIELDS = False
+
+# Fields searched by free text, q=. Indexes created from the current mappings
+# copy every text property into search_text, which is much cheaper to search
+# than properties.*. Older indexes need migrating, see scripts/migrate_index.py,
+# or can search ["properties.*"] instead
+FREE_TEXT_FIELDS = ["search_text"]
+FREE_TEXT_MIN_PREFIX = 3
+
+# Route assets to shards by collection_id. Existing assets must be reindexed,
+# see scripts/backfill_asset_collection_id.py --routing
+ASSET_ROUTING = False
+
+# Requests with this token in an X-Profile header or profile query parameter
+# are profiled. Stacks are written to PROFILING_OUTPUT_DIR, or returned in
+# place of the response body when it is None.
+PROFILING_TOKEN = None
+PROFILING_OUTPUT_DIR = None
+PROFILING_INTERVAL = 0.005
+
+# Threads shared by federated searches and facet aggregations
+SEARCH_MAX_WORKERS = 10
 
 STAC_DESCRIPTION = "STAC API Elasticsearch"
 STAC_TITLE = "STAC API Elasticsearch"
@@ -25,6 +92,27 @@ STAC_TITLE = "STAC API Elasticsearch"
 APP_HOST = os.environ.get("APP_HOST", "0.0.0.0")
 APP_PORT = int(os.environ.get("APP_PORT", 8080))
 
+# Warm workers up on startup, before /_mgmt/ready reports them ready. Requests
+# are read from WARMUP_FILE, a JSON lines request log, or a default set is sent.
+# WARMUP_CONNECTIONS defaults to SEARCH_MAX_WORKERS.
+WARMUP = True
+WARMUP_FILE = None
+WARMUP_CONNECTIONS = None
+
+# Production server, see stac_fastapi/elasticsearch/server.py. SERVER_WORKERS
+# defaults to the number of CPUs. SERVER_LOOP and SERVER_HTTP of "auto" use
+# uvloop and httptools when installed.
+SERVER_WORKERS = None
+SERVER_LOOP = "auto"
+SERVER_HTTP = "auto"
+SERVER_PRELOAD = True
+SERVER_KEEPALIVE = 5
+SERVER_BACKLOG = 2048
+SERVER_TIMEOUT = 60
+SERVER_GRACEFUL_TIMEOUT = 30
+SERVER_MAX_REQUESTS = 0
+SERVER_MAX_REQUESTS_JITTER = 0
+
 enable_response_models = True
 openapi_url = "/api"
 docs_url = "/docs"
@@ -0,0 +1,152 @@
+# encoding: utf-8
+"""
+Copy the collection id of each item onto its assets, so that asset searches
+can filter, and optionally route, on ``collection_id`` without looking up the
+item ids first.
+
+Assets are updated in place with one ``update_by_query`` per batch of items.
+Assets which already carry the right collection id are skipped, so the script
+can be re-run after new data is loaded.
+
+With ``--routing DEST`` the assets are then copied to the ``DEST`` index,
+routed by collection id, for use with ``ASSET_ROUTING = True``.
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+import argparse
+from collections import defaultdict
+
+from elasticsearch import Elasticsearch
+from elasticsearch.helpers import scan
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Backfill collection_id on assets from their items"
+    )
+    parser.add_argument(
+        "--host", help="Elasticsearch host and port", default="database:9200"
+    )
+    parser.add_argument("--item-index", default="stac-items")
+    parser.add_argument("--asset-index", default="stac-assets")
+    parser.add_argument(
+        "--batch-size",
+        type=int,
+        default=1000,
+        help="Number of item ids to update per request",
+    )
+    parser.add_argument(
+        "--requests-per-second",
+        type=float,
+        default=-1,
+        help="Throttle for the updates. -1 is unthrottled",
+    )
+    parser.add_argument(
+        "--routing",
+        metavar="DEST",
+        help="Reindex the assets into DEST, routed by collection_id",
+    )
+
+    return parser.parse_args()
+
+
+def item_collections(es, item_index, batch_size):
+    """
+    Yield batches of ``(collection_id, [item_id, ...])`` from the item index.
+    """
+    batches = defaultdict(list)
+
+    for hit in scan(
+        es,
+        index=item_index,
+        query={"query": {"exists": {"field": "collection_id"}}},
+        _source=["collection_id"],
+        size=batch_size,
+    ):
+        collection_id = hit["_source"]["collection_id"]
+        batches[collection_id].append(hit["_id"])
+
+        if len(batches[collection_id]) >= batch_size:
+            yield collection_id, batches.pop(collection_id)
+
+    yield from batches.items()
+
+
+def backfill(es, item_index, asset_index, batch_size=1000, requests_per_second=-1):
+    """
+    Set ``collection_id`` on every asset whose item belongs to a collection.
+    Returns the number of assets updated.
+    """
+    es.indices.refresh(index=f"{item_index},{asset_index}")
+    updated = 0
+
+    for collection_id, item_ids in item_collections(es, item_index, batch_size):
+        response = es.update_by_query(
+            index=asset_index,
+            body={
+                "query": {
+                    "bool": {
+                        "filter": [{"terms": {"item_id.keyword": item_ids}}],
+                        "must_not": [{"term": {"collection_id": collection_id}}],
+                    }
+                },
+                "script": {
+                    "source": "ctx._source.collection_id = params.collection_id",
+                    "lang": "painless",
+                    "params": {"collection_id": collection_id},
+                },
+            },
+            conflicts="proceed",
+            requests_per_second=requests_per_second,
+            refresh=True,
+        )
+        updated += response["updated"]
+
+    return updated
+
+
+def reindex_with_routing(es, asset_index, dest, requests_per_second=-1):
+    """
+    Copy the assets into ``dest``, routing each by its collection id.
+    """
+    return es.reindex(
+        body={
+            "source": {"index": asset_index},
+            "dest": {"index": dest},
+            "script": {
+                "source": "ctx._routing = ctx._source.collection_id",
+                "lang": "painless",
+            },
+        },
+        requests_per_second=requests_per_second,
+        refresh=True,
+    )
+
+
+def main():
+
+    args = parse_args()
+    es = Elasticsearch(args.host)
+
+    updated = backfill(
+        es,
+        args.item_index,
+        args.asset_index,
+        batch_size=args.batch_size,
+        requests_per_second=args.requests_per_second,
+    )
+    print(f"Updated {updated} assets")
+
+    if args.routing:
+        response = reindex_with_routing(
+            es, args.asset_index, args.routing, args.requests_per_second
+        )
+        print(f"Reindexed {response['total']} assets into {args.routing}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,85 @@
+# encoding: utf-8
+"""
+Copy the document id of each asset into the ``asset_id`` keyword field, which
+asset searches sort on. Sorting on ``_id`` loads it into fielddata on the heap,
+the keyword field sorts from doc values.
+
+The field is added to the index mapping, then set with one ``update_by_query``.
+Assets which already have the field are skipped, so the script can be re-run
+after new data is loaded. New assets written through the API get the field
+from their serializer.
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+import argparse
+
+from elasticsearch import Elasticsearch
+from migrate_index import wait_for_task
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="Backfill asset_id on assets")
+    parser.add_argument(
+        "--host", help="Elasticsearch host and port", default="database:9200"
+    )
+    parser.add_argument("--asset-index", default="stac-assets")
+    parser.add_argument(
+        "--requests-per-second",
+        type=float,
+        default=-1,
+        help="Throttle for the updates. -1 is unthrottled",
+    )
+
+    return parser.parse_args()
+
+
+def backfill(es, index, requests_per_second=-1):
+    """
+    Set ``asset_id`` on every asset in ``index`` without it. Returns the
+    number of assets updated.
+    """
+    es.indices.put_mapping(
+        index=index, body={"properties": {"asset_id": {"type": "keyword"}}}
+    )
+
+    response = es.update_by_query(
+        index=index,
+        body={
+            "query": {
+                "bool": {"must_not": [{"exists": {"field": "asset_id"}}]}
+            },
+            "script": {
+                "source": "ctx._source.asset_id = ctx._id",
+                "lang": "painless",
+            },
+        },
+        conflicts="proceed",
+        slices="auto",
+        requests_per_second=requests_per_second,
+        refresh=True,
+        wait_for_completion=False,
+    )
+
+    result = wait_for_task(es, response["task"]).get("response", {})
+
+    if failures := result.get("failures"):
+        raise RuntimeError(f"Backfill of {index} failed: {failures[:5]}")
+
+    return result.get("updated", 0)
+
+
+def main():
+
+    args = parse_args()
+    es = Elasticsearch(args.host)
+
+    updated = backfill(es, args.asset_index, args.requests_per_second)
+    print(f"Updated {updated} assets")
+
+
+if __name__ == "__main__":
+    main()
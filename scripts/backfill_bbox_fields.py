@@ -0,0 +1,135 @@
+# encoding: utf-8
+"""
+Fill the numeric bbox fields, ``bbox_minlon``, ``bbox_minlat``,
+``bbox_maxlon`` and ``bbox_maxlat``, on existing items and assets, so that
+bbox searches can use range filters with ``BBOX_FIELDS = True``, and the
+``centroid`` geo_point aggregated by the grid endpoint.
+
+The fields are added to the index mappings, then computed from the
+``spatial.bbox`` envelope, or the WGS84 ``bbox``, of each document with one
+``update_by_query`` per index. Documents which already have the fields are
+skipped, so the script can be re-run after new data is loaded. New documents
+written through the API get the fields from their serializer.
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+import argparse
+
+from elasticsearch import Elasticsearch
+from migrate_index import wait_for_task
+
+BBOX_FIELDS = ("bbox_minlon", "bbox_minlat", "bbox_maxlon", "bbox_maxlat")
+
+# Boxes crossing the antimeridian are unwrapped, as in Coordinates.to_fields
+# and Coordinates.centroid
+BBOX_SCRIPT = """
+double minlon; double minlat; double maxlon; double maxlat;
+def spatial = ctx._source.spatial;
+def bbox = ctx._source.bbox;
+
+if (spatial instanceof Map && spatial.bbox instanceof Map && spatial.bbox.coordinates != null) {
+    def c = spatial.bbox.coordinates;
+    minlon = c[0][0]; maxlat = c[0][1]; maxlon = c[1][0]; minlat = c[1][1];
+} else if (bbox instanceof List && (bbox.size() == 4 || bbox.size() == 6)) {
+    int d = bbox.size() / 2;
+    minlon = bbox[0]; minlat = bbox[1]; maxlon = bbox[d]; maxlat = bbox[d + 1];
+} else {
+    ctx.op = 'noop';
+    return;
+}
+
+if (minlon > maxlon) {
+    maxlon += 360;
+}
+
+ctx._source.bbox_minlon = minlon;
+ctx._source.bbox_minlat = minlat;
+ctx._source.bbox_maxlon = maxlon;
+ctx._source.bbox_maxlat = maxlat;
+
+double lon = (minlon + maxlon) / 2;
+ctx._source.centroid = ['lat': (minlat + maxlat) / 2, 'lon': lon > 180 ? lon - 360 : lon];
+"""
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Backfill the numeric bbox fields on items and assets"
+    )
+    parser.add_argument(
+        "--host", help="Elasticsearch host and port", default="database:9200"
+    )
+    parser.add_argument(
+        "--index",
+        action="append",
+        help="Index or alias to backfill, can be repeated. Defaults to "
+        "stac-items and stac-assets",
+    )
+    parser.add_argument(
+        "--requests-per-second",
+        type=float,
+        default=-1,
+        help="Throttle for the updates. -1 is unthrottled",
+    )
+
+    return parser.parse_args()
+
+
+def put_mapping(es, index):
+    es.indices.put_mapping(
+        index=index,
+        body={
+            "properties": {
+                **{field: {"type": "double"} for field in BBOX_FIELDS},
+                "centroid": {"type": "geo_point"},
+            }
+        },
+    )
+
+
+def backfill(es, index, requests_per_second=-1):
+    """
+    Set the bbox fields on every document in ``index`` without them. Returns
+    the number of documents updated.
+    """
+    put_mapping(es, index)
+
+    response = es.update_by_query(
+        index=index,
+        body={
+            "query": {
+                "bool": {"must_not": [{"exists": {"field": "centroid"}}]}
+            },
+            "script": {"source": BBOX_SCRIPT, "lang": "painless"},
+        },
+        conflicts="proceed",
+        slices="auto",
+        requests_per_second=requests_per_second,
+        refresh=True,
+        wait_for_completion=False,
+    )
+
+    result = wait_for_task(es, response["task"]).get("response", {})
+
+    if failures := result.get("failures"):
+        raise RuntimeError(f"Backfill of {index} failed: {failures[:5]}")
+
+    return result.get("updated", 0)
+
+
+def main():
+
+    args = parse_args()
+    es = Elasticsearch(args.host)
+
+    for index in args.index or ["stac-items", "stac-assets"]:
+        updated = backfill(es, index, args.requests_per_second)
+        print(f"Updated {updated} documents in {index}")
+
+
+if __name__ == "__main__":
+    main()
@@ -13,7 +13,11 @@ import json
 import os
 from pathlib import Path
 
+from backfill_asset_collection_id import backfill
+from backfill_asset_id import backfill as backfill_asset_id
+from backfill_bbox_fields import backfill as backfill_bbox
 from elasticsearch import Elasticsearch
+from migrate_index import create_index
 
 workingdir = Path(__file__).parent.absolute()
 data_dir = workingdir.parent / "stac_fastapi" / "test_data"
@@ -24,6 +28,11 @@ def parse_args():
     parser.add_argument(
         "--host", help="Elasticsearch host and port", default="database:9200"
     )
+    parser.add_argument(
+        "--index-sort",
+        action="store_true",
+        help="Sort the item index by datetime, newest first",
+    )
 
     return parser.parse_args()
 
@@ -33,14 +42,28 @@ def read_json(path, object_type):
         return json.load(reader)
 
 
-def load_mappings(path, es_host, object_types):
+# Index sorting matching the default item sort, so "latest items" searches
+# can stop after the first page of matches
+ITEM_INDEX_SORT = {
+    "sort.field": ["properties.datetime", "item_id.keyword"],
+    "sort.order": ["desc", "asc"],
+}
+
+
+def load_mappings(path, es_host, object_types, index_sort=False):
 
     for object_type in object_types:
         map = read_json(path, f"{object_type}_mapping.json")
 
+        if index_sort and object_type == "item":
+            map.setdefault("settings", {}).setdefault("index", {}).update(
+                ITEM_INDEX_SORT
+            )
+
+        # Create a versioned index behind an alias, so it can be migrated later
         index_name = f"stac-{object_type}s"
         if not es_host.indices.exists(index_name):
-            es_host.indices.create(index_name, body=map)
+            create_index(es_host, index_name, map, aliased=True)
 
 
 def load_data(path, es_host, object_types):
@@ -60,12 +83,20 @@ def main():
 
     object_types = ["asset", "item", "collection"]
     es = Elasticsearch(args.host)
-    load_mappings(os.path.join(data_dir, "mappings"), es, object_types)
+    load_mappings(
+        os.path.join(data_dir, "mappings"), es, object_types, args.index_sort
+    )
 
     
     path = os.path.join(data_dir, "collections")
     load_data(path, es, object_types)
 
+    backfill(es, "stac-items", "stac-assets")
+    backfill_asset_id(es, "stac-assets")
+
+    for index in ("stac-items", "stac-assets"):
+        backfill_bbox(es, index)
+
 
 if __name__ == "__main__":
     main()
@@ -0,0 +1,317 @@
+# encoding: utf-8
+"""
+Migrate an index to a new mapping without downtime.
+
+The app reads and writes through the index names in ``CATALOGS``. Each of
+these is an alias for a versioned physical index, e.g. ``stac-items`` points
+at ``stac-items-v2``. A migration:
+
+1. creates the next version of the index from a mapping file,
+2. copies the documents across with a sliced, throttled reindex,
+3. blocks writes to the old index and copies the documents written during
+   the first copy,
+4. checks the new index holds as many documents as the old one and
+5. moves the alias to the new index in one atomic update.
+
+Documents are copied with their versions, so the second copy only writes
+those created or updated since the first. Writes through the app fail while
+the old index is blocked, rather than being lost when the alias moves. The
+block is lifted if the migration stops before the swap, and left on the old
+index after it, so it can be read, or unblocked to roll back.
+
+The app keeps serving from the old index until the alias moves. If the counts
+do not match, the alias is left alone and the new index kept for inspection.
+An index created before aliases were used, with the same name as the alias,
+is replaced by the alias in the same atomic update.
+
+    python scripts/migrate_index.py stac-items \\
+        --mapping stac_fastapi/test_data/mappings/item_mapping.json
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+import argparse
+import json
+import re
+import sys
+import time
+
+from elasticsearch import Elasticsearch
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Reindex an alias into a new versioned index and swap the alias"
+    )
+    parser.add_argument("alias", help="Index name the app reads through, e.g. stac-items")
+    parser.add_argument(
+        "--mapping", required=True, help="JSON file with the new mappings and settings"
+    )
+    parser.add_argument(
+        "--host", help="Elasticsearch host and port", default="database:9200"
+    )
+    parser.add_argument(
+        "--slices",
+        default="auto",
+        help="Number of parallel reindex slices. Defaults to one per shard",
+    )
+    parser.add_argument(
+        "--requests-per-second",
+        type=float,
+        default=-1,
+        help="Throttle for the reindex. -1 is unthrottled",
+    )
+    parser.add_argument(
+        "--routing-field",
+        help="Route documents in the new index by this source field",
+    )
+    parser.add_argument(
+        "--delete-old",
+        action="store_true",
+        help="Delete the old index once the alias has moved",
+    )
+
+    return parser.parse_args()
+
+
+def read_mapping(path):
+    with open(path, encoding="utf-8") as reader:
+        return json.load(reader)
+
+
+def index_versions(es, alias):
+    """
+    Return the existing versions of ``alias``, oldest first.
+    """
+    pattern = re.compile(rf"^{re.escape(alias)}-v(\d+)$")
+    versions = []
+
+    for name in es.indices.get(index=f"{alias}-v*", ignore_unavailable=True):
+        if match := pattern.match(name):
+            versions.append(int(match.group(1)))
+
+    return sorted(versions)
+
+
+def next_index(es, alias):
+    """
+    Return the name of the next physical index for ``alias``.
+    """
+    versions = index_versions(es, alias)
+    return f"{alias}-v{versions[-1] + 1 if versions else 1}"
+
+
+def current_indexes(es, alias):
+    """
+    Return the physical indexes behind ``alias`` and whether ``alias`` is
+    itself a physical index rather than an alias.
+    """
+    if es.indices.exists_alias(name=alias):
+        return list(es.indices.get_alias(name=alias)), False
+
+    if es.indices.exists(index=alias):
+        return [alias], True
+
+    return [], False
+
+
+def create_index(es, alias, mapping, aliased=False):
+    """
+    Create the next version of ``alias`` from ``mapping`` and return its name.
+    With ``aliased`` the alias is added at creation, for new deployments.
+    """
+    index = next_index(es, alias)
+    body = dict(mapping)
+
+    if aliased:
+        body["aliases"] = {alias: {"is_write_index": True}}
+
+    es.indices.create(index=index, body=body)
+
+    return index
+
+
+def wait_for_task(es, task_id, poll=5):
+    """
+    Wait for a background task, printing its progress, and return its result.
+    """
+    while True:
+        task = es.tasks.get(task_id=task_id)
+        status = task["task"]["status"]
+        print(
+            f"  {status.get('created', 0) + status.get('updated', 0)}"
+            f"/{status.get('total', 0)} documents",
+            flush=True,
+        )
+
+        if task["completed"]:
+            return task
+
+        time.sleep(poll)
+
+
+def reindex(es, source, dest, slices="auto", requests_per_second=-1, routing_field=None):
+    """
+    Copy the documents of ``source`` which are new or newer than in ``dest``.
+    Replicas and refreshes are turned off on ``dest`` for the copy and
+    restored afterwards.
+    """
+    settings = es.indices.get_settings(index=dest)[dest]["settings"]["index"]
+    es.indices.put_settings(
+        index=dest, body={"index": {"refresh_interval": "-1", "number_of_replicas": 0}}
+    )
+
+    # Copied with their versions, so documents unchanged since an earlier
+    # copy are skipped as conflicts
+    body = {
+        "source": {"index": source},
+        "dest": {"index": dest, "version_type": "external"},
+        "conflicts": "proceed",
+    }
+    if routing_field:
+        body["script"] = {
+            "source": f"ctx._routing = ctx._source.{routing_field}",
+            "lang": "painless",
+        }
+
+    try:
+        response = es.reindex(
+            body=body,
+            slices=slices,
+            requests_per_second=requests_per_second,
+            wait_for_completion=False,
+        )
+        task = wait_for_task(es, response["task"])
+    finally:
+        es.indices.put_settings(
+            index=dest,
+            body={
+                "index": {
+                    "refresh_interval": settings.get("refresh_interval", "1s"),
+                    "number_of_replicas": settings.get("number_of_replicas", 1),
+                }
+            },
+        )
+
+    if failures := task.get("response", {}).get("failures"):
+        raise RuntimeError(f"Reindex of {source} failed: {failures[:5]}")
+
+    if error := task.get("error"):
+        raise RuntimeError(f"Reindex of {source} failed: {error}")
+
+
+def block_writes(es, index, blocked=True):
+    """
+    Block, or with ``blocked=False`` allow, writes to ``index``.
+    """
+    es.indices.put_settings(index=index, body={"index": {"blocks.write": blocked}})
+
+
+def verify_counts(es, source, dest):
+    """
+    Return the document counts of ``source`` and ``dest`` after refreshing.
+    """
+    es.indices.refresh(index=f"{source},{dest}")
+
+    return es.count(index=source)["count"], es.count(index=dest)["count"]
+
+
+def swap_alias(es, alias, old_indexes, new_index, replace_index=False):
+    """
+    Point ``alias`` at ``new_index`` in one atomic update. With
+    ``replace_index`` the physical index called ``alias`` is removed in the
+    same update.
+    """
+    if replace_index:
+        actions = [{"remove_index": {"index": alias}}]
+    else:
+        actions = [
+            {"remove": {"index": index, "alias": alias}} for index in old_indexes
+        ]
+
+    actions.append(
+        {"add": {"index": new_index, "alias": alias, "is_write_index": True}}
+    )
+
+    es.indices.update_aliases(body={"actions": actions})
+
+
+def migrate(
+    es,
+    alias,
+    mapping,
+    slices="auto",
+    requests_per_second=-1,
+    routing_field=None,
+    delete_old=False,
+):
+    """
+    Migrate ``alias`` to a new index with ``mapping``. Returns the new index
+    name, or None if the document counts did not match.
+    """
+    old_indexes, is_index = current_indexes(es, alias)
+    if not old_indexes:
+        return create_index(es, alias, mapping, aliased=True)
+
+    new_index = create_index(es, alias, mapping)
+    source = ",".join(old_indexes)
+    print(f"Reindexing {source} into {new_index}")
+
+    reindex(es, source, new_index, slices, requests_per_second, routing_field)
+
+    # Catch up with the writes made during the copy, with no more coming in
+    print(f"Blocking writes to {source} and copying the changes")
+    block_writes(es, source)
+
+    try:
+        reindex(es, source, new_index, slices, requests_per_second, routing_field)
+
+        source_count, dest_count = verify_counts(es, source, new_index)
+        if source_count != dest_count:
+            print(
+                f"Count mismatch: {source} has {source_count} documents, "
+                f"{new_index} has {dest_count}. {alias} has not been moved"
+            )
+            block_writes(es, source, False)
+            return None
+
+        swap_alias(es, alias, old_indexes, new_index, replace_index=is_index)
+    except Exception:
+        block_writes(es, source, False)
+        raise
+
+    print(f"{alias} now points at {new_index} ({dest_count} documents)")
+
+    if delete_old and not is_index:
+        es.indices.delete(index=source)
+        print(f"Deleted {source}")
+
+    return new_index
+
+
+def main():
+
+    args = parse_args()
+    es = Elasticsearch(args.host)
+
+    slices = args.slices if args.slices == "auto" else int(args.slices)
+
+    new_index = migrate(
+        es,
+        args.alias,
+        read_mapping(args.mapping),
+        slices=slices,
+        requests_per_second=args.requests_per_second,
+        routing_field=args.routing_field,
+        delete_old=args.delete_old,
+    )
+
+    if new_index is None:
+        sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,287 @@
+# encoding: utf-8
+"""
+Replay a request log against the API and report how each endpoint performs.
+
+The log is JSON lines of ``{"method", "path", "query", "body"}``, such as the
+workload written by ``scripts/seed_synthetic_catalogue.py``. Requests are
+sent from a pool of workers, either to the app in process or to a running
+server with ``--url``. For each endpoint the report gives the throughput,
+latency percentiles and, in process, the Elasticsearch requests made per API
+request.
+
+    python scripts/replay_requests.py workload.jsonl --concurrency 8
+    python scripts/replay_requests.py workload.jsonl --url http://localhost:8080
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+import argparse
+import contextvars
+import json
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+
+import attr
+
+# Elasticsearch requests made while handling the current API request
+current_es_calls = contextvars.ContextVar("es_calls", default=None)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Replay a request log and report latency per endpoint"
+    )
+    parser.add_argument("log", help="JSON lines file of requests to replay")
+    parser.add_argument(
+        "--url", help="Replay against a running server instead of in process"
+    )
+    parser.add_argument(
+        "--concurrency", type=int, default=4, help="Number of concurrent clients"
+    )
+    parser.add_argument(
+        "--repeat", type=int, default=1, help="Number of times to replay the log"
+    )
+    parser.add_argument(
+        "--json", action="store_true", help="Print the report as JSON"
+    )
+
+    return parser.parse_args()
+
+
+def read_log(path) -> list:
+    with open(path, encoding="utf-8") as reader:
+        return [json.loads(line) for line in reader if line.strip()]
+
+
+def percentile(values: list, fraction: float) -> float:
+    """
+    Return the nearest rank percentile of sorted ``values``.
+    """
+    if not values:
+        return 0.0
+
+    return values[min(len(values) - 1, int(fraction * len(values)))]
+
+
+@attr.s
+class EndpointStats:
+    """
+    Latencies and Elasticsearch requests for one endpoint
+    """
+
+    latencies: list = attr.ib(factory=list)
+    es_calls: list = attr.ib(factory=list)
+    errors: int = attr.ib(default=0)
+
+    def summary(self, elapsed: float) -> dict:
+        latencies = sorted(self.latencies)
+        summary = {
+            "requests": len(latencies),
+            "errors": self.errors,
+            "rps": round(len(latencies) / elapsed, 1) if elapsed else 0.0,
+            "p50_ms": round(percentile(latencies, 0.5) * 1000, 1),
+            "p95_ms": round(percentile(latencies, 0.95) * 1000, 1),
+            "p99_ms": round(percentile(latencies, 0.99) * 1000, 1),
+            "max_ms": round(latencies[-1] * 1000, 1) if latencies else 0.0,
+        }
+
+        if self.es_calls:
+            summary["es_calls"] = round(sum(self.es_calls) / len(self.es_calls), 2)
+
+        return summary
+
+
+class CountingMiddleware:
+    """
+    Count the Elasticsearch requests made for each API request. The counter
+    follows the request into the threads the endpoints run in, and into the
+    jobs they submit to the shared Elasticsearch pool.
+    """
+
+    def __init__(self, app) -> None:
+        self.app = app
+
+    async def __call__(self, scope, receive, send) -> None:
+        counter = [0]
+        token = current_es_calls.set(counter)
+
+        async def send_with_count(message):
+            if message["type"] == "http.response.start":
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-es-calls", str(counter[0]).encode())
+                ]
+            await send(message)
+
+        try:
+            await self.app(scope, receive, send_with_count)
+        finally:
+            current_es_calls.reset(token)
+
+
+def count_es_calls() -> None:
+    """
+    Patch the Elasticsearch transport to count requests against the current
+    API request.
+    """
+    from elasticsearch import Transport
+
+    perform_request = Transport.perform_request
+
+    def counted(self, *args, **kwargs):
+        if (counter := current_es_calls.get()) is not None:
+            counter[0] += 1
+        return perform_request(self, *args, **kwargs)
+
+    Transport.perform_request = counted
+
+
+def endpoint_name(routes, method: str, path: str) -> str:
+    """
+    Return the route template for a request, so requests for different ids
+    are reported together.
+    """
+    from starlette.routing import Match
+
+    scope = {"type": "http", "method": method, "path": path}
+    for route in routes:
+        if route.matches(scope)[0] == Match.FULL:
+            return f"{method} {route.path}"
+
+    return f"{method} {path}"
+
+
+@attr.s
+class Replay:
+    """
+    Send the requests in a log from a pool of workers.
+    """
+
+    client = attr.ib()
+    routes: list = attr.ib(factory=list)
+    stats: dict = attr.ib(factory=lambda: defaultdict(EndpointStats))
+    lock: threading.Lock = attr.ib(factory=threading.Lock)
+
+    def send(self, request: dict) -> None:
+        method = request.get("method", "GET").upper()
+        path = request["path"]
+
+        start = time.perf_counter()
+        try:
+            response = self.client.request(
+                method, path, params=request.get("query"), json=request.get("body")
+            )
+            failed = response.status_code >= 500
+            calls = response.headers.get("x-es-calls")
+        except Exception:
+            failed, calls = True, None
+        elapsed = time.perf_counter() - start
+
+        with self.lock:
+            stats = self.stats[endpoint_name(self.routes, method, path)]
+            stats.latencies.append(elapsed)
+            stats.errors += failed
+            if calls is not None:
+                stats.es_calls.append(int(calls))
+
+    def run(self, requests: list, concurrency: int) -> float:
+        """
+        Replay ``requests`` and return the elapsed time.
+        """
+        start = time.perf_counter()
+
+        with ThreadPoolExecutor(max_workers=concurrency) as pool:
+            list(pool.map(self.send, requests))
+
+        return time.perf_counter() - start
+
+    def report(self, elapsed: float) -> dict:
+        return {
+            "elapsed_s": round(elapsed, 2),
+            "rps": round(sum(len(s.latencies) for s in self.stats.values()) / elapsed, 1),
+            "endpoints": {
+                name: stats.summary(elapsed)
+                for name, stats in sorted(self.stats.items())
+            },
+        }
+
+
+def in_process_client():
+    """
+    Return a client for the app in this process, counting Elasticsearch
+    requests.
+    """
+    from starlette.testclient import TestClient
+
+    from stac_fastapi.elasticsearch.app import app
+
+    count_es_calls()
+
+    return TestClient(CountingMiddleware(app))
+
+
+def app_routes() -> list:
+    """
+    Return the app's routes, or none if the app can't be loaded here.
+    """
+    try:
+        from stac_fastapi.elasticsearch.app import app
+    except Exception:
+        return []
+
+    return app.routes
+
+
+def server_client(url: str):
+    """
+    Return a client for a running server.
+    """
+    import requests
+
+    session = requests.Session()
+    adapter = requests.adapters.HTTPAdapter(pool_maxsize=64)
+    session.mount("http://", adapter)
+    session.mount("https://", adapter)
+
+    class Client:
+        def request(self, method, path, **kwargs):
+            return session.request(method, url.rstrip("/") + path, **kwargs)
+
+    return Client()
+
+
+def print_report(report: dict) -> None:
+    columns = ["requests", "errors", "rps", "p50_ms", "p95_ms", "p99_ms", "max_ms", "es_calls"]
+    width = max([len(name) for name in report["endpoints"]] + [8])
+
+    print(f"{'endpoint':<{width}}  " + "  ".join(f"{c:>8}" for c in columns))
+    for name, summary in report["endpoints"].items():
+        values = [summary.get(column, "-") for column in columns]
+        print(f"{name:<{width}}  " + "  ".join(f"{v:>8}" for v in values))
+
+    print(f"\n{report['rps']} requests/s over {report['elapsed_s']}s")
+
+
+def main():
+
+    args = parse_args()
+    requests = read_log(args.log) * args.repeat
+
+    client = server_client(args.url) if args.url else in_process_client()
+
+    replay = Replay(client=client, routes=app_routes())
+    report = replay.report(replay.run(requests, args.concurrency))
+
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print_report(report)
+
+
+if __name__ == "__main__":
+    main()
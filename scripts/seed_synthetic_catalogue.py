@@ -0,0 +1,280 @@
+# encoding: utf-8
+"""
+Load a synthetic catalogue into a local Elasticsearch for load testing.
+
+Collections, items and assets are generated in the shape of the test data, in
+volumes closer to production, and bulk loaded into versioned indexes behind
+the usual aliases. With ``--workload`` a request log exercising the seeded
+catalogue is also written, ready for ``scripts/replay_requests.py``.
+
+    python scripts/seed_synthetic_catalogue.py --host localhost:9200 \\
+        --collections 20 --items 5000 --workload workload.jsonl
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+import argparse
+import hashlib
+import json
+import os
+import random
+from datetime import datetime, timedelta
+from pathlib import Path
+
+from elasticsearch import Elasticsearch
+from elasticsearch.helpers import bulk
+from migrate_index import create_index
+
+workingdir = Path(__file__).parent.absolute()
+mapping_dir = workingdir.parent / "stac_fastapi" / "test_data" / "mappings"
+
+PLATFORMS = ["sentinel5p", "sentinel3a", "faam", "landsat8", "metop-b"]
+VARIABLES = ["air_temperature", "ozone", "precipitation", "wind_speed", "humidity"]
+EXTENSIONS = {".nc": "application/netcdf", ".txt": "text/plain", ".png": "image/png"}
+START = datetime(2000, 1, 1)
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Load a synthetic catalogue into elasticsearch"
+    )
+    parser.add_argument(
+        "--host", help="Elasticsearch host and port", default="localhost:9200"
+    )
+    parser.add_argument("--collections", type=int, default=10)
+    parser.add_argument(
+        "--items", type=int, default=1000, help="Number of items per collection"
+    )
+    parser.add_argument(
+        "--assets", type=int, default=5, help="Number of assets per item"
+    )
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    parser.add_argument(
+        "--reset",
+        action="store_true",
+        help="Delete the existing stac indexes before loading",
+    )
+    parser.add_argument(
+        "--workload", help="Write a request log for the catalogue to WORKLOAD"
+    )
+    parser.add_argument(
+        "--requests",
+        type=int,
+        default=1000,
+        help="Number of requests in the workload",
+    )
+
+    return parser.parse_args()
+
+
+def doc_id(*parts) -> str:
+    return hashlib.md5("/".join(str(p) for p in parts).encode()).hexdigest()
+
+
+def generate_collection(rng, n: int) -> dict:
+    platform = rng.choice(PLATFORMS)
+    start = START + timedelta(days=rng.randrange(0, 5000))
+
+    return {
+        "_id": f"synthetic-{n:04d}",
+        "_source": {
+            "type": "collection",
+            "title": f"Synthetic {platform} collection {n}",
+            "description": f"Synthetic {platform} data for load testing",
+            "description_path": f"/synthetic/{platform}/{n}",
+            "keywords": [platform, "synthetic"],
+            "extent": {
+                "temporal": {
+                    "gte": start.isoformat(),
+                    "lte": (start + timedelta(days=3650)).isoformat(),
+                },
+            },
+            "properties": {"platform": [platform]},
+        },
+    }
+
+
+def generate_item(rng, collection: dict, n: int) -> dict:
+    collection_id = collection["_id"]
+    start = datetime.fromisoformat(collection["_source"]["extent"]["temporal"]["gte"])
+    timestamp = start + timedelta(hours=rng.randrange(0, 3650 * 24))
+    item_id = doc_id(collection_id, n)
+
+    return {
+        "_id": item_id,
+        "_source": {
+            "type": "item",
+            "item_id": item_id,
+            "collection_id": collection_id,
+            "description_path": f"{collection['_source']['description_path']}/{n}",
+            "properties": {
+                "datetime": timestamp.isoformat(),
+                "start_datetime": timestamp.isoformat(),
+                "end_datetime": (timestamp + timedelta(hours=1)).isoformat(),
+                "platform": collection["_source"]["properties"]["platform"],
+                "variable": rng.sample(VARIABLES, 2),
+                "processing_level": [f"L{rng.randrange(0, 4)}"],
+            },
+        },
+    }
+
+
+def generate_asset(rng, item: dict, n: int) -> dict:
+    extension = rng.choice(list(EXTENSIONS))
+    filename = f"{item['_id']}_{n}{extension}"
+    path = f"{item['_source']['description_path']}/{filename}"
+
+    return {
+        "_id": doc_id(item["_id"], n),
+        "_source": {
+            "type": "asset",
+            "item_id": item["_id"],
+            "collection_id": item["_source"]["collection_id"],
+            "size": rng.randrange(1024, 2**31),
+            "media_type": EXTENSIONS[extension],
+            "properties": {
+                "uri": path,
+                "filename": filename,
+                "categories": ["data"] if extension == ".nc" else ["metadata"],
+            },
+        },
+    }
+
+
+def actions(index: str, docs):
+    for doc in docs:
+        yield {"_index": index, "_id": doc["_id"], "_source": doc["_source"]}
+
+
+def create_indexes(es, reset=False):
+    for object_type in ("asset", "item", "collection"):
+        alias = f"stac-{object_type}s"
+
+        if reset:
+            es.indices.delete(index=f"{alias}*", ignore_unavailable=True)
+
+        if not es.indices.exists(index=alias):
+            with open(os.path.join(mapping_dir, f"{object_type}_mapping.json")) as reader:
+                create_index(es, alias, json.load(reader), aliased=True)
+
+
+def seed(es, rng, collections: int, items: int, assets: int) -> dict:
+    """
+    Load the catalogue and return the ids of what was loaded, for building
+    a workload.
+    """
+    loaded = {}
+    collection_docs = [generate_collection(rng, n) for n in range(collections)]
+    bulk(es, actions("stac-collections", collection_docs))
+
+    for collection in collection_docs:
+        item_docs = [generate_item(rng, collection, n) for n in range(items)]
+        asset_docs = (
+            generate_asset(rng, item, n) for item in item_docs for n in range(assets)
+        )
+
+        bulk(es, actions("stac-items", item_docs), chunk_size=1000)
+        bulk(es, actions("stac-assets", asset_docs), chunk_size=5000)
+
+        loaded[collection["_id"]] = [item["_id"] for item in item_docs]
+        print(f"Loaded {collection['_id']}: {items} items, {items * assets} assets")
+
+    es.indices.refresh(index="stac-*")
+
+    return loaded
+
+
+def workload(rng, loaded: dict, requests: int):
+    """
+    Yield a mix of requests over the seeded catalogue.
+    """
+    collection_ids = list(loaded)
+
+    def random_item():
+        collection_id = rng.choice(collection_ids)
+        return collection_id, rng.choice(loaded[collection_id])
+
+    templates = [
+        (10, lambda: {"method": "GET", "path": "/collections"}),
+        (
+            10,
+            lambda: {
+                "method": "GET",
+                "path": f"/collections/{rng.choice(collection_ids)}",
+            },
+        ),
+        (
+            20,
+            lambda: {
+                "method": "GET",
+                "path": f"/collections/{rng.choice(collection_ids)}/items",
+                "query": {"limit": 10, "page": rng.randrange(1, 5)},
+            },
+        ),
+        (
+            25,
+            lambda: {
+                "method": "GET",
+                "path": "/collections/{}/items/{}".format(*random_item()),
+            },
+        ),
+        (
+            15,
+            lambda: {
+                "method": "GET",
+                "path": "/search",
+                "query": {"collections": rng.choice(collection_ids), "limit": 20},
+            },
+        ),
+        (
+            10,
+            lambda: {
+                "method": "POST",
+                "path": "/search",
+                "body": {
+                    "limit": 20,
+                    "filter-lang": "cql-json",
+                    "filter": {
+                        "eq": [{"property": "platform"}, rng.choice(PLATFORMS)]
+                    },
+                },
+            },
+        ),
+        (
+            10,
+            lambda: {
+                "method": "GET",
+                "path": "/histogram",
+                "query": {"collections": rng.choice(collection_ids), "interval": "year"},
+            },
+        ),
+    ]
+    weights = [weight for weight, _ in templates]
+
+    for _ in range(requests):
+        _, template = rng.choices(templates, weights=weights)[0]
+        yield template()
+
+
+def main():
+
+    args = parse_args()
+    rng = random.Random(args.seed)
+    es = Elasticsearch(args.host)
+
+    create_indexes(es, args.reset)
+    loaded = seed(es, rng, args.collections, args.items, args.assets)
+
+    if args.workload:
+        with open(args.workload, "w", encoding="utf-8") as writer:
+            for request in workload(rng, loaded, args.requests):
+                writer.write(json.dumps(request) + "\n")
+
+        print(f"Wrote {args.requests} requests to {args.workload}")
+
+
+if __name__ == "__main__":
+    main()
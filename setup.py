@@ -31,6 +31,7 @@ setup(
     install_requires=[
         'attrs',
         'fastapi',
+        'fastjsonschema',
         'stac-fastapi.api',
         'stac-fastapi.types',
         'stac-fastapi.extensions',
@@ -38,12 +39,16 @@ setup(
         'elasticsearch-dsl'
     ],
     extras_require={
-        'server': ["uvicorn[standard]>=0.12.0,<0.14.0"],
+        'server': ["uvicorn[standard]>=0.12.0,<0.14.0", "gunicorn>=20.1"],
         'dev': [
             'pytest',
             'requests'
         ]
     },
     entry_points={
+        'console_scripts': [
+            'stac-fastapi-elasticsearch=stac_fastapi.elasticsearch.server:main',
+            'stac-collection-statistics=stac_fastapi.elasticsearch.statistics:main',
+        ],
     }
 )
\ No newline at end of file
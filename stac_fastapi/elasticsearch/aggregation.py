@@ -0,0 +1,128 @@
+# encoding: utf-8
+"""
+Endpoints which aggregate the items matching a search.
+
+The facet, grid and histogram endpoints take the same parameters as
+``/search``, plus a few of their own, and return an aggregation of the
+matching items instead of a page of them. :class:`AggregationClient` turns
+either kind of request into a search and builds the response around the
+aggregation, which is all each endpoint implements.
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+from typing import List, Optional, Tuple, Type
+from urllib.parse import urljoin
+
+import attr
+from elasticsearch_dsl import Search
+from stac_fastapi.types.search import BaseSearchPostRequest
+from stac_pydantic.links import Relations
+from stac_pydantic.shared import MimeTypes
+from starlette.requests import Request
+
+from stac_fastapi.elasticsearch.models import database
+
+from .utils import get_catalog, get_queryset
+
+
+@attr.s
+class AggregationClient:
+    """
+    Base client for the aggregation endpoints
+
+    Subclasses set the endpoint ``path``, the names of their own
+    ``parameters`` and implement :meth:`aggregate`.
+    """
+
+    path: str = ""
+    media_type: str = MimeTypes.json
+    parameters: Tuple[str, ...] = ()
+
+    extensions: list = attr.ib(factory=list)
+    item_table: Type[database.ElasticsearchItem] = attr.ib(
+        default=database.ElasticsearchItem
+    )
+
+    def extension_is_enabled(self, extension: str) -> bool:
+        """Check if an api extension is enabled."""
+        return any(type(ext).__name__ == extension for ext in self.extensions)
+
+    def validate(self, **params) -> dict:
+        """
+        Check the endpoint parameters, returning them with their defaults.
+        Raises a 400 for invalid values, before any query is run.
+        """
+        return params
+
+    def aggregate(self, search: Search, catalog: str, **params) -> dict:
+        """
+        Return the body of the response for the items matching ``search``.
+        """
+        raise NotImplementedError
+
+    def links(self, request: Request) -> List[dict]:
+        return [
+            {
+                "rel": Relations.root,
+                "type": MimeTypes.json,
+                "href": str(request.base_url),
+            },
+            {
+                "rel": Relations.self,
+                "type": self.media_type,
+                "href": urljoin(str(request.base_url), self.path),
+            },
+        ]
+
+    def aggregation_collection(self, request: Request, params: dict, **search) -> dict:
+        """
+        Build the response for a search
+        """
+        params = self.validate(**params)
+        catalog = get_catalog(request)
+        queryset = get_queryset(self, self.item_table, catalog=catalog, **search)
+
+        response = self.aggregate(queryset, catalog, **params)
+        response["links"] = self.links(request)
+
+        return response
+
+    def get_aggregation(
+        self,
+        request: Request,
+        collections: Optional[List[str]] = None,
+        ids: Optional[List[str]] = None,
+        **kwargs,
+    ) -> dict:
+        """Aggregate the items matching a search (GET).
+
+        Returns:
+            The aggregation of the matching items.
+        """
+        params = {name: kwargs.pop(name, None) for name in self.parameters}
+        search = {"collection_ids": collections, "item_ids": ids, **kwargs}
+
+        if "filter-lang" not in search.keys():
+            search["filter-lang"] = "cql-text"
+
+        return self.aggregation_collection(request, params, **search)
+
+    def post_aggregation(
+        self, search_request: Type[BaseSearchPostRequest], request: Request, **kwargs
+    ) -> dict:
+        """Aggregate the items matching a search (POST).
+
+        Returns:
+            The aggregation of the matching items.
+        """
+        search = search_request.dict()
+        params = {name: search.pop(name, None) for name in self.parameters}
+
+        search["item_ids"] = search.pop("ids")
+        search["collection_ids"] = search.pop("collections")
+
+        return self.aggregation_collection(request, params, **search)
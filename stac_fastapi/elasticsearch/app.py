@@ -1,6 +1,11 @@
 # encoding: utf-8
 """
+The STAC API app.
 
+The app is built on first access to ``app`` (or ``api``), rather than when
+the module is imported, and ``create_app()`` builds a fresh one. The time
+taken importing the extensions and building the app is logged and kept in
+``app.state.startup_timings``.
 """
 __author__ = "Richard Smith"
 __date__ = "11 Jun 2021"
@@ -8,84 +13,177 @@ __copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
 __license__ = "BSD - see LICENSE file in top-level package directory"
 __contact__ = "richard.d.smith@stfc.ac.uk"
 
+import logging
+import time
+
+from fastapi import FastAPI
 from stac_fastapi.api.app import StacApi
-from stac_fastapi.api.models import create_get_request_model, create_post_request_model
-from stac_fastapi.elasticsearch.asset_search import AssetSearchClient
+
 from stac_fastapi.elasticsearch.config import settings
-from stac_fastapi.elasticsearch.core import CoreCrudClient
-from stac_fastapi.elasticsearch.filters import FiltersClient
-from stac_fastapi.elasticsearch.models import database
-from stac_fastapi.elasticsearch.session import Session
-from stac_fastapi.extensions.core import (  # SortExtension,; TransactionExtension,
-    ContextExtension,
-    FieldsExtension,
-    FilterExtension,
-    PaginationExtension,
-)
-from stac_fastapi_asset_search.asset_search import AssetSearchExtension
-from stac_fastapi_asset_search.client import (
-    create_asset_search_get_request_model,
-    create_asset_search_post_request_model,
-)
-from stac_fastapi_context_collections.context_collections import (
-    ContextCollectionExtension,
-)
-from stac_fastapi_freetext.free_text import FreeTextExtension
-
-extensions = [
-    ContextExtension(),
-    FieldsExtension(),
-    # SortExtension(),
-    FilterExtension(client=FiltersClient()),
-    FreeTextExtension(),
-    ContextCollectionExtension(),
-    PaginationExtension(),
-]
-
-# Adding the asset search extension seperately as it uses the other extensions
-extensions.append(
-    AssetSearchExtension(
-        client=AssetSearchClient(
-            extensions=extensions,
-            asset_table=database.ElasticsearchAsset(
+
+logger = logging.getLogger(__name__)
+
+_api = None
+
+
+def create_api() -> StacApi:
+    """
+    Build the STAC API, with its extensions, clients and middleware.
+    """
+    started = time.perf_counter()
+
+    from stac_fastapi.api.models import (
+        create_get_request_model,
+        create_post_request_model,
+    )
+    from stac_fastapi.extensions.core import (  # TransactionExtension,
+        ContextExtension,
+        FieldsExtension,
+        FilterExtension,
+        PaginationExtension,
+        SortExtension,
+    )
+    from stac_fastapi_asset_search.asset_search import AssetSearchExtension
+    from stac_fastapi_asset_search.client import (
+        create_asset_search_get_request_model,
+        create_asset_search_post_request_model,
+    )
+    from stac_fastapi_context_collections.context_collections import (
+        ContextCollectionExtension,
+    )
+    from stac_fastapi_freetext.free_text import FreeTextExtension
+
+    from stac_fastapi.elasticsearch.asset_search import AssetSearchClient
+    from stac_fastapi.elasticsearch.core import CoreCrudClient
+    from stac_fastapi.elasticsearch.extensions.facets import FacetExtension
+    from stac_fastapi.elasticsearch.extensions.grid import GridExtension
+    from stac_fastapi.elasticsearch.extensions.histogram import HistogramExtension
+    from stac_fastapi.elasticsearch.extensions.statistics import StatisticsExtension
+    from stac_fastapi.elasticsearch.filters import FiltersClient
+    from stac_fastapi.elasticsearch.middleware import (
+        CatalogMiddleware,
+        ProfilingMiddleware,
+    )
+    from stac_fastapi.elasticsearch.models import database
+    from stac_fastapi.elasticsearch.session import Session
+    from stac_fastapi.elasticsearch.warmup import install_warmup
+
+    imported = time.perf_counter()
+
+    extensions = [
+        ContextExtension(),
+        FieldsExtension(),
+        SortExtension(),
+        FilterExtension(client=FiltersClient()),
+        FreeTextExtension(),
+        ContextCollectionExtension(),
+        PaginationExtension(),
+    ]
+
+    # Adding the asset search extension seperately as it uses the other extensions
+    extensions.append(
+        AssetSearchExtension(
+            client=AssetSearchClient(
                 extensions=extensions,
-                asset_table=database.ElasticsearchAsset(extensions=extensions),
+                asset_table=database.ElasticsearchAsset(
+                    extensions=extensions,
+                    asset_table=database.ElasticsearchAsset(extensions=extensions),
+                ),
             ),
-        ),
-        asset_search_get_request_model=create_asset_search_get_request_model(
-            extensions
-        ),
-        asset_search_post_request_model=create_asset_search_post_request_model(
-            extensions
-        ),
-        settings=settings,
+            asset_search_get_request_model=create_asset_search_get_request_model(
+                extensions
+            ),
+            asset_search_post_request_model=create_asset_search_post_request_model(
+                extensions
+            ),
+            settings=settings,
+        )
     )
-)
-
-session = Session.create_from_settings(settings)
-api = StacApi(
-    settings=settings,
-    extensions=extensions,
-    client=CoreCrudClient(
-        session=session,
+
+    extensions.append(FacetExtension(extensions=extensions))
+    extensions.append(GridExtension(extensions=extensions))
+    extensions.append(HistogramExtension(extensions=extensions))
+    extensions.append(StatisticsExtension())
+
+    session = Session.create_from_settings(settings)
+    api = StacApi(
+        settings=settings,
         extensions=extensions,
-        item_table=database.ElasticsearchItem(extensions=extensions),
-        collection_table=database.ElasticsearchCollection(extensions=extensions),
-    ),
-    pagination_extension=PaginationExtension,
-    description=settings.STAC_DESCRIPTION,
-    title=settings.STAC_TITLE,
-    search_get_request_model=create_get_request_model(extensions),
-    search_post_request_model=create_post_request_model(extensions),
-)
+        client=CoreCrudClient(
+            session=session,
+            extensions=extensions,
+            item_table=database.ElasticsearchItem(extensions=extensions),
+            collection_table=database.ElasticsearchCollection(extensions=extensions),
+        ),
+        pagination_extension=PaginationExtension,
+        description=settings.STAC_DESCRIPTION,
+        title=settings.STAC_TITLE,
+        search_get_request_model=create_get_request_model(extensions),
+        search_post_request_model=create_post_request_model(extensions),
+    )
+
+    app = api.app
+
+    # Catalog prefixed requests are resolved once, ahead of routing
+    if database.CATALOG_NAMES:
+        app.add_middleware(CatalogMiddleware, catalogs=database.CATALOG_NAMES)
+
+    # Single requests can be profiled by admins. Without a token the middleware
+    # is not installed at all.
+    if profiling_token := getattr(settings, "PROFILING_TOKEN", None):
+        app.add_middleware(
+            ProfilingMiddleware,
+            token=profiling_token,
+            output_dir=getattr(settings, "PROFILING_OUTPUT_DIR", None),
+            interval=getattr(settings, "PROFILING_INTERVAL", 0.005),
+        )
+
+    # Workers report ready on /_mgmt/ready once warmed up
+    install_warmup(
+        app,
+        enabled=getattr(settings, "WARMUP", True),
+        requests_file=getattr(settings, "WARMUP_FILE", None),
+        connections=getattr(settings, "WARMUP_CONNECTIONS", None),
+    )
+
+    app.state.startup_timings = {
+        "imports_s": round(imported - started, 3),
+        "build_s": round(time.perf_counter() - imported, 3),
+    }
+    logger.info(
+        "Imported the app in %(imports_s)ss and built it in %(build_s)ss",
+        app.state.startup_timings,
+    )
+
+    return api
+
+
+def create_app() -> FastAPI:
+    """
+    Build a new app.
+    """
+    return create_api().app
+
+
+def get_api() -> StacApi:
+    """
+    Return the module's STAC API, building it on first use.
+    """
+    global _api
+
+    if _api is None:
+        _api = create_api()
 
-app = api.app
+    return _api
 
 
-def set_sub_api(prefix):
-    app.mount(f"/{prefix}", app)
+def __getattr__(name: str):
+    # ``app`` and ``api`` are built on first access, so importing the module
+    # for its factory doesn't build an app
+    if name == "api":
+        return get_api()
 
+    if name == "app":
+        return get_api().app
 
-if len(settings.CATALOGS) > 1:
-    for catalog in settings.CATALOGS.keys():
-        set_sub_api(catalog)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
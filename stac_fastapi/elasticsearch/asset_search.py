@@ -18,7 +18,6 @@ from typing import List, Optional, Type, Union
 
 # Third-party imports
 import attr
-from elasticsearch import NotFoundError
 from fastapi import HTTPException
 from stac_fastapi.elasticsearch.context import generate_context
 from stac_fastapi.elasticsearch.models import database, serializers
@@ -30,7 +29,7 @@ from stac_fastapi_asset_search import types as asset_types
 # Stac FastAPI asset search imports
 from stac_fastapi_asset_search.client import BaseAssetSearchClient
 
-from .utils import get_queryset
+from .utils import get_catalog, get_queryset
 
 # Stac FastAPI imports
 
@@ -67,13 +66,18 @@ class AssetSearchClient(BaseAssetSearchClient):
         if "ids" in request_dict.keys():
             request_dict["asset_ids"] = request_dict.pop("ids")
 
-        assets = get_queryset(self, self.asset_table, **request_dict)
+        request = kwargs["request"]
+        assets = get_queryset(
+            self, self.asset_table, catalog=get_catalog(request), **request_dict
+        )
         result_count = assets.count()
 
+        hits = assets.execute()
+        self.asset_table.prefetch_bboxes(hits)
+
         response = []
-        request = kwargs["request"]
 
-        for asset in assets.execute():
+        for asset in hits:
             response.append(serializers.AssetSerializer.db_to_stac(asset, request))
 
         asset_collection = asset_types.AssetCollection(
@@ -123,13 +127,18 @@ class AssetSearchClient(BaseAssetSearchClient):
         if "filter-lang" not in search.keys():
             search["filter-lang"] = "cql-text"
 
-        assets = get_queryset(self, self.asset_table, **search)
+        request = kwargs["request"]
+        assets = get_queryset(
+            self, self.asset_table, catalog=get_catalog(request), **search
+        )
         result_count = assets.count()
 
+        hits = assets.execute()
+        self.asset_table.prefetch_bboxes(hits)
+
         response = []
-        request = kwargs["request"]
 
-        for asset in assets.execute():
+        for asset in hits:
             response_asset = serializers.AssetSerializer.db_to_stac(asset, request)
             response.append(response_asset)
 
@@ -161,7 +170,7 @@ class AssetSearchClient(BaseAssetSearchClient):
         """
 
         return self.get_asset_search(
-            items=[item_id], collection=collection_id, **kwargs
+            items=[item_id], collection_ids=[collection_id], **kwargs
         )
 
     def get_asset(
@@ -179,24 +188,24 @@ class AssetSearchClient(BaseAssetSearchClient):
         Returns:
             Asset.
         """
-        try:
-            asset = self.asset_table.get(id=asset_id)
-        except NotFoundError:
-            raise (
-                HTTPException(
-                    status_code=404,
-                    detail=f"Asset: {asset_id} from Item: {item_id} not found",
-                )
-            )
+        request = kwargs["request"]
 
-        if not getattr(asset, "item_id", None) == item_id:
-            raise (
-                HTTPException(
-                    status_code=404,
-                    detail=f"Asset: {asset_id} from Item: {item_id} not found",
-                )
-            )
+        assets = get_queryset(
+            self,
+            self.asset_table,
+            catalog=get_catalog(request),
+            asset_ids=[asset_id],
+            item_ids=[item_id],
+            collection_ids=[collection_id],
+            limit=1,
+        )
 
-        request = kwargs["request"]
+        for asset in assets.execute():
+            return serializers.AssetSerializer.db_to_stac(asset, request)
 
-        return serializers.AssetSerializer.db_to_stac(asset, request)
+        raise (
+            HTTPException(
+                status_code=404,
+                detail=f"Asset: {asset_id} from Item: {item_id} not found",
+            )
+        )
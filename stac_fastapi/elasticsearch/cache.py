@@ -0,0 +1,101 @@
+# encoding: utf-8
+"""
+In-process caches.
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+MISSING = object()
+
+
+class TTLCache:
+    """
+    A thread safe, least recently used cache whose entries expire after
+    ``ttl`` seconds. A ``ttl`` of None keeps entries until they are evicted.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None) -> None:
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def __contains__(self, key: Hashable) -> bool:
+        return self.get(key, MISSING) is not MISSING
+
+    def get(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Return the value for ``key`` or ``default`` if missing or expired.
+        """
+        with self._lock:
+            try:
+                expires, value = self._data[key]
+            except KeyError:
+                return default
+
+            if expires is not None and expires < time.monotonic():
+                del self._data[key]
+                return default
+
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key: Hashable, value: Any) -> None:
+        """
+        Store ``value`` under ``key``, evicting the least recently used entry
+        if the cache is full.
+        """
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+
+        with self._lock:
+            self._data[key] = (expires, value)
+            self._data.move_to_end(key)
+
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def get_or_set(self, key: Hashable, factory: Callable[[], Any]) -> Any:
+        """
+        Return the value for ``key``, calling ``factory`` to create it if missing.
+        """
+        value = self.get(key, MISSING)
+
+        if value is MISSING:
+            value = factory()
+            self.set(key, value)
+
+        return value
+
+    def pop(self, key: Hashable, default: Any = None) -> Any:
+        """
+        Remove ``key`` from the cache and return its value.
+        """
+        with self._lock:
+            _, value = self._data.pop(key, (None, default))
+            return value
+
+    def clear(self) -> None:
+        """
+        Remove every entry from the cache.
+        """
+        with self._lock:
+            self._data.clear()
+
+    def evict(self, predicate: Callable[[Hashable], bool]) -> None:
+        """
+        Remove every entry whose key matches ``predicate``.
+        """
+        with self._lock:
+            for key in [key for key in self._data if predicate(key)]:
+                del self._data[key]
@@ -0,0 +1,154 @@
+# encoding: utf-8
+"""
+Conditional GET for items, collections and collection item pages.
+
+ETags come from the ``_seq_no`` and ``_primary_term`` of the documents a
+response is built from, which change on every write. Items are validated by
+the item and its embedded assets, and pages of a collection's items by the
+hits on the page, their assets and the total count, so writes from any
+worker or from the ingest scripts change them. Clients re-polling an
+unchanged resource with ``If-None-Match`` get a ``304 Not Modified`` without
+the response being serialized.
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+import hashlib
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, Optional, Type
+
+import attr
+from dateutil.parser import parse as parse_date
+from elasticsearch_dsl import Document
+from starlette.requests import Request
+from starlette.responses import Response
+
+from stac_fastapi.elasticsearch.models.database import ElasticsearchItem
+
+
+def opaque_tag(tag: str) -> str:
+    """
+    Strip the weak prefix from an entity tag, for weak comparison.
+    """
+    tag = tag.strip()
+    return tag[2:] if tag.startswith("W/") else tag
+
+
+@attr.s(frozen=True)
+class Validators:
+    """
+    The validators of a response
+    """
+
+    etag: str = attr.ib()
+    last_modified: Optional[datetime] = attr.ib(default=None)
+
+    @classmethod
+    def from_document(
+        cls, doc: Document, *variant: str, last_modified=None
+    ) -> "Validators":
+        """
+        Build the validators of a response from the document it is read from.
+        ``variant`` separates responses built from the same document.
+        """
+        return cls.from_documents([doc], *variant, last_modified=last_modified)
+
+    @classmethod
+    def from_documents(
+        cls, docs: Iterable[Document], *variant: str, last_modified=None
+    ) -> "Validators":
+        """
+        Build the validators of a response from the documents it is read
+        from, in order. The documents must be read with their sequence
+        numbers.
+        """
+        token = ":".join(
+            str(part)
+            for doc in docs
+            for part in (
+                doc.meta.index,
+                doc.meta.id,
+                doc.meta.primary_term,
+                doc.meta.seq_no,
+            )
+        )
+        token = ":".join((token, *(str(part) for part in variant)))
+        digest = hashlib.blake2b(token.encode(), digest_size=12).hexdigest()
+
+        if last_modified:
+            if not isinstance(last_modified, datetime):
+                last_modified = parse_date(last_modified)
+
+            if last_modified.tzinfo is None:
+                last_modified = last_modified.replace(tzinfo=timezone.utc)
+
+            last_modified = last_modified.astimezone(timezone.utc)
+
+        return cls(etag=f'W/"{digest}"', last_modified=last_modified)
+
+    def headers(self) -> dict:
+        """
+        Return the validator headers
+        """
+        headers = {"ETag": self.etag}
+
+        if self.last_modified:
+            headers["Last-Modified"] = format_datetime(self.last_modified, usegmt=True)
+
+        return headers
+
+    def is_fresh(self, request: Request) -> bool:
+        """
+        Check if the client's copy is current. ``If-None-Match`` takes
+        precedence over ``If-Modified-Since``.
+        """
+        if if_none_match := request.headers.get("if-none-match"):
+            tags = {opaque_tag(tag) for tag in if_none_match.split(",")}
+            return "*" in tags or opaque_tag(self.etag) in tags
+
+        if_modified_since = request.headers.get("if-modified-since")
+        if if_modified_since and self.last_modified:
+            try:
+                since = parsedate_to_datetime(if_modified_since)
+            except (TypeError, ValueError):
+                return False
+
+            return self.last_modified.replace(microsecond=0) <= since
+
+        return False
+
+
+def item_validators(item: ElasticsearchItem) -> Validators:
+    """
+    Return the validators of an item, which cover the assets it embeds and
+    whether they were truncated.
+    """
+    return Validators.from_documents(
+        [item, *item.elasticsearch_assets],
+        item.assets_truncated,
+        last_modified=item.get_properties().get("updated"),
+    )
+
+
+def not_modified(validators: Validators) -> Response:
+    return Response(status_code=304, headers=validators.headers())
+
+
+def respond(
+    request: Request,
+    validators: Validators,
+    body: callable,
+    response_class: Type[Response],
+) -> Response:
+    """
+    Return a ``304`` if the client's copy is current. Otherwise ``body`` is
+    called to build the full response.
+    """
+    if validators.is_fresh(request):
+        return not_modified(validators)
+
+    return response_class(body(), headers=validators.headers())
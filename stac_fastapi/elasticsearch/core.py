@@ -10,6 +10,7 @@ __contact__ = "richard.d.smith@stfc.ac.uk"
 
 import json
 import logging
+import time
 
 # Python imports
 from datetime import datetime
@@ -21,7 +22,9 @@ from urllib.parse import urljoin
 # Third-party imports
 import attr
 from elasticsearch import NotFoundError
+from elasticsearch_dsl import Search
 from fastapi import HTTPException
+from stac_fastapi.api.models import GeoJSONResponse
 from stac_fastapi.types import stac as stac_types
 
 # Stac FastAPI imports
@@ -32,15 +35,20 @@ from stac_pydantic.links import Relations
 # Stac pydantic imports
 from stac_pydantic.shared import MimeTypes
 from starlette.requests import Request as StarletteRequest
+from starlette.responses import JSONResponse
 
+from stac_fastapi.elasticsearch import conditional
+from stac_fastapi.elasticsearch.config import settings
 from stac_fastapi.elasticsearch.context import generate_context
+from stac_fastapi.elasticsearch.facets import facet_service
+from stac_fastapi.elasticsearch.federation import MAX_RESULT_WINDOW, FederatedSearch
 from stac_fastapi.elasticsearch.models import database, serializers
 from stac_fastapi.elasticsearch.pagination import generate_pagination_links
 
 # Package imports
 from stac_fastapi.elasticsearch.session import Session
 
-from .utils import get_queryset
+from .utils import cacheable, get_catalog, get_queryset, get_sort, multi_search
 
 logger = logging.getLogger(__name__)
 
@@ -97,49 +105,7 @@ class CoreCrudClient(BaseCoreClient):
         request_dict["item_ids"] = request_dict.pop("ids")
         request_dict["collection_ids"] = request_dict.pop("collections")
 
-        items = get_queryset(
-            self, self.item_table, catalog=request.get("root_path"), **request_dict
-        )
-        result_count = items.count()
-
-        response = []
-
-        for item in items.execute():
-            response.append(self.item_serializer.db_to_stac(item, request))
-
-        item_collection = stac_types.ItemCollection(
-            type="FeatureCollection",
-            features=response,
-            links=generate_pagination_links(
-                request, result_count, search_request.limit
-            ),
-        )
-
-        # Modify response with extensions
-        if self.extension_is_enabled("ContextExtension"):
-            context = generate_context(
-                search_request.limit, result_count, getattr(search_request, "page", 1)
-            )
-            item_collection["context"] = context
-
-        if self.extension_is_enabled("ContextCollectionExtension"):
-            if (
-                "context_collection" in request_dict
-                and request_dict["context_collection"]
-            ):
-                context = item_collection.get("context", {})
-
-                if request_dict.get("collection_ids"):
-                    context["collections"] = request_dict["collection_ids"]
-                else:
-                    context["collections"] = [
-                        c.key for c in items.aggregations.collections
-                    ]
-
-                if context:
-                    item_collection["context"] = context
-
-        return item_collection
+        return self.search_items(request, **request_dict)
 
     def get_search(
         self,
@@ -171,48 +137,208 @@ class CoreCrudClient(BaseCoreClient):
         if "filter-lang" not in search.keys():
             search["filter-lang"] = "cql-text"
 
-        items = get_queryset(
-            self, self.item_table, catalog=request.get("root_path").strip("/"), **search
-        )
-        result_count = items.count()
+        return self.search_items(request, **search)
+
+    def search_items(
+        self, request: StarletteRequest, **search
+    ) -> stac_types.ItemCollection:
+        """Run an item search and build the response.
+
+        Shared by the GET and POST search endpoints. When federated search is
+        enabled and the request is not scoped to a catalog, each catalog is
+        searched concurrently and the response reports which ones answered.
+
+        Returns:
+            ItemCollection containing items which match the search criteria.
+        """
+        limit = search.get("limit") or 10
+        page = int(search.get("page") or 1)
+        catalog = get_catalog(request)
+
+        items = get_queryset(self, self.item_table, catalog=catalog, **search)
+        federated = None
+
+        if self.use_federated_search(catalog):
+            federated = FederatedSearch(
+                search=items,
+                table=self.item_table,
+                catalogs=database.CATALOG_NAMES,
+            )
+
+        # Collection facets run alongside the hit query and are cached
+        # across pages
+        facet_names = []
+        if (
+            self.extension_is_enabled("ContextCollectionExtension")
+            and search.get("context_collection")
+            and not search.get("collection_ids")
+        ):
+            facet_names = ["collection"]
+
+        if federated:
+            facets = [
+                facet_service.submit(
+                    federated.catalog_scope(c), facet_names, self.item_table, c
+                )
+                for c in (federated.catalogs if facet_names else [])
+            ]
+            result = federated.execute(page, limit)
+            hits = result.hits
+            result_count = result.total
+
+        else:
+            result = None
+            facets = (
+                [facet_service.request(items, facet_names, self.item_table, catalog)]
+                if facet_names
+                else []
+            )
+            hits, result_count = self.execute_page(
+                items, catalog, facets, search.get("item_ids")
+            )
+
+        self.item_table.prefetch_bboxes(hits)
 
         response = []
 
-        for item in items.execute():
+        for item in hits:
             response.append(self.item_serializer.db_to_stac(item, request))
 
-        links = generate_pagination_links(request, result_count, limit)
-
         # Create base response
         item_collection = stac_types.ItemCollection(
             type="FeatureCollection",
             features=response,
-            links=links,
+            links=generate_pagination_links(request, result_count, limit),
         )
 
         # Modify response with extensions
         if self.extension_is_enabled("ContextExtension"):
-            item_collection["context"] = generate_context(
-                limit, result_count, kwargs.get("page", 1)
-            )
+            item_collection["context"] = generate_context(limit, result_count, page)
 
         if self.extension_is_enabled("ContextCollectionExtension"):
-            if "context_collection" in search and search["context_collection"]:
+            if search.get("context_collection"):
                 context = item_collection.get("context", {})
 
                 # Short circuit if there collections specified
-                if collections:
-                    context["collections"] = collections
+                if search.get("collection_ids"):
+                    context["collections"] = search["collection_ids"]
                 else:
-                    context["collections"] = [
-                        c.key for c in items.aggregations.collections
-                    ]
+                    context["collections"] = self.facet_keys(
+                        facets,
+                        "collection",
+                        getattr(settings, "FACET_TIMEOUT", 10),
+                    )
 
                 if context:
                     item_collection["context"] = context
 
+        if result:
+            context = item_collection.get("context", {})
+            context["catalogs"] = result.catalogs_context()
+            item_collection["context"] = context
+
         return item_collection
 
+    def execute_page(
+        self,
+        items: Search,
+        catalog: str,
+        facets: list,
+        item_ids: Optional[List[str]] = None,
+    ) -> tuple:
+        """Run the queries for a page of results in one ``_msearch``.
+
+        The hits, the total and the first page of any uncached facets are
+        independent, as are the assets when the search names its items.
+        Otherwise the assets of the returned items are fetched afterwards in
+        one batched search.
+
+        Returns:
+            The hits and the number of matching items.
+        """
+        searches = {
+            # The total comes from its own query, so sorted searches can stop
+            # early on sorted indexes
+            "hits": items.extra(track_total_hits=False),
+            "count": cacheable(items.sort()[0:0].extra(track_total_hits=True)),
+        }
+
+        for facet_request in facets:
+            if facet_search := facet_request.first_page():
+                searches["facets"] = facet_search
+
+        if item_ids:
+            searches["assets"] = self.assets_search(item_ids, catalog)
+
+        responses = multi_search(
+            searches, using=self.item_table.catalog_index(catalog)["using"]
+        )
+
+        for facet_request in facets:
+            facet_request.response = responses.get("facets")
+
+        hits = responses["hits"]
+
+        if "assets" not in responses and hits:
+            responses["assets"] = self.assets_search(
+                [hit.meta.id for hit in hits], catalog
+            ).execute()
+
+        if "assets" in responses:
+            self.item_table.prefetch_assets(hits, responses["assets"])
+
+        return hits, responses["count"].hits.total.value
+
+    def assets_search(self, item_ids: List[str], catalog: str) -> Search:
+        """Batched search for the assets of a page of items.
+
+        Assets are sorted by item, and the batch holds at most one more asset
+        per item than an item embeds, so its size is bounded by the page size.
+        """
+        size = len(item_ids) * (self.item_table.max_embedded_assets + 1)
+
+        return (
+            self.item_table.assets_search(item_ids, catalog)
+            .sort(
+                {"item_id.keyword": {"order": "asc"}},
+                {database.ElasticsearchAsset.sort_tiebreaker: {"order": "asc"}},
+            )
+            .extra(track_total_hits=True)[0 : min(size, MAX_RESULT_WINDOW)]
+        )
+
+    @staticmethod
+    def facet_keys(futures: list, name: str, timeout: float = None) -> list:
+        """Collect the bucket keys of a facet from one or more facet jobs.
+
+        Catalogs whose facets fail, or don't finish within ``timeout``
+        seconds, are left out, as for federated hits.
+        """
+        keys = {}
+        deadline = time.monotonic() + timeout if timeout is not None else None
+
+        for future in futures:
+            remaining = (
+                max(deadline - time.monotonic(), 0) if deadline is not None else None
+            )
+
+            try:
+                buckets = future.result(timeout=remaining)[name]
+            except Exception as exc:
+                logger.warning("Facet %s failed: %s", name, exc)
+                continue
+
+            keys.update(dict.fromkeys(b["key"] for b in buckets))
+
+        return list(keys)
+
+    def use_federated_search(self, catalog: str) -> bool:
+        """Check if a search should be fanned out across the catalogs."""
+        return (
+            getattr(settings, "FEDERATED_SEARCH", False)
+            and not catalog
+            and len(database.CATALOG_NAMES) > 1
+        )
+
     def get_item(
         self, request: StarletteRequest, item_id: str, collection_id: str, **kwargs
     ) -> stac_types.Item:
@@ -226,8 +352,10 @@ class CoreCrudClient(BaseCoreClient):
         Returns:
             Item.
         """
+        catalog = get_catalog(request)
+
         try:
-            item = self.item_table.get(id=item_id)
+            item = self.item_table.get(id=item_id, catalog=catalog)
         except NotFoundError as exc:
             raise (
                 HTTPException(
@@ -244,7 +372,12 @@ class CoreCrudClient(BaseCoreClient):
                 )
             )
 
-        return self.item_serializer.db_to_stac(item, request)
+        return conditional.respond(
+            request,
+            conditional.item_validators(item),
+            lambda: self.item_serializer.db_to_stac(item, request),
+            GeoJSONResponse,
+        )
 
     def all_collections(self, request: StarletteRequest, **kwargs) -> dict:
         """Get all available collections.
@@ -258,7 +391,7 @@ class CoreCrudClient(BaseCoreClient):
         response = []
 
         for collection in self.collection_table.search(
-            catalog=request.get("root_path").strip("/")
+            catalog=get_catalog(request)
         ):
             response.append(
                 serializers.CollectionSerializer.db_to_stac(collection, request)
@@ -295,11 +428,29 @@ class CoreCrudClient(BaseCoreClient):
         Returns:
             Collection.
         """
+        catalog = get_catalog(request)
+
         try:
-            collection = self.collection_table.get(id=collection_id)
+            collection = self.collection_table.get(id=collection_id, catalog=catalog)
         except NotFoundError:
             raise (NotFoundError(404, f"Collection: {collection_id} not found"))
 
+        validators = conditional.Validators.from_document(
+            collection,
+            last_modified=collection.get_statistics().get("updated"),
+        )
+
+        return conditional.respond(
+            request,
+            validators,
+            lambda: self.collection_body(collection, request),
+            JSONResponse,
+        )
+
+    def collection_body(
+        self, collection: database.ElasticsearchCollection, request: StarletteRequest
+    ) -> stac_types.Collection:
+        """Serialize a collection with its links."""
         collection = serializers.CollectionSerializer.db_to_stac(collection, request)
 
         if self.extension_is_enabled("FilterExtension"):
@@ -335,18 +486,58 @@ class CoreCrudClient(BaseCoreClient):
         page = int(query_params.get("page", "1"))
         limit = int(query_params.get("limit", "10"))
 
-        items = self.item_table.search(
-            catalog=request.get("root_path").strip("/")
-        ).filter("term", collection_id=collection_id)
-        result_count = items.count()
+        catalog = get_catalog(request)
+        items = (
+            self.item_table.search(catalog=catalog)
+            .filter("term", collection_id=collection_id)
+            .sort(*get_sort(self.item_table, catalog=catalog))
+            .extra(seq_no_primary_term=True, track_total_hits=True)
+        )
 
         items = items[(page - 1) * limit : page * limit]
 
         # TODO: support filter parameter https://portal.ogc.org/files/96288#filter-param
 
+        hits = items.execute()
+        result_count = hits.hits.total.value
+
+        if hits:
+            self.item_table.prefetch_assets(
+                hits,
+                self.assets_search([hit.meta.id for hit in hits], catalog).execute(),
+            )
+
+        # The page changes when any of its items or their assets do, and when
+        # items are added or removed
+        validators = conditional.Validators.from_documents(
+            [doc for item in hits for doc in (item, *item.elasticsearch_assets)],
+            result_count,
+            request.url.query,
+        )
+
+        return conditional.respond(
+            request,
+            validators,
+            lambda: self.item_collection_body(
+                request, hits, result_count, page, limit
+            ),
+            GeoJSONResponse,
+        )
+
+    def item_collection_body(
+        self,
+        request: StarletteRequest,
+        hits: list,
+        result_count: int,
+        page: int,
+        limit: int,
+    ) -> stac_types.ItemCollection:
+        """Build a page of a collection's items."""
+        self.item_table.prefetch_bboxes(hits)
+
         response = []
 
-        for item in items:
+        for item in hits:
             response.append(self.item_serializer.db_to_stac(item, request))
 
         # Generate the base response
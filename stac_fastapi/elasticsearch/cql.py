@@ -0,0 +1,424 @@
+# encoding: utf-8
+"""
+Typed compilation of CQL filters to Elasticsearch queries.
+
+Comparisons, ``BETWEEN``, ``IN`` and null checks are compiled against the
+mapped type of each property, read from the mapping registry: numeric and
+date properties get range queries on their own field with the literal
+converted to match, booleans get term queries and null checks ``exists``
+filters. Text properties are matched on their keyword sub-field, and
+unmapped properties are assumed to be keywords.
+
+Before compiling, nested ``AND`` and ``OR`` are flattened, repeated
+predicates and double negations dropped, the ranges on one field within an
+``AND`` merged into a single range where their bounds are numbers or dates,
+and equalities on one field within an ``OR`` merged into a ``terms`` query.
+Spatial, temporal, ``LIKE`` and array predicates are compiled by
+``pygeofilter_elasticsearch``.
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+import copy
+from datetime import date, datetime, timezone
+from string import Template
+from typing import Any, Dict, List, Optional
+
+import attr
+from dateutil.parser import isoparse
+from elasticsearch_dsl import Document
+from elasticsearch_dsl.search import Q
+from fastapi import HTTPException
+from pygeofilter import ast
+
+from stac_fastapi.elasticsearch.mappings import FieldType, registry
+
+RANGE_OPERATORS = {
+    ast.LessThan: "lt",
+    ast.LessEqual: "lte",
+    ast.GreaterThan: "gt",
+    ast.GreaterEqual: "gte",
+}
+
+# The comparison to use when the literal is on the left
+FLIPPED = {
+    ast.LessThan: ast.GreaterThan,
+    ast.LessEqual: ast.GreaterEqual,
+    ast.GreaterThan: ast.LessThan,
+    ast.GreaterEqual: ast.LessEqual,
+    ast.Equal: ast.Equal,
+    ast.NotEqual: ast.NotEqual,
+}
+
+# The CQL text parser reads TRUE and FALSE as property names
+BOOLEAN_NAMES = {"true": True, "false": False}
+
+# Null checks, EXISTS is only parsed by newer pygeofilter releases
+NULL_CHECKS = tuple(
+    getattr(ast, name) for name in ("IsNull", "Exists") if hasattr(ast, name)
+)
+
+# Fields for spatial and temporal predicates compiled by pygeofilter_elasticsearch
+PREDICATE_FIELDS = {
+    "datetime": "properties.datetime",
+    "bbox": "spatial.bbox.coordinates",
+}
+
+
+def unique(nodes: list) -> list:
+    """
+    Drop repeated nodes, keeping the order. AST nodes compare by value but
+    can't be hashed.
+    """
+    kept = []
+    for node in nodes:
+        if node not in kept:
+            kept.append(node)
+
+    return kept
+
+
+def attribute(node: Any) -> Optional[str]:
+    """
+    Return the property name of an attribute node. Some parsers leave the
+    operand of a null check in a list.
+    """
+    if isinstance(node, list) and len(node) == 1:
+        node = node[0]
+
+    return node.name if isinstance(node, ast.Attribute) else None
+
+
+def table_fields(table: Document, catalog: str = None) -> Dict[str, FieldType]:
+    """
+    Return the field types of the STAC properties of ``table``, and of the
+    top level fields such as ``id`` and ``collection``.
+    """
+    fields = dict(registry.properties(table, catalog))
+    mapped = registry.fields(table, catalog)
+
+    for name, path in getattr(table, "sort_fields", {}).items():
+        if path.endswith(".keyword"):
+            base = path[: -len(".keyword")]
+            fields[name] = mapped.get(base) or FieldType(path=path, type="keyword")
+        else:
+            fields[name] = mapped.get(path) or FieldType(path=path, type="date")
+
+    return fields
+
+
+@attr.s
+class CQLCompiler:
+    """
+    Compiles a CQL AST to an Elasticsearch query
+
+    :param fields: Field types by property name
+    :param field_default: Field for properties which are not mapped
+    """
+
+    fields: Dict[str, FieldType] = attr.ib(factory=dict)
+    field_default: Template = attr.ib(default=Template("properties.${name}.keyword"))
+
+    @classmethod
+    def for_table(cls, table: Document, catalog: str = None) -> "CQLCompiler":
+        return cls(fields=table_fields(table, catalog))
+
+    def compile(self, node: ast.Node) -> Q:
+        return self.emit(node)
+
+    # Simplification
+
+    def operands(self, node: ast.Combination) -> list:
+        """
+        Return the operands of a chain of ANDs or ORs, without repeats.
+        """
+        operands = []
+        for sub_node in (node.lhs, node.rhs):
+            if isinstance(sub_node, type(node)):
+                operands.extend(self.operands(sub_node))
+            else:
+                operands.append(sub_node)
+
+        return unique(operands)
+
+    @staticmethod
+    def comparison(node: ast.Node) -> Optional[tuple]:
+        """
+        Return ``(attribute, operator, literal)`` for a comparison between a
+        property and a literal, with the property on the left.
+        """
+        if not isinstance(node, ast.Comparison):
+            return None
+
+        lhs, rhs, op = node.lhs, node.rhs, type(node)
+        if isinstance(rhs, ast.Attribute) and rhs.name.lower() in BOOLEAN_NAMES:
+            rhs = BOOLEAN_NAMES[rhs.name.lower()]
+
+        if isinstance(rhs, ast.Attribute) and not isinstance(lhs, ast.Attribute):
+            lhs, rhs, op = rhs, lhs, FLIPPED[op]
+
+        if isinstance(lhs, ast.Attribute) and not isinstance(rhs, ast.Node):
+            return lhs.name, op, rhs
+
+        return None
+
+    # Fields and values
+
+    def field(self, name: str) -> FieldType:
+        if name.startswith("properties."):
+            name = name[len("properties.") :]
+
+        if field := self.fields.get(name):
+            return field
+
+        return FieldType(path=self.field_default.substitute(name=name), type="keyword")
+
+    def value(self, field: FieldType, value: Any) -> Any:
+        """
+        Convert a literal to the type of ``field``, raising a 400 if it can't
+        be compared with it.
+        """
+        if isinstance(value, (datetime, date)):
+            return value.isoformat()
+
+        if field.is_boolean:
+            if isinstance(value, str) and value.lower() in ("true", "false"):
+                return value.lower() == "true"
+
+            if not isinstance(value, bool):
+                raise self.type_error(field, value)
+
+        elif field.is_numeric:
+            if isinstance(value, bool):
+                raise self.type_error(field, value)
+
+            if isinstance(value, str):
+                try:
+                    return float(value)
+                except ValueError:
+                    raise self.type_error(field, value)
+
+        return value
+
+    @staticmethod
+    def type_error(field: FieldType, value: Any) -> HTTPException:
+        return HTTPException(
+            status_code=400,
+            detail=f"Cannot compare {field.path}, a {field.type} field, with {value!r}",
+        )
+
+    # Emission
+
+    def emit(self, node: ast.Node) -> Q:
+        if isinstance(node, ast.And):
+            return self.emit_and(self.operands(node))
+
+        if isinstance(node, ast.Or):
+            return self.emit_or(self.operands(node))
+
+        if isinstance(node, ast.Not):
+            if isinstance(node.sub_node, ast.Not):
+                return self.emit(node.sub_node.sub_node)
+
+            # Predicates with their own negation are flipped instead
+            if isinstance(node.sub_node, (ast.Between, ast.In, *NULL_CHECKS)):
+                negated = copy.copy(node.sub_node)
+                negated.not_ = not negated.not_
+                return self.emit(negated)
+
+            return Q("bool", must_not=[self.emit(node.sub_node)])
+
+        if comparison := self.comparison(node):
+            return self.emit_comparison(*comparison)
+
+        name = attribute(getattr(node, "lhs", None))
+
+        if isinstance(node, ast.Between) and name:
+            field = self.field(name)
+            query = self.range(
+                field,
+                {"gte": self.value(field, node.low), "lte": self.value(field, node.high)},
+            )
+            return Q("bool", must_not=[query]) if node.not_ else query
+
+        if isinstance(node, ast.In) and name:
+            field = self.field(name)
+            query = self.terms(field, [self.value(field, v) for v in node.sub_nodes])
+            return Q("bool", must_not=[query]) if node.not_ else query
+
+        if isinstance(node, NULL_CHECKS) and name:
+            exists = Q("exists", field=self.field(name).path)
+            # IS NULL matches missing fields, EXISTS present ones
+            if isinstance(node, ast.IsNull) != node.not_:
+                return Q("bool", must_not=[exists])
+            return exists
+
+        return self.fallback(node)
+
+    def emit_and(self, operands: list) -> Q:
+        """
+        Emit an AND in filter context, merging the ranges on each field.
+        """
+        ranges = {}
+        queries = []
+
+        for operand in operands:
+            comparison = self.comparison(operand)
+
+            if comparison and comparison[1] in RANGE_OPERATORS:
+                name, op, literal = comparison
+                field = self.field(name)
+                value = self.value(field, literal)
+                op = RANGE_OPERATORS[op]
+
+                # Bounds which can't be merged into an existing range get their own
+                field_ranges = ranges.setdefault(field.path, (field, []))[1]
+                if not any(
+                    self.tighten(bounds, op, value, field) for bounds in field_ranges
+                ):
+                    field_ranges.append({op: value})
+            else:
+                queries.append(self.emit(operand))
+
+        queries.extend(
+            self.range(field, bounds)
+            for field, field_ranges in ranges.values()
+            for bounds in field_ranges
+        )
+
+        return queries[0] if len(queries) == 1 else Q("bool", filter=queries)
+
+    def emit_or(self, operands: list) -> Q:
+        """
+        Emit an OR, merging the equalities on each field into one terms query.
+        """
+        equals = {}
+        queries = []
+
+        for operand in operands:
+            comparison = self.comparison(operand)
+
+            if comparison and comparison[1] is ast.Equal:
+                name, _, literal = comparison
+                field = self.field(name)
+                values = equals.setdefault(field.path, (field, []))[1]
+                if (value := self.value(field, literal)) not in values:
+                    values.append(value)
+            else:
+                queries.append(self.emit(operand))
+
+        queries.extend(self.terms(field, values) for field, values in equals.values())
+
+        if len(queries) == 1:
+            return queries[0]
+
+        return Q("bool", should=queries, minimum_should_match=1)
+
+    def emit_comparison(self, name: str, op: type, literal: Any) -> Q:
+        field = self.field(name)
+        value = self.value(field, literal)
+
+        if op is ast.Equal:
+            return self.term(field, value)
+
+        if op is ast.NotEqual:
+            # Documents without the property don't match either side
+            return Q(
+                "bool",
+                filter=[Q("exists", field=field.path)],
+                must_not=[self.term(field, value)],
+            )
+
+        return self.range(field, {RANGE_OPERATORS[op]: value})
+
+    @staticmethod
+    def order_key(field: FieldType, value: Any) -> Any:
+        """
+        Return a key to order a bound by, or None if it can't be ordered.
+        Only numbers, and dates on date fields, are ordered. Strings compare
+        by their characters, which isn't the order Elasticsearch uses.
+        """
+        if isinstance(value, bool):
+            return None
+
+        if isinstance(value, (int, float)):
+            return value
+
+        if field.is_date and isinstance(value, str):
+            try:
+                parsed = isoparse(value)
+            except ValueError:
+                return None
+
+            return parsed if parsed.tzinfo else parsed.replace(tzinfo=timezone.utc)
+
+        return None
+
+    @classmethod
+    def tighten(cls, bounds: dict, op: str, value: Any, field: FieldType) -> bool:
+        """
+        Add a bound to a range, keeping the tighter of two lower or upper
+        bounds. Returns False, leaving the range alone, if the range already
+        has a bound on that side which can't be ordered against ``value``.
+        """
+        side = ("gt", "gte") if op in ("gt", "gte") else ("lt", "lte")
+        current = next(((k, bounds[k]) for k in side if k in bounds), None)
+
+        if current:
+            current_op, current_value = current
+            key = cls.order_key(field, value)
+            current_key = cls.order_key(field, current_value)
+
+            if key is None or current_key is None:
+                return False
+
+            try:
+                looser = key < current_key if op in ("gt", "gte") else key > current_key
+            except TypeError:
+                return False
+
+            if looser or (key == current_key and op in ("gte", "lte")):
+                return True
+
+            del bounds[current_op]
+
+        bounds[op] = value
+        return True
+
+    @staticmethod
+    def term(field: FieldType, value: Any) -> Q:
+        if field.type == "text" and not field.keyword:
+            return Q("match_phrase", **{field.path: value})
+
+        return Q("term", **{field.field: value})
+
+    @staticmethod
+    def terms(field: FieldType, values: List[Any]) -> Q:
+        if len(values) == 1:
+            return CQLCompiler.term(field, values[0])
+
+        return Q("terms", **{field.field: values})
+
+    @staticmethod
+    def range(field: FieldType, bounds: dict) -> Q:
+        return Q("range", **{field.field: bounds})
+
+    def fallback(self, node: ast.Node) -> Q:
+        """
+        Compile the predicates not handled here with pygeofilter_elasticsearch.
+        """
+        from pygeofilter_elasticsearch import to_filter
+
+        field_mapping = {
+            **{name: field.field for name, field in self.fields.items()},
+            **PREDICATE_FIELDS,
+        }
+
+        return to_filter(
+            node,
+            field_mapping,
+            field_default=Template("properties__${name}__keyword"),
+        )
@@ -0,0 +1,98 @@
+# encoding: utf-8
+"""
+Base for the aggregation extensions.
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+from typing import Type
+
+import attr
+from fastapi import APIRouter, FastAPI
+from pydantic import BaseModel
+from stac_fastapi.api.models import create_request_model
+from stac_fastapi.api.routes import create_async_endpoint
+from stac_fastapi.types.extension import ApiExtension
+from stac_fastapi.types.search import (
+    APIRequest,
+    BaseSearchGetRequest,
+    BaseSearchPostRequest,
+)
+
+from stac_fastapi.elasticsearch.aggregation import AggregationClient
+
+
+@attr.s
+class AggregationExtension(ApiExtension):
+    """Aggregation Extension.
+
+    Adds GET and POST endpoints at the path of the client, which take the
+    same parameters as `/search` plus those of the request mixins. Subclasses
+    set the route ``name``, the OpenAPI ``tag``, the ``client_class`` and the
+    ``get_request_mixin`` and ``post_request_mixin``.
+
+    Attributes:
+        client: Endpoint logic
+        extensions: The search extensions, used to build the request models
+    """
+
+    name: str = ""
+    tag: str = ""
+    client_class: Type[AggregationClient] = AggregationClient
+    get_request_mixin: Type[APIRequest] = APIRequest
+    post_request_mixin: Type[BaseModel] = BaseModel
+
+    client: AggregationClient = attr.ib(
+        default=attr.Factory(lambda self: self.client_class(), takes_self=True)
+    )
+    extensions: list = attr.ib(factory=list)
+    router: APIRouter = attr.ib(factory=APIRouter)
+
+    def register(self, app: FastAPI) -> None:
+        """Register the extension with a FastAPI application.
+
+        Args:
+            app: target FastAPI application.
+
+        Returns:
+            None
+        """
+        self.client.extensions = self.extensions
+
+        get_request_model = create_request_model(
+            self.get_request_mixin.__name__,
+            base_model=BaseSearchGetRequest,
+            extensions=self.extensions,
+            mixins=[self.get_request_mixin],
+        )
+        post_request_model = create_request_model(
+            self.post_request_mixin.__name__,
+            base_model=BaseSearchPostRequest,
+            extensions=self.extensions,
+            mixins=[self.post_request_mixin],
+            request_type="POST",
+        )
+
+        path = f"/{self.client.path}"
+
+        self.router.prefix = app.state.router_prefix
+        self.router.add_api_route(
+            name=self.name,
+            path=path,
+            methods=["GET"],
+            endpoint=create_async_endpoint(
+                self.client.get_aggregation, get_request_model
+            ),
+        )
+        self.router.add_api_route(
+            name=self.name,
+            path=path,
+            methods=["POST"],
+            endpoint=create_async_endpoint(
+                self.client.post_aggregation, post_request_model
+            ),
+        )
+        app.include_router(self.router, tags=[self.tag])
@@ -0,0 +1,48 @@
+# encoding: utf-8
+"""
+Facet Extension.
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+from typing import List, Optional
+
+import attr
+from pydantic import BaseModel
+from stac_fastapi.types.search import APIRequest, str2list
+
+from stac_fastapi.elasticsearch.extensions.aggregation import AggregationExtension
+from stac_fastapi.elasticsearch.facets import FacetClient
+
+
+@attr.s
+class FacetGetRequest(APIRequest):
+    """Facets parameter for GET requests."""
+
+    facets: Optional[str] = attr.ib(default=None, converter=str2list)
+
+
+class FacetPostRequest(BaseModel):
+    """Facets parameter for POST requests."""
+
+    facets: Optional[List[str]]
+
+
+@attr.s
+class FacetExtension(AggregationExtension):
+    """Facet Extension.
+
+    Adds endpoints which return the complete facet counts for a search,
+    taking the same parameters as `/search`:
+        GET /facets
+        POST /facets
+    """
+
+    name = "Facets"
+    tag = "Facet Extension"
+    client_class = FacetClient
+    get_request_mixin = FacetGetRequest
+    post_request_mixin = FacetPostRequest
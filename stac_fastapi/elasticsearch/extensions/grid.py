@@ -0,0 +1,50 @@
+# encoding: utf-8
+"""
+Grid Extension.
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+from typing import Optional
+
+import attr
+from pydantic import BaseModel
+from stac_fastapi.types.search import APIRequest
+
+from stac_fastapi.elasticsearch.extensions.aggregation import AggregationExtension
+from stac_fastapi.elasticsearch.grid import GridClient
+
+
+@attr.s
+class GridGetRequest(APIRequest):
+    """Grid parameters for GET requests."""
+
+    grid: Optional[str] = attr.ib(default=None)
+    precision: Optional[int] = attr.ib(default=None)
+
+
+class GridPostRequest(BaseModel):
+    """Grid parameters for POST requests."""
+
+    grid: Optional[str]
+    precision: Optional[int]
+
+
+@attr.s
+class GridExtension(AggregationExtension):
+    """Grid Extension.
+
+    Adds endpoints which return the number of matching items in each
+    geotile or geohash cell, taking the same parameters as `/search`:
+        GET /grid
+        POST /grid
+    """
+
+    name = "Grid"
+    tag = "Grid Extension"
+    client_class = GridClient
+    get_request_mixin = GridGetRequest
+    post_request_mixin = GridPostRequest
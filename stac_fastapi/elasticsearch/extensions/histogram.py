@@ -0,0 +1,50 @@
+# encoding: utf-8
+"""
+Histogram Extension.
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+from typing import Optional
+
+import attr
+from pydantic import BaseModel
+from stac_fastapi.types.search import APIRequest
+
+from stac_fastapi.elasticsearch.extensions.aggregation import AggregationExtension
+from stac_fastapi.elasticsearch.histogram import HistogramClient
+
+
+@attr.s
+class HistogramGetRequest(APIRequest):
+    """Histogram parameters for GET requests."""
+
+    interval: Optional[str] = attr.ib(default=None)
+    field: Optional[str] = attr.ib(default=None)
+
+
+class HistogramPostRequest(BaseModel):
+    """Histogram parameters for POST requests."""
+
+    interval: Optional[str]
+    field: Optional[str]
+
+
+@attr.s
+class HistogramExtension(AggregationExtension):
+    """Histogram Extension.
+
+    Adds endpoints which return the number of matching items in each time
+    interval, taking the same parameters as `/search`:
+        GET /histogram
+        POST /histogram
+    """
+
+    name = "Histogram"
+    tag = "Histogram Extension"
+    client_class = HistogramClient
+    get_request_mixin = HistogramGetRequest
+    post_request_mixin = HistogramPostRequest
@@ -0,0 +1,63 @@
+# encoding: utf-8
+"""
+Item Patch Extension.
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+import attr
+from fastapi import APIRouter, Body, FastAPI
+from stac_fastapi.api.models import GeoJSONResponse, ItemUri
+from stac_fastapi.api.routes import create_async_endpoint
+from stac_fastapi.types.extension import ApiExtension
+
+from stac_fastapi.elasticsearch.transactions import TransactionsClient
+
+
+@attr.s
+class ItemPatchRequest(ItemUri):
+    """JSON merge patch for an item."""
+
+    patch: dict = attr.ib(
+        default=Body(..., media_type="application/merge-patch+json")
+    )
+
+
+@attr.s
+class ItemPatchExtension(ApiExtension):
+    """Item Patch Extension.
+
+    Adds an endpoint which applies a JSON merge patch (RFC 7386) to an item,
+    only writing the assets named in the patch:
+        PATCH /collections/{collection_id}/items/{item_id}
+
+    Attributes:
+        client: Transactions logic
+    """
+
+    client: TransactionsClient = attr.ib(factory=TransactionsClient)
+    router: APIRouter = attr.ib(factory=APIRouter)
+
+    def register(self, app: FastAPI) -> None:
+        """Register the extension with a FastAPI application.
+
+        Args:
+            app: target FastAPI application.
+
+        Returns:
+            None
+        """
+        self.router.prefix = app.state.router_prefix
+        self.router.add_api_route(
+            name="Patch Item",
+            path="/collections/{collection_id}/items/{item_id}",
+            methods=["PATCH"],
+            response_class=GeoJSONResponse,
+            endpoint=create_async_endpoint(
+                self.client.patch_item, ItemPatchRequest, GeoJSONResponse
+            ),
+        )
+        app.include_router(self.router, tags=["Item Patch Extension"])
@@ -0,0 +1,53 @@
+# encoding: utf-8
+"""
+Collection Statistics Extension.
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+import attr
+from fastapi import APIRouter, FastAPI
+from stac_fastapi.api.models import CollectionUri
+from stac_fastapi.api.routes import create_async_endpoint
+from stac_fastapi.types.extension import ApiExtension
+
+from stac_fastapi.elasticsearch.statistics import StatisticsClient
+
+
+@attr.s
+class StatisticsExtension(ApiExtension):
+    """Collection Statistics Extension.
+
+    Adds an endpoint which returns the item and asset statistics stored on a
+    collection:
+        GET /collections/{collection_id}/statistics
+
+    Attributes:
+        client: Statistics endpoint logic
+    """
+
+    client: StatisticsClient = attr.ib(factory=StatisticsClient)
+    router: APIRouter = attr.ib(factory=APIRouter)
+
+    def register(self, app: FastAPI) -> None:
+        """Register the extension with a FastAPI application.
+
+        Args:
+            app: target FastAPI application.
+
+        Returns:
+            None
+        """
+        self.router.prefix = app.state.router_prefix
+        self.router.add_api_route(
+            name="Collection Statistics",
+            path="/collections/{collection_id}/statistics",
+            methods=["GET"],
+            endpoint=create_async_endpoint(
+                self.client.get_statistics, CollectionUri
+            ),
+        )
+        app.include_router(self.router, tags=["Collection Statistics Extension"])
@@ -0,0 +1,260 @@
+# encoding: utf-8
+"""
+Facet counts for a search.
+
+Facets are computed with ``size=0`` composite aggregations, separately from
+the hits, so every bucket is returned rather than the top few and the request
+can run alongside the hit query. Results are cached per normalised filter so
+paging through a search does not recompute them.
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+import json
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional
+
+import attr
+from elasticsearch_dsl import Document, Search
+from elasticsearch_dsl.response import Response
+
+from stac_fastapi.elasticsearch.aggregation import AggregationClient
+from stac_fastapi.elasticsearch.cache import TTLCache
+from stac_fastapi.elasticsearch.config import settings
+from stac_fastapi.elasticsearch.mappings import registry
+from stac_fastapi.elasticsearch.session import submit
+
+from .utils import cacheable
+
+# Facets which don't map directly to a STAC property
+FACET_FIELDS = {
+    "collection": "collection_id.keyword",
+}
+
+# Parts of the request body which don't change which documents match
+NON_FILTER_KEYS = ("from", "size", "sort", "_source", "aggs", "track_total_hits")
+
+
+def facet_field(table: Document, name: str, catalog: str = None) -> str:
+    """
+    Return the field to aggregate on for the facet ``name``.
+    """
+    if name in FACET_FIELDS:
+        return FACET_FIELDS[name]
+
+    if field := registry.properties(table, catalog).get(name):
+        return field.field
+
+    return f"properties.{name}.keyword"
+
+
+def filter_key(search: Search) -> str:
+    """
+    Return a key which is the same for every page of a search. Catalogs on
+    other clusters can use the same index names, so the connection alias is
+    part of the key.
+    """
+    body = search.to_dict()
+
+    for key in NON_FILTER_KEYS:
+        body.pop(key, None)
+
+    return json.dumps([search._using, search._index, body], sort_keys=True, default=str)
+
+
+class FacetService:
+    """
+    Computes and caches facet buckets
+
+    :param ttl: Seconds to cache the buckets for each filter
+    :param page_size: Number of buckets to request per composite page
+    :param max_buckets: Maximum number of buckets to return for a facet
+    """
+
+    def __init__(
+        self, ttl: float = 300, page_size: int = 1000, max_buckets: int = 10000
+    ) -> None:
+        self.cache = TTLCache(maxsize=1024, ttl=ttl)
+        self.page_size = page_size
+        self.max_buckets = max_buckets
+
+    def page_search(
+        self, search: Search, fields: Dict[str, str], after: Dict[str, dict]
+    ) -> Search:
+        """
+        Build the next page of composite aggregations for the facets in
+        ``after``.
+        """
+        facet_search = cacheable(search.sort()[0:0])
+
+        for name, after_key in after.items():
+            composite = {
+                "size": self.page_size,
+                "sources": [{"value": {"terms": {"field": fields[name]}}}],
+            }
+            if after_key:
+                composite["after"] = after_key
+
+            facet_search.aggs.bucket(name, "composite", **composite)
+
+        return facet_search
+
+    def collect(
+        self, response: Response, buckets: Dict[str, list], after: Dict[str, dict]
+    ) -> None:
+        """
+        Add the buckets from a page of composite aggregations, dropping
+        facets from ``after`` once they are complete.
+        """
+        for name in list(after):
+            aggregation = getattr(response.aggregations, name)
+
+            buckets[name].extend(
+                {"key": bucket.key.value, "count": bucket.doc_count}
+                for bucket in aggregation.buckets
+            )
+
+            if (
+                len(aggregation.buckets) == self.page_size
+                and len(buckets[name]) < self.max_buckets
+                and "after_key" in aggregation
+            ):
+                after[name] = aggregation.after_key.to_dict()
+            else:
+                del after[name]
+
+    def request(
+        self,
+        search: Search,
+        names: List[str],
+        table: Document,
+        catalog: str = None,
+    ) -> "FacetRequest":
+        """
+        Look up the cached facets for ``search``, returning a request for the
+        rest.
+        """
+        key = filter_key(search)
+        request = FacetRequest(service=self, search=search, key=key)
+
+        for name in names:
+            cached = self.cache.get((key, name))
+
+            if cached is None:
+                request.fields[name] = facet_field(table, name, catalog)
+            else:
+                request.facets[name] = cached
+
+        return request
+
+    def facets(
+        self,
+        search: Search,
+        names: List[str],
+        table: Document,
+        catalog: str = None,
+    ) -> Dict[str, list]:
+        """
+        Return the buckets for each of the facets ``names``.
+        """
+        return self.request(search, names, table, catalog).result()
+
+    def submit(
+        self,
+        search: Search,
+        names: List[str],
+        table: Document,
+        catalog: str = None,
+    ) -> Future:
+        """
+        Compute the facets in the background, returning a future.
+        """
+        return submit(self.facets, search, names, table, catalog)
+
+
+@attr.s
+class FacetRequest:
+    """
+    The facets of a search which are not cached. The first page of
+    aggregations can be run alongside other searches and passed in as
+    ``response``, later pages are fetched by :meth:`result`.
+    """
+
+    service: FacetService = attr.ib()
+    search: Search = attr.ib()
+    key: str = attr.ib()
+    fields: Dict[str, str] = attr.ib(factory=dict)
+    facets: Dict[str, list] = attr.ib(factory=dict)
+    response: Optional[Response] = attr.ib(default=None)
+
+    def first_page(self) -> Optional[Search]:
+        """
+        Return the search for the first page of aggregations, if any are needed.
+        """
+        if self.fields:
+            return self.service.page_search(
+                self.search, self.fields, dict.fromkeys(self.fields)
+            )
+
+    def result(self, timeout: Optional[float] = None) -> Dict[str, list]:
+        """
+        Collect every bucket, cache them and return the facets. Like
+        ``Future.result``, gives up after ``timeout`` seconds.
+        """
+        if not self.fields:
+            return self.facets
+
+        buckets = {name: [] for name in self.fields}
+        after = dict.fromkeys(self.fields)
+        deadline = time.monotonic() + timeout if timeout is not None else None
+
+        if self.response is not None:
+            self.service.collect(self.response, buckets, after)
+
+        while after:
+            page = self.service.page_search(self.search, self.fields, after)
+
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise TimeoutError(f"Facets not collected in {timeout}s")
+                page = page.params(request_timeout=remaining)
+
+            self.service.collect(page.execute(), buckets, after)
+
+        for name, facet in buckets.items():
+            self.service.cache.set((self.key, name), facet)
+
+        self.facets.update(buckets)
+        self.fields = {}
+
+        return self.facets
+
+
+facet_service = FacetService(ttl=getattr(settings, "FACET_CACHE_TTL", 300))
+
+
+@attr.s
+class FacetClient(AggregationClient):
+    """
+    Client for the facet endpoints
+    """
+
+    path = "facets"
+    parameters = ("facets",)
+
+    def aggregate(
+        self, search: Search, catalog: str, facets: Optional[List[str]] = None
+    ) -> dict:
+        """
+        Return every bucket of the requested facets, by default the collections.
+        """
+        return {
+            "facets": facet_service.facets(
+                search, facets or ["collection"], self.item_table, catalog
+            ),
+        }
@@ -0,0 +1,202 @@
+# encoding: utf-8
+"""
+Federated search across several catalogs.
+
+Each catalog is queried concurrently with its own timeout. Catalogs which
+fail or time out are reported rather than failing the whole request and the
+hits from the catalogs which answered are merged with a global sort before
+the requested page is sliced out.
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+import functools
+import logging
+from concurrent.futures import wait
+from typing import List
+
+import attr
+from elasticsearch_dsl import Document, Search
+from fastapi import HTTPException
+
+from stac_fastapi.elasticsearch.config import settings
+from stac_fastapi.elasticsearch.session import submit
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_TIMEOUT = 10
+MAX_RESULT_WINDOW = 10000
+
+
+def catalog_timeout(catalog: str) -> float:
+    """
+    Return the timeout, in seconds, for searches against ``catalog``.
+    A ``TIMEOUT`` key in the catalog settings overrides the global default.
+    """
+    default = getattr(settings, "FEDERATED_SEARCH_TIMEOUT", DEFAULT_TIMEOUT)
+    return float(settings.CATALOGS.get(catalog, {}).get("TIMEOUT", default))
+
+
+def sort_directions(search: Search) -> List[bool]:
+    """
+    Return a list of flags, one per sort field, which are True for
+    descending sorts.
+    """
+    directions = []
+
+    for sort in search.to_dict().get("sort", []):
+        if isinstance(sort, str):
+            directions.append(sort.startswith("-") or sort == "_score")
+            continue
+
+        options = list(sort.values())[0]
+        if isinstance(options, dict):
+            options = options.get("order", "asc")
+        directions.append(options == "desc")
+
+    return directions
+
+
+def compare_hits(directions: List[bool], a, b) -> int:
+    """
+    Compare two hits by their sort values. Missing values sort last.
+    """
+    for descending, x, y in zip(directions, a.meta.sort, b.meta.sort):
+        if x == y:
+            continue
+        if x is None:
+            return 1
+        if y is None:
+            return -1
+        if descending:
+            return -1 if x > y else 1
+        return -1 if x < y else 1
+
+    return 0
+
+
+@attr.s
+class FederatedResponse:
+    """
+    Merged results from a federated search
+    """
+
+    hits: list = attr.ib(factory=list)
+    total: int = attr.ib(default=0)
+    answered: list = attr.ib(factory=list)
+    partial: list = attr.ib(factory=list)
+    failed: list = attr.ib(factory=list)
+
+    def catalogs_context(self) -> dict:
+        """
+        Return the catalog report for the response context
+        """
+        return {
+            "answered": self.answered,
+            "partial": self.partial,
+            "failed": self.failed,
+        }
+
+
+@attr.s
+class FederatedSearch:
+    """
+    Run a search against each catalog concurrently and merge the results.
+
+    :param search: The search built by ``get_queryset``
+    :param table: The document class being searched
+    :param catalogs: The names of the catalogs to search
+    """
+
+    search: Search = attr.ib()
+    table: Document = attr.ib()
+    catalogs: list = attr.ib()
+
+    def catalog_scope(self, catalog: str) -> Search:
+        """
+        Scope the search to a single catalog and its timeout.
+        """
+        return (
+            self.search.index()
+            .index(self.table.catalog_indexes[catalog]["index"])
+            .using(self.table.catalog_indexes[catalog]["using"])
+            .params(request_timeout=catalog_timeout(catalog))
+        )
+
+    def catalog_search(self, catalog: str, size: int) -> Search:
+        """
+        Scope the search to a single catalog, fetching enough hits to fill
+        every page up to and including the requested one.
+        """
+        timeout = catalog_timeout(catalog)
+
+        return (
+            self.catalog_scope(catalog)
+            .extra(
+                **{"from": 0, "size": size},
+                timeout=f"{int(timeout * 1000)}ms",
+                track_total_hits=True,
+            )
+            .params(allow_partial_search_results=True)
+        )
+
+    def execute(self, page: int, limit: int) -> FederatedResponse:
+        """
+        Execute the search and return the requested page of merged hits.
+        """
+        size = page * limit
+
+        if size > MAX_RESULT_WINDOW:
+            raise (
+                HTTPException(
+                    status_code=424,
+                    detail="The number of results requested is outside the maximum window 10,000",
+                )
+            )
+
+        searches = {
+            submit(self.catalog_search(catalog, size).execute): catalog
+            for catalog in self.catalogs
+        }
+
+        done, not_done = wait(
+            searches, timeout=max(catalog_timeout(c) for c in self.catalogs) + 1
+        )
+
+        result = FederatedResponse()
+
+        for future in not_done:
+            future.cancel()
+            result.failed.append(searches[future])
+
+        for future in done:
+            catalog = searches[future]
+
+            try:
+                response = future.result()
+            except Exception as exc:
+                logger.warning("Federated search of %s failed: %s", catalog, exc)
+                result.failed.append(catalog)
+                continue
+
+            if response.timed_out or response._shards.failed:
+                result.partial.append(catalog)
+            else:
+                result.answered.append(catalog)
+
+            result.hits.extend(response.hits)
+            result.total += response.hits.total.value
+
+        if directions := sort_directions(self.search):
+            result.hits.sort(
+                key=functools.cmp_to_key(functools.partial(compare_hits, directions))
+            )
+        else:
+            result.hits.sort(key=lambda hit: hit.meta.score or 0, reverse=True)
+
+        result.hits = result.hits[(page - 1) * limit : size]
+
+        return result
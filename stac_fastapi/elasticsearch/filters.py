@@ -8,10 +8,14 @@ __copyright__ = 'Copyright 2018 United Kingdom Research and Innovation'
 __license__ = 'BSD - see LICENSE file in top-level package directory'
 __contact__ = 'richard.d.smith@stfc.ac.uk'
 
-from stac_fastapi.elasticsearch.models.database import ElasticsearchCollection
+from stac_fastapi.elasticsearch.mappings import FieldType, registry
+from stac_fastapi.elasticsearch.models.database import (
+    ElasticsearchCollection,
+    ElasticsearchItem,
+)
 
 from stac_fastapi.types.core import BaseFiltersClient
-from .utils import dict_merge
+from .utils import dict_merge, get_catalog
 
 import attr
 from elasticsearch import NotFoundError
@@ -19,28 +23,57 @@ from elasticsearch import NotFoundError
 from typing import Dict, Any, Optional
 
 
+def summary_range(values: list) -> Optional[dict]:
+    """
+    Return the minimum and maximum of a list of summary values, or None if
+    the values can't be compared.
+    """
+    values = [v for v in values if v is not None]
+
+    try:
+        return {'minimum': min(values), 'maximum': max(values)}
+    except (TypeError, ValueError):
+        return None
+
+
+def summary_property(name: str, values: Any, field: Optional[FieldType] = None) -> dict:
+    """
+    Return the queryable for a collection summary. Strings list their values,
+    numbers their range. ``minimum`` and ``maximum`` only apply to numbers, so
+    dates and booleans are described by their type alone.
+    """
+    prop = {'title': name.replace('_', ' ').title(), 'type': 'string'}
+
+    if field:
+        prop.update(field.json_schema())
+
+    if prop['type'] == 'string' and 'format' not in prop:
+        prop['enum'] = values
+    elif prop['type'] in ('number', 'integer') and isinstance(values, list):
+        prop.update(summary_range(values) or {})
+
+    return prop
+
+
 @attr.s
 class FiltersClient(BaseFiltersClient):
 
-    def collection_summaries(self, collection_id: str) -> Dict:
+    def collection_summaries(self, collection_id: str, catalog: str = None) -> Dict:
 
         properties = {}
 
         try:
-            collection = ElasticsearchCollection.get(id=collection_id)
+            collection = ElasticsearchCollection.get(id=collection_id, catalog=catalog)
         except NotFoundError:
             raise (NotFoundError(404, f'Collection: {collection_id} not found'))
 
+        # Types come from the item index mappings. Unmapped properties are
+        # treated as strings.
+        fields = registry.properties(ElasticsearchItem, catalog)
+
         if summaries := collection.get_summaries():
             for k, v in summaries.items():
-                prop = {
-                    k: {
-                        'title': k.replace('_', ' ').title(),
-                        'type': 'string',
-                        'enum': v
-                    }
-                }
-                properties.update(prop)
+                properties[k] = summary_property(k, v, fields.get(k))
 
         if extent := collection.get_extent():
             temp_min, temp_max = extent['temporal']['interval'][0]
@@ -70,10 +103,11 @@ class FiltersClient(BaseFiltersClient):
     ) -> Dict[str, Any]:
 
         schema = super().get_queryables()
+        catalog = get_catalog(kwargs['request'])
 
         if collection_id:
 
-            properties = self.collection_summaries(collection_id)
+            properties = self.collection_summaries(collection_id, catalog)
 
             schema['$id'] = f'{kwargs["request"].base_url}/{collection_id}/queryables'
             schema['title'] = f'Queryables for {collection_id}'
@@ -91,15 +125,29 @@ class FiltersClient(BaseFiltersClient):
             for collection in collections:
                 if not properties:
                     # Initialise with first collection
-                    properties = self.collection_summaries(collection)
+                    properties = self.collection_summaries(collection, catalog)
                 else:
                     # Get properties of following collections
-                    new_props = self.collection_summaries(collection)
+                    new_props = self.collection_summaries(collection, catalog)
                     intersect = {}
                     for prop, value in properties.items():
                         if prop in new_props:
-                            if value.get('type') == 'string':
-                                intersect[prop] = dict_merge(value, new_props[prop])
+                            new_value = new_props[prop]
+                            if value.get('type') != new_value.get('type'):
+                                continue
+
+                            if 'enum' in value:
+                                intersect[prop] = dict_merge(value, new_value)
+                            elif 'minimum' in value and 'minimum' in new_value:
+                                intersect[prop] = {
+                                    **value,
+                                    **(summary_range([
+                                        value['minimum'], value['maximum'],
+                                        new_value['minimum'], new_value['maximum'],
+                                    ]) or {}),
+                                }
+                            else:
+                                intersect[prop] = value
                     properties = intersect
 
                     # If the resultant intersect is an empty dict, short-circuit
@@ -0,0 +1,181 @@
+# encoding: utf-8
+"""
+Grid aggregations for map overviews of a search.
+
+Rather than paging through every matching item, map clients request the
+number of items in each geotile or geohash cell at a given precision. Cells
+are returned as GeoJSON polygons and cached per filter and precision.
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+import math
+from typing import List, Optional
+
+import attr
+from elasticsearch_dsl import Search
+from fastapi import HTTPException
+from stac_pydantic.shared import MimeTypes
+
+from stac_fastapi.elasticsearch.aggregation import AggregationClient
+from stac_fastapi.elasticsearch.cache import TTLCache
+from stac_fastapi.elasticsearch.config import settings
+from stac_fastapi.elasticsearch.facets import filter_key
+
+from .utils import cacheable
+
+GEOHASH_ALPHABET = "0123456789bcdefghjkmnpqrstuvwxyz"
+
+# Valid precisions for each grid type
+PRECISIONS = {
+    "geotile": range(0, 30),
+    "geohash": range(1, 13),
+}
+
+DEFAULT_PRECISION = {
+    "geotile": 4,
+    "geohash": 3,
+}
+
+
+def geotile_bounds(key: str) -> List[float]:
+    """
+    Return the ``[west, south, east, north]`` bounds of a ``zoom/x/y`` tile.
+    """
+    zoom, x, y = (int(part) for part in key.split("/"))
+    n = 2**zoom
+
+    def lat(y: int) -> float:
+        return math.degrees(math.atan(math.sinh(math.pi * (1 - 2 * y / n))))
+
+    return [x / n * 360 - 180, lat(y + 1), (x + 1) / n * 360 - 180, lat(y)]
+
+
+def geohash_bounds(key: str) -> List[float]:
+    """
+    Return the ``[west, south, east, north]`` bounds of a geohash cell.
+    """
+    lon = [-180.0, 180.0]
+    lat = [-90.0, 90.0]
+    is_lon = True
+
+    for char in key:
+        bits = GEOHASH_ALPHABET.index(char)
+
+        for shift in range(4, -1, -1):
+            interval = lon if is_lon else lat
+            mid = (interval[0] + interval[1]) / 2
+
+            if bits >> shift & 1:
+                interval[0] = mid
+            else:
+                interval[1] = mid
+
+            is_lon = not is_lon
+
+    return [lon[0], lat[0], lon[1], lat[1]]
+
+
+CELL_BOUNDS = {
+    "geotile": geotile_bounds,
+    "geohash": geohash_bounds,
+}
+
+
+def cell_feature(grid: str, key: str, count: int) -> dict:
+    """
+    Return a grid cell as a GeoJSON feature.
+    """
+    west, south, east, north = CELL_BOUNDS[grid](key)
+
+    return {
+        "type": "Feature",
+        "id": key,
+        "geometry": {
+            "type": "Polygon",
+            "coordinates": [
+                [[west, south], [east, south], [east, north], [west, north], [west, south]]
+            ],
+        },
+        "properties": {"key": key, "count": count},
+    }
+
+
+@attr.s
+class GridClient(AggregationClient):
+    """
+    Client for the grid endpoints
+    """
+
+    path = "grid"
+    media_type = MimeTypes.geojson
+    parameters = ("grid", "precision")
+
+    field: str = attr.ib(default=getattr(settings, "GRID_FIELD", "centroid"))
+    max_cells: int = attr.ib(default=getattr(settings, "GRID_MAX_CELLS", 10000))
+    cache: TTLCache = attr.ib(
+        factory=lambda: TTLCache(
+            maxsize=256, ttl=getattr(settings, "GRID_CACHE_TTL", 300)
+        )
+    )
+
+    def cells(self, search: Search, grid: str, precision: int) -> List[dict]:
+        """
+        Return the cells of the grid containing matching items.
+        """
+        grid_search = cacheable(search.sort()[0:0])
+        grid_search.aggs.bucket(
+            "grid",
+            f"{grid}_grid",
+            field=self.field,
+            precision=precision,
+            size=self.max_cells,
+        )
+
+        response = grid_search.execute()
+
+        return [
+            cell_feature(grid, bucket.key, bucket.doc_count)
+            for bucket in response.aggregations.grid.buckets
+        ]
+
+    def validate(
+        self, grid: Optional[str] = None, precision: Optional[int] = None
+    ) -> dict:
+        grid = grid or "geotile"
+
+        if grid not in PRECISIONS:
+            raise (
+                HTTPException(
+                    status_code=400,
+                    detail=f"Unknown grid: {grid}, use one of {list(PRECISIONS)}",
+                )
+            )
+
+        if precision is None:
+            precision = DEFAULT_PRECISION[grid]
+
+        if precision not in PRECISIONS[grid]:
+            valid = PRECISIONS[grid]
+            raise (
+                HTTPException(
+                    status_code=400,
+                    detail=f"{grid} precision must be between {valid[0]} and {valid[-1]}",
+                )
+            )
+
+        return {"grid": grid, "precision": precision}
+
+    def aggregate(self, search: Search, catalog: str, grid: str, precision: int) -> dict:
+        """
+        Return a GeoJSON FeatureCollection of grid cells with their item counts.
+        """
+        features = self.cache.get_or_set(
+            (filter_key(search), grid, precision),
+            lambda: self.cells(search, grid, precision),
+        )
+
+        return {"type": "FeatureCollection", "features": features}
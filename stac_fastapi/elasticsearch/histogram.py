@@ -0,0 +1,137 @@
+# encoding: utf-8
+"""
+Temporal histograms of a search.
+
+Timeline widgets request the number of matching items per interval in one
+``date_histogram`` aggregation, instead of a count per window. Buckets are
+cached per filter, field and interval.
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+import re
+from typing import List, Optional
+
+import attr
+from elasticsearch_dsl import Search
+from fastapi import HTTPException
+
+from stac_fastapi.elasticsearch.aggregation import AggregationClient
+from stac_fastapi.elasticsearch.cache import TTLCache
+from stac_fastapi.elasticsearch.config import settings
+from stac_fastapi.elasticsearch.facets import filter_key
+
+from .utils import cacheable
+
+# Date properties which can be binned
+HISTOGRAM_FIELDS = {
+    "datetime": "properties.datetime",
+    "start_datetime": "properties.start_datetime",
+    "end_datetime": "properties.end_datetime",
+}
+
+CALENDAR_INTERVALS = {
+    "minute",
+    "1m",
+    "hour",
+    "1h",
+    "day",
+    "1d",
+    "week",
+    "1w",
+    "month",
+    "1M",
+    "quarter",
+    "1q",
+    "year",
+    "1y",
+}
+
+FIXED_INTERVAL = re.compile(r"^\d+(ms|s|m|h|d)$")
+
+
+def interval_options(interval: str) -> dict:
+    """
+    Return the ``date_histogram`` options for ``interval``, which is either a
+    calendar unit (``month``, ``1y``) or a fixed duration (``6h``, ``90d``).
+    """
+    if interval in CALENDAR_INTERVALS:
+        return {"calendar_interval": interval}
+
+    if FIXED_INTERVAL.match(interval):
+        return {"fixed_interval": interval}
+
+    raise (
+        HTTPException(
+            status_code=400,
+            detail=f"Invalid interval: {interval}, use a calendar unit such as "
+            "month or a fixed duration such as 6h",
+        )
+    )
+
+
+@attr.s
+class HistogramClient(AggregationClient):
+    """
+    Client for the histogram endpoints
+    """
+
+    path = "histogram"
+    parameters = ("interval", "field")
+
+    cache: TTLCache = attr.ib(
+        factory=lambda: TTLCache(
+            maxsize=256, ttl=getattr(settings, "HISTOGRAM_CACHE_TTL", 300)
+        )
+    )
+
+    def buckets(self, search: Search, field: str, interval: str) -> List[dict]:
+        """
+        Return the number of matching items in each interval.
+        """
+        histogram_search = cacheable(search.sort()[0:0])
+        histogram_search.aggs.bucket(
+            "histogram",
+            "date_histogram",
+            field=HISTOGRAM_FIELDS[field],
+            **interval_options(interval),
+        )
+
+        response = histogram_search.execute()
+
+        return [
+            {"key": bucket.key_as_string, "count": bucket.doc_count}
+            for bucket in response.aggregations.histogram.buckets
+        ]
+
+    def validate(
+        self, interval: Optional[str] = None, field: Optional[str] = None
+    ) -> dict:
+        interval = interval or "month"
+        field = field or "datetime"
+
+        if field not in HISTOGRAM_FIELDS:
+            raise (
+                HTTPException(
+                    status_code=400,
+                    detail=f"Unknown field: {field}, use one of {list(HISTOGRAM_FIELDS)}",
+                )
+            )
+
+        interval_options(interval)
+
+        return {"interval": interval, "field": field}
+
+    def aggregate(self, search: Search, catalog: str, interval: str, field: str) -> dict:
+        """
+        Return the number of matching items in each interval.
+        """
+        buckets = self.cache.get_or_set(
+            (filter_key(search), field, interval),
+            lambda: self.buckets(search, field, interval),
+        )
+
+        return {"field": field, "interval": interval, "buckets": buckets}
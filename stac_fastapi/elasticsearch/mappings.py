@@ -0,0 +1,191 @@
+# encoding: utf-8
+"""
+Field types derived from the Elasticsearch index mappings.
+
+The mappings are read once per index and cached so that queryables and CQL
+filters can address each property by its real type instead of assuming
+every property is a keyword.
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+import logging
+from typing import Dict, Optional
+
+import attr
+from elasticsearch import ElasticsearchException
+from elasticsearch_dsl import Document, connections
+
+from stac_fastapi.elasticsearch.cache import TTLCache
+from stac_fastapi.elasticsearch.config import settings
+
+logger = logging.getLogger(__name__)
+
+INTEGER_TYPES = {"long", "integer", "short", "byte", "unsigned_long"}
+NUMBER_TYPES = {"double", "float", "half_float", "scaled_float"} | INTEGER_TYPES
+DATE_TYPES = {"date", "date_nanos"}
+KEYWORD_TYPES = {"keyword", "constant_keyword", "wildcard"}
+
+
+@attr.s
+class FieldType:
+    """
+    The mapped type of a single field
+
+    :param path: Dotted path of the field in the document
+    :param type: Elasticsearch field type
+    :param keyword: Name of a keyword sub-field, if one exists
+    """
+
+    path: str = attr.ib()
+    type: str = attr.ib()
+    keyword: Optional[str] = attr.ib(default=None)
+
+    @property
+    def field(self) -> str:
+        """
+        The field to use for exact matches and ranges. Analysed text is
+        matched against its keyword sub-field.
+        """
+        if self.type == "text" and self.keyword:
+            return f"{self.path}.{self.keyword}"
+
+        return self.path
+
+    @property
+    def is_numeric(self) -> bool:
+        return self.type in NUMBER_TYPES
+
+    @property
+    def is_date(self) -> bool:
+        return self.type in DATE_TYPES
+
+    @property
+    def is_boolean(self) -> bool:
+        return self.type == "boolean"
+
+    def json_schema(self) -> dict:
+        """
+        Return the JSON schema type for the field
+        """
+        if self.type in INTEGER_TYPES:
+            return {"type": "integer"}
+
+        if self.is_numeric:
+            return {"type": "number"}
+
+        if self.is_date:
+            return {"type": "string", "format": "date-time"}
+
+        if self.is_boolean:
+            return {"type": "boolean"}
+
+        return {"type": "string"}
+
+
+def flatten_mapping(properties: dict, prefix: str = "") -> Dict[str, FieldType]:
+    """
+    Flatten the ``properties`` of a mapping into a dict of dotted path to
+    :class:`FieldType`.
+    """
+    fields = {}
+
+    for name, mapping in properties.items():
+        path = f"{prefix}{name}"
+
+        if "properties" in mapping:
+            fields.update(flatten_mapping(mapping["properties"], f"{path}."))
+            continue
+
+        keyword = None
+        for sub_name, sub_mapping in mapping.get("fields", {}).items():
+            if sub_mapping.get("type") in KEYWORD_TYPES:
+                keyword = sub_name
+                break
+
+        fields[path] = FieldType(
+            path=path, type=mapping.get("type", "object"), keyword=keyword
+        )
+
+    return fields
+
+
+class MappingRegistry:
+    """
+    Caches the field types of each index, keyed by document class and catalog.
+    """
+
+    def __init__(self, ttl: Optional[float] = None) -> None:
+        self.cache = TTLCache(maxsize=64, ttl=ttl)
+
+    def load(self, table: Document, catalog: str = None) -> Dict[str, FieldType]:
+        """
+        Read the mappings for the indexes behind ``table``. Where several
+        indexes map a field differently, the first mapping wins.
+        """
+        target = table.catalog_index(catalog)
+        es = connections.get_connection(target["using"])
+
+        fields = {}
+        for index in es.indices.get_mapping(index=target["index"]).values():
+            properties = index.get("mappings", {}).get("properties", {})
+
+            for path, field in flatten_mapping(properties).items():
+                fields.setdefault(path, field)
+
+        return fields
+
+    def get(self, table: Document, catalog: str = None) -> dict:
+        """
+        Return the cached field views for ``table``. Mappings which cannot be
+        read are not cached.
+        """
+        key = (table.index_key, catalog or "")
+        views = self.cache.get(key)
+
+        if views is None:
+            try:
+                fields = self.load(table, catalog)
+            except ElasticsearchException as exc:
+                logger.warning("Unable to read mappings for %s: %s", key, exc)
+                return {"fields": {}, "properties": {}, "field_mapping": {}}
+
+            properties = {
+                path[len("properties.") :]: field
+                for path, field in fields.items()
+                if path.startswith("properties.")
+            }
+            views = {
+                "fields": fields,
+                "properties": properties,
+                "field_mapping": {
+                    name: field.field for name, field in properties.items()
+                },
+            }
+            self.cache.set(key, views)
+
+        return views
+
+    def fields(self, table: Document, catalog: str = None) -> Dict[str, FieldType]:
+        """
+        Return the field types for ``table``, keyed by dotted path.
+        """
+        return self.get(table, catalog)["fields"]
+
+    def properties(self, table: Document, catalog: str = None) -> Dict[str, FieldType]:
+        """
+        Return the field types for the STAC properties, keyed by property name.
+        """
+        return self.get(table, catalog)["properties"]
+
+    def field_mapping(self, table: Document, catalog: str = None) -> Dict[str, str]:
+        """
+        Return the mapping of property name to the field to filter on.
+        """
+        return self.get(table, catalog)["field_mapping"]
+
+
+registry = MappingRegistry(ttl=getattr(settings, "MAPPING_CACHE_TTL", 600))
@@ -0,0 +1,190 @@
+# encoding: utf-8
+"""
+ASGI middleware.
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+import hmac
+import os
+import sys
+import threading
+import uuid
+from collections import Counter
+from typing import Iterable, Optional
+from urllib.parse import parse_qs
+
+from starlette.types import ASGIApp, Receive, Scope, Send
+
+
+class CatalogMiddleware:
+    """
+    Resolve catalog prefixed paths, e.g. ``/{catalog}/search``, once per request.
+
+    The catalog is moved from the path onto the ``root_path`` so that routing
+    and link generation work as for the root app, and recorded in the scope
+    so clients can pick the catalog indexes without parsing the path.
+    """
+
+    def __init__(self, app: ASGIApp, catalogs: Iterable[str]) -> None:
+        self.app = app
+        self.catalogs = frozenset(catalogs)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] in ("http", "websocket"):
+            _, catalog, *rest = scope["path"].split("/", 2)
+
+            if catalog in self.catalogs:
+                path = "/" + (rest[0] if rest else "")
+                scope = dict(
+                    scope,
+                    path=path,
+                    root_path=f"{scope.get('root_path', '')}/{catalog}",
+                    catalog=catalog,
+                )
+
+        await self.app(scope, receive, send)
+
+
+class StackSampler:
+    """
+    Sample the stacks of every thread running app code at a fixed interval.
+
+    Endpoints run in worker threads, so rather than tracing the event loop
+    thread the sampler records any thread with a ``stac_fastapi`` frame on
+    its stack. Concurrent requests can show up in the samples.
+    """
+
+    def __init__(self, interval: float) -> None:
+        self.interval = interval
+        self.stacks = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+
+    def __enter__(self) -> "StackSampler":
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc) -> None:
+        self._stop.set()
+        self._thread.join()
+
+    def _run(self) -> None:
+        own_id = threading.get_ident()
+
+        while not self._stop.wait(self.interval):
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+
+                stack = []
+                while frame is not None:
+                    module = frame.f_globals.get("__name__", "?")
+                    stack.append(f"{module}.{frame.f_code.co_name}:{frame.f_lineno}")
+                    frame = frame.f_back
+
+                if any(name.startswith("stac_fastapi") for name in stack):
+                    self.stacks[";".join(reversed(stack))] += 1
+
+    def folded(self) -> str:
+        """
+        Return the samples in the folded format read by flamegraph.pl and
+        speedscope.
+        """
+        return "\n".join(
+            f"{stack} {count}" for stack, count in self.stacks.most_common()
+        )
+
+
+class ProfilingMiddleware:
+    """
+    Profile single requests which carry the admin token, in the
+    ``X-Profile`` header or the ``profile`` query parameter.
+
+    The stacks are written to ``output_dir`` and named in the ``X-Profile``
+    response header. Without an ``output_dir`` they are returned instead of
+    the response body, with the original status in ``X-Profile-Status``.
+    """
+
+    def __init__(
+        self,
+        app: ASGIApp,
+        token: str,
+        output_dir: Optional[str] = None,
+        interval: float = 0.005,
+    ) -> None:
+        self.app = app
+        self.token = token
+        self.output_dir = output_dir
+        self.interval = interval
+
+    def requested(self, scope: Scope) -> bool:
+        """Check if the request asks to be profiled with the admin token."""
+        headers = dict(scope.get("headers", []))
+        # Latin-1 maps bytes to characters one to one, so the decoded query
+        # values are encoded back to the raw bytes the client sent
+        query = parse_qs(
+            scope.get("query_string", b"").decode("latin-1"), encoding="latin-1"
+        )
+        offered = [
+            headers.get(b"x-profile", b""),
+            *(value.encode("latin-1") for value in query.get("profile", [])),
+        ]
+
+        # Compared as bytes, as the values needn't be ASCII or even UTF-8
+        token = self.token.encode()
+        return any(hmac.compare_digest(value, token) for value in offered)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http" or not self.requested(scope):
+            await self.app(scope, receive, send)
+            return
+
+        if self.output_dir:
+            await self.profile_to_file(scope, receive, send)
+        else:
+            await self.profile_to_response(scope, receive, send)
+
+    async def profile_to_file(self, scope: Scope, receive: Receive, send: Send):
+        path = os.path.join(self.output_dir, f"{uuid.uuid4().hex}.folded")
+
+        async def send_with_path(message):
+            if message["type"] == "http.response.start":
+                message = dict(message)
+                message["headers"] = list(message.get("headers", [])) + [
+                    (b"x-profile", path.encode())
+                ]
+            await send(message)
+
+        with StackSampler(self.interval) as sampler:
+            await self.app(scope, receive, send_with_path)
+
+        with open(path, "w", encoding="utf-8") as writer:
+            writer.write(sampler.folded())
+
+    async def profile_to_response(self, scope: Scope, receive: Receive, send: Send):
+        status = []
+
+        async def discard(message):
+            if message["type"] == "http.response.start":
+                status.append(message["status"])
+
+        with StackSampler(self.interval) as sampler:
+            await self.app(scope, receive, discard)
+
+        body = sampler.folded().encode()
+        await send(
+            {
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [
+                    (b"content-type", b"text/plain; charset=utf-8"),
+                    (b"content-length", str(len(body)).encode()),
+                    (b"x-profile-status", str(status[0] if status else 500).encode()),
+                ],
+            }
+        )
+        await send({"type": "http.response.body", "body": body})
@@ -12,16 +12,26 @@ from typing import Optional
 from urllib.parse import urljoin
 
 from elasticsearch_dsl import DateRange, Document, GeoShape, Index, InnerDoc, Search
+from elasticsearch_dsl.utils import AttrDict
 from stac_fastapi.elasticsearch.config import settings
 from stac_fastapi.types.links import CollectionLinks, ItemLinks
 from stac_fastapi_asset_search.types import AssetLinks
 from stac_pydantic.shared import MimeTypes
 
-from .utils import Coordinates, rgetattr
+from .utils import Coordinates
 
 DEFAULT_EXTENT = {"temporal": [[None, None]], "spatial": [[-180, -90, 180, 90]]}
 STAC_VERSION_DEFAULT = "1.0.0"
 CATALOGS = settings.CATALOGS
+INDEX_KEYS = ("COLLECTION_INDEX", "ITEM_INDEX", "ASSET_INDEX")
+
+# Names of the catalogs which can be selected with a path prefix. A flat
+# CATALOGS setting describes a single, unnamed catalog.
+CATALOG_NAMES = (
+    []
+    if any(key in CATALOGS for key in INDEX_KEYS)
+    else [catalog for catalog in CATALOGS if isinstance(CATALOGS[catalog], dict)]
+)
 
 
 def indexes_from_catalogs(index_key: str) -> list:
@@ -36,6 +46,32 @@ def indexes_from_catalogs(index_key: str) -> list:
     return indexes
 
 
+def catalog_using(catalog: str) -> str:
+    """
+    Return the name of the connection used to search ``catalog``. Catalogs
+    with their own ``ELASTICSEARCH_CONNECTION`` live on a separate cluster.
+    """
+    if isinstance(CATALOGS.get(catalog), dict) and CATALOGS[catalog].get(
+        "ELASTICSEARCH_CONNECTION"
+    ):
+        return catalog
+
+    return "default"
+
+
+def catalog_indexes(index_key: str) -> dict:
+    """
+    Return a table of catalog name to index name and connection for ``index_key``.
+    """
+    return {
+        catalog: {
+            "index": CATALOGS[catalog][index_key],
+            "using": catalog_using(catalog),
+        }
+        for catalog in CATALOG_NAMES
+    }
+
+
 COLLECTION_INDEXES = indexes_from_catalogs("COLLECTION_INDEX")
 ITEM_INDEXES = indexes_from_catalogs("ITEM_INDEX")
 ASSET_INDEXES = indexes_from_catalogs("ASSET_INDEX")
@@ -78,24 +114,73 @@ class STACDocument(Document):
         """
         return getattr(self, "stac_version", STAC_VERSION_DEFAULT)
 
+    # WGS84 bbox converted for a page of documents at once, see ``prefetch_bboxes``
+    prefetched_bbox: Optional[list] = None
+
+    def bbox_envelope(self) -> Optional[list]:
+        """
+        Return the raw GeoJSON coordinates of the bbox, read from the source
+        without wrapping each level in an AttrDict.
+        """
+        spatial = self._d_.get("spatial")
+        if isinstance(spatial, AttrDict):
+            spatial = spatial.to_dict()
+
+        if isinstance(spatial, dict) and isinstance(spatial.get("bbox"), dict):
+            return spatial["bbox"].get("coordinates")
+
+        return None
+
+    @classmethod
+    def prefetch_bboxes(cls, docs: list) -> None:
+        """
+        Convert the bboxes of a page of documents to WGS84 in one batch.
+        """
+        docs = [doc for doc in docs if isinstance(doc, STACDocument)]
+        bboxes = Coordinates.geojson_to_wgs84([doc.bbox_envelope() for doc in docs])
+
+        for doc, bbox in zip(docs, bboxes):
+            doc.prefetched_bbox = bbox
+
+    def get_bbox(self) -> Optional[list]:
+        """
+        Return a WGS84 formatted bbox
+        """
+        if self.prefetched_bbox is not None:
+            return self.prefetched_bbox
+
+        if coordinates := self.bbox_envelope():
+            return Coordinates.from_geojson(coordinates).to_wgs84()
+
+        return None
+
+    @classmethod
+    def catalog_index(cls, catalog: str = None) -> dict:
+        """
+        Return the index name and connection to use for ``catalog``. Without a
+        catalog, every configured index is used.
+        """
+        if catalog in cls.catalog_indexes:
+            return cls.catalog_indexes[catalog]
+
+        return {"index": ",".join(cls.indexes), "using": "default"}
+
     @classmethod
     def search(cls, catalog: str = None, **kwargs) -> Search:
         """
         Return Elasticsearch DSL Search
         """
-        if len(cls.indexes) > 1:
-
-            if catalog and catalog in cls.catalogs:
-                return super().search(
-                    index=cls.catalogs[catalog][cls.index_key], **kwargs
-                )
+        return super().search(**cls.catalog_index(catalog), **kwargs)
 
-            return super().search(
-                index=",".join(cls.indexes),
-                **kwargs,
-            )
+    @classmethod
+    def get(cls, id: str, catalog: str = None, **kwargs) -> "STACDocument":
+        """
+        Retrieve a single document by id from the given catalog
+        """
+        if catalog in cls.catalog_indexes:
+            kwargs = {**cls.catalog_indexes[catalog], **kwargs}
 
-        return super().search(**kwargs)
+        return super().get(id=id, **kwargs)
 
 
 @assets.document
@@ -104,6 +189,17 @@ class ElasticsearchAsset(STACDocument):
     type = "Feature"
     index_key: str = "ASSET_INDEX"
     indexes: list = ASSET_INDEXES
+    catalog_indexes: dict = catalog_indexes("ASSET_INDEX")
+
+    # Assets are routed to a shard by their collection, so searches scoped to
+    # a collection only touch one shard.
+    routing_field: Optional[str] = (
+        "collection_id" if getattr(settings, "ASSET_ROUTING", False) else None
+    )
+
+    # Keyword copy of the asset id, so sorts use doc values rather than
+    # fielddata on _id
+    sort_tiebreaker: str = "asset_id"
 
     @classmethod
     def search(cls, **kwargs):
@@ -127,23 +223,18 @@ class ElasticsearchAsset(STACDocument):
 
         return {}
 
-    def get_bbox(self):
-        """
-        Return a WGS84 formatted bbox
-        """
-        try:
-            coordinates = rgetattr(self, "spatial.bbox.coordinates")
-        except AttributeError:
-            return
-
-        return Coordinates.from_geojson(coordinates).to_wgs84()
-
     def get_item_id(self) -> str:
         """
         Return item id
         """
         return getattr(self, "item_id", None)
 
+    def get_collection_id(self) -> str:
+        """
+        Return collection id
+        """
+        return getattr(self, "collection_id", None)
+
     def get_roles(self) -> list:
         """
         Return roles
@@ -203,26 +294,81 @@ class ElasticsearchItem(STACDocument):
     type = "Feature"
     index_key: str = "ITEM_INDEX"
     indexes: list = ITEM_INDEXES
+    catalog_indexes: dict = catalog_indexes("ITEM_INDEX")
+
+    # STAC sort fields which don't map to a property, and a unique field to
+    # break ties so paging is stable
+    sort_fields: dict = {
+        "id": "item_id.keyword",
+        "collection": "collection_id.keyword",
+        "datetime": "properties.datetime",
+    }
+    sort_tiebreaker: str = "item_id.keyword"
 
     @classmethod
     def search(cls, **kwargs):
         return super().search(**kwargs).filter("term", type="item")
 
-    # @classmethod
-    # def _matches(cls, hit):
-    #     # override _matches to match indices in a pattern instead of just ALIAS
-    #     # hit is the raw dict as returned by elasticsearch
-    #     return True
+    @classmethod
+    def _matches(cls, hit):
+        # override _matches to match indices in a pattern instead of just ALIAS
+        # hit is the raw dict as returned by elasticsearch
+        return True
+
+    # Assets loaded for a page of items at once, see ``prefetch_assets``
+    prefetched_assets: Optional[list] = None
 
-    def asset_search(self):
-        asset_search = (
-            ElasticsearchAsset.search()
+    # Items embed at most this many assets, the rest are listed by the paged
+    # assets endpoint linked from the item
+    max_embedded_assets: int = getattr(settings, "MAX_EMBEDDED_ASSETS", 1000)
+    assets_truncated: bool = False
+
+    @classmethod
+    def assets_search(cls, item_ids: list, catalog: str = None) -> Search:
+        """
+        Return a search for the visible assets of ``item_ids``, with the
+        sequence numbers the item ETags are built from
+        """
+        return (
+            ElasticsearchAsset.search(catalog=catalog)
             .exclude("term", properties__categories="hidden")
             .filter("exists", field="properties.uri")
-            .filter("term", item_id=self.meta.id)
+            .filter("terms", item_id=item_ids)
+            .extra(seq_no_primary_term=True)
         )
 
-        return asset_search
+    @classmethod
+    def prefetch_assets(cls, items: list, response) -> None:
+        """
+        Hand the assets from a batched ``assets_search`` response, sorted by
+        item id, to their items. When the response is incomplete only the
+        items sorting before the last asset's item, or with more assets than
+        they embed, are known to have all they need. The other items fetch
+        their own assets.
+        """
+        complete = response.hits.total.value <= len(response.hits)
+        last_item_id = response.hits[-1].get_item_id() if response.hits else None
+
+        assets = {}
+        for asset in response.hits:
+            assets.setdefault(asset.get_item_id(), []).append(asset)
+
+        for item in items:
+            if not isinstance(item, cls):
+                continue
+
+            item_assets = assets.get(item.meta.id, [])
+            truncated = len(item_assets) > item.max_embedded_assets
+
+            if complete or truncated or item.meta.id < last_item_id:
+                item.assets_truncated = truncated
+                item.prefetched_assets = item_assets[: item.max_embedded_assets]
+
+    def asset_search(self):
+        # Sorted so the embedded assets, and the cut off, are the same on every read
+        return self.assets_search([self.meta.id]).sort(
+            {ElasticsearchAsset.sort_tiebreaker: {"order": "asc"}}
+        )
 
     @property
     def elasticsearch_assets(self) -> list:
@@ -232,7 +378,15 @@ class ElasticsearchItem(STACDocument):
         if self.extension_is_enabled("ContextCollectionExtension"):
             return []
 
-        return list(self.asset_search().scan())
+        if self.prefetched_assets is not None:
+            return self.prefetched_assets
+
+        # One more than the cap shows whether there are more to link to
+        assets = list(self.asset_search()[0 : self.max_embedded_assets + 1])
+        self.assets_truncated = len(assets) > self.max_embedded_assets
+        self.prefetched_assets = assets[: self.max_embedded_assets]
+
+        return self.prefetched_assets
 
     def get_stac_assets(self) -> dict:
         """
@@ -253,20 +407,6 @@ class ElasticsearchItem(STACDocument):
 
         return properties.to_dict() if not isinstance(properties, dict) else {}
 
-    def get_bbox(self):
-        """
-        Return a WGS84 formatted bbox
-
-        :return:
-        """
-
-        try:
-            coordinates = rgetattr(self, "spatial.bbox.coordinates")
-        except AttributeError:
-            return
-
-        return Coordinates.from_geojson(coordinates).to_wgs84()
-
     def get_geometry(self):
         ...
 
@@ -286,14 +426,16 @@ class ElasticsearchItem(STACDocument):
             item_id=self.meta.id,
         ).create_links()
 
-        if self.extension_is_enabled("ContextCollectionExtension"):
+        if self.assets_truncated or self.extension_is_enabled(
+            "ContextCollectionExtension"
+        ):
             links.append(
                 dict(
                     rel="assets",
                     type=MimeTypes.json,
                     href=urljoin(
                         base_url,
-                        f"collections/{self.collection_id}/items/{self.meta.id}/assets",
+                        f"collection/{self.collection_id}/items/{self.meta.id}/assets",
                     ),
                 )
             )
@@ -310,6 +452,7 @@ class ElasticsearchCollection(STACDocument):
     type = "Collection"
     index_key: str = "COLLECTION_INDEX"
     indexes: list = COLLECTION_INDEXES
+    catalog_indexes: dict = catalog_indexes("COLLECTION_INDEX")
 
     @classmethod
     def search(cls, **kwargs):
@@ -358,6 +501,33 @@ class ElasticsearchCollection(STACDocument):
             spatial=dict(bbox=[coordinates.to_wgs84()]),
         )
 
+    def get_statistics(self) -> dict:
+        """
+        Return the stored item and asset statistics, with the extent of the
+        items in STAC form.
+        """
+        statistics = getattr(self, "statistics", None)
+
+        if not statistics:
+            return {}
+
+        statistics = statistics.to_dict()
+        bbox = statistics.pop("bbox", None)
+
+        statistics["extent"] = dict(
+            temporal=dict(
+                interval=[
+                    [
+                        statistics.pop("start_datetime", None),
+                        statistics.pop("end_datetime", None),
+                    ]
+                ]
+            ),
+            spatial=dict(bbox=[bbox] if bbox else []),
+        )
+
+        return statistics
+
     def get_keywords(self) -> list:
         return getattr(self, "keywords", [])
 
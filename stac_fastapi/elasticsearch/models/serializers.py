@@ -19,6 +19,38 @@ from stac_fastapi.types.links import ItemLinks
 from stac_fastapi_asset_search.types import Asset
 
 from stac_fastapi.elasticsearch.models import database
+from stac_fastapi.elasticsearch.models.utils import Coordinates
+from stac_fastapi.elasticsearch.utils import merge_patch
+
+
+def bbox_fields(bbox) -> dict:
+    """
+    Return the numeric bbox fields searched when ``BBOX_FIELDS`` is set, and
+    the centroid aggregated by the grid endpoint.
+    """
+    if not bbox:
+        return {}
+
+    coordinates = Coordinates.from_wgs84(bbox)
+
+    return {**coordinates.to_fields(), "centroid": coordinates.centroid()}
+
+
+def spatial_field(bbox) -> dict:
+    """
+    Return the ``spatial.bbox`` envelope searched when ``BBOX_FIELDS`` is not
+    set.
+    """
+    if not bbox:
+        return {}
+
+    coordinates = Coordinates.from_wgs84(bbox)
+
+    return {
+        "spatial": {
+            "bbox": {"type": "envelope", "coordinates": coordinates.to_geojson()}
+        }
+    }
 
 
 class Serializer(abc.ABC):
@@ -44,6 +76,70 @@ class Serializer(abc.ABC):
 
 
 class AssetSerializer(Serializer):
+    # The stored field for each field of the assets clients send
+    input_fields = {
+        "id": "id",
+        "categories": "roles",
+        "bbox": "bbox",
+        "item": "item_id",
+        "collection": "collection_id",
+        "uri": "location",
+        "filename": "filename",
+        "size": "size",
+        "modified_time": "modified_time",
+        "magic_number": "magic_number",
+        "extension": "extension",
+        "media_type": "media_type",
+        "properties": "properties",
+        "stac_version": "stac_version",
+        "stac_extensions": "stac_extensions",
+    }
+
+    @classmethod
+    def db_to_input(cls, db_model: database.ElasticsearchAsset) -> dict:
+        """
+        Return a stored asset in the form ``stac_to_db`` takes, so patches
+        apply to the fields clients send.
+        """
+        stored = db_model.to_dict()
+
+        return {
+            name: stored[field]
+            for name, field in cls.input_fields.items()
+            if field in stored
+        }
+
+    @classmethod
+    def patch(
+        cls,
+        db_model: database.ElasticsearchAsset,
+        patch: dict,
+        item_id: str = None,
+        collection_id: str = None,
+    ) -> dict:
+        """
+        Apply a JSON merge patch to a stored asset and return the new stored
+        document. Stored fields which clients don't send are kept.
+        """
+        stac_data = merge_patch(cls.db_to_input(db_model), patch)
+        doc = cls.stac_to_db(
+            stac_data=stac_data,
+            id=db_model.meta.id,
+            item_id=item_id,
+            collection_id=collection_id,
+        ).to_dict()
+
+        # The bbox fields are derived from the bbox, so they go with it
+        kept = {
+            field: value
+            for field, value in db_model.to_dict().items()
+            if field not in cls.input_fields.values()
+            and not field.startswith("bbox_")
+            and field != "centroid"
+        }
+
+        return {**kept, **doc}
+
     @classmethod
     def db_to_stac(
         cls,
@@ -64,21 +160,38 @@ class AssetSerializer(Serializer):
             properties=db_model.get_properties(),
             links=db_model.get_links(
                 base_url=str(request.base_url),
-                collection_id=getattr(request, "collection_id", None),
+                collection_id=db_model.get_collection_id()
+                or getattr(request, "collection_id", None),
             ),
         )
 
     @classmethod
     def stac_to_db(
-        cls, stac_data: Asset, exclude_geometry=False
+        cls,
+        stac_data: Asset,
+        exclude_geometry=False,
+        id: str = None,
+        item_id: str = None,
+        collection_id: str = None,
     ) -> database.ElasticsearchAsset:
 
+        id = stac_data.get("id", id)
+        collection_id = stac_data.get("collection", collection_id)
+
+        meta = {"id": id}
+        if database.ElasticsearchAsset.routing_field == "collection_id":
+            meta["routing"] = collection_id
+
         db_item = database.ElasticsearchAsset(
-            meta={"id": stac_data.get("id")},
-            id=stac_data.get("id"),
+            meta=meta,
+            id=id,
+            # Sort tiebreaker, see ElasticsearchAsset.sort_tiebreaker
+            asset_id=id,
             roles=stac_data.get("categories"),
             bbox=stac_data.get("bbox"),
-            item_id=stac_data.get("item"),
+            **bbox_fields(stac_data.get("bbox")),
+            item_id=stac_data.get("item", item_id),
+            collection_id=collection_id,
             location=stac_data.get("uri"),
             filename=stac_data.get("filename"),
             size=stac_data.get("size"),
@@ -95,6 +208,26 @@ class AssetSerializer(Serializer):
 
 
 class ItemSerializer(Serializer):
+    # Top level fields derived from the STAC item, by stac_to_db or by the
+    # indexer, which an update removes when the new item has no value for them
+    stac_fields = (
+        "type",
+        "id",
+        "item_id",
+        "bbox",
+        "bbox_minlon",
+        "bbox_minlat",
+        "bbox_maxlon",
+        "bbox_maxlat",
+        "centroid",
+        "spatial",
+        "temporal",
+        "collection_id",
+        "properties",
+        "stac_version",
+        "stac_extensions",
+    )
+
     @classmethod
     def db_to_stac(
         cls, db_model: database.ElasticsearchItem, request: Response
@@ -131,8 +264,9 @@ class ItemSerializer(Serializer):
             bbox=db_model.get_bbox(),
             geometry=None,
             properties=db_model.get_properties(),
-            links=db_model.get_links(base_url=str(request.base_url)),
+            # Assets first, so the links know if they were truncated
             assets=db_model.get_stac_assets(),
+            links=db_model.get_links(base_url=str(request.base_url)),
         )
 
     @classmethod
@@ -144,7 +278,11 @@ class ItemSerializer(Serializer):
             meta={"id": stac_data.get("id")},
             type="item",
             id=stac_data.get("id"),
+            # Sort tiebreaker, see ElasticsearchItem.sort_tiebreaker
+            item_id=stac_data.get("id"),
             bbox=stac_data.get("bbox"),
+            **bbox_fields(stac_data.get("bbox")),
+            **spatial_field(stac_data.get("bbox")),
             collection_id=stac_data.get("collection"),
             properties=stac_data.get("properties", {}),
             stac_version=stac_data.get("stac_version"),
@@ -160,7 +298,7 @@ class CollectionSerializer(Serializer):
         cls, db_model: database.ElasticsearchCollection, request: Response
     ) -> stac_types.Collection:
 
-        return stac_types.Collection(
+        collection = stac_types.Collection(
             type="Collection",
             id=db_model.meta.id,
             stac_extensions=db_model.get_stac_extensions(),
@@ -175,6 +313,11 @@ class CollectionSerializer(Serializer):
             links=db_model.get_links(base_url=str(request.base_url)),
         )
 
+        if statistics := db_model.get_statistics():
+            collection["statistics"] = statistics
+
+        return collection
+
     @classmethod
     def stac_to_db(
         cls, stac_data: stac_types.Collection, exclude_geometry=False
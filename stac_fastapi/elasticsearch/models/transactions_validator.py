@@ -1,38 +1,241 @@
-from stac_fastapi.types import stac as stac_types
+"""
+Validation of items and collections written through the transactions client.
+
+Items are validated against the STAC item schema and the schema of each of
+their ``stac_extensions``. Schemas are compiled to Python once and the
+compiled validators cached per set of extensions, so validating a batch of
+items of the same kind only runs the compiled checks. Schemas are read from
+``STAC_SCHEMA_DIR`` when it mirrors them, and otherwise fetched once, over
+https and only from the ``STAC_SCHEMA_HOSTS``.
+"""
+import functools
+import json
+import logging
+import os
+from typing import Callable, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+from urllib.request import urlopen
+
+import fastjsonschema
 from elasticsearch import NotFoundError
 from fastapi import HTTPException
-from stac_pydantic import Item, Collection
-from pydantic import ValidationError
+from stac_fastapi.types import stac as stac_types
+
+from stac_fastapi.elasticsearch.cache import TTLCache
+from stac_fastapi.elasticsearch.config import settings
+from stac_fastapi.elasticsearch.models.database import ElasticsearchCollection
+
+logger = logging.getLogger(__name__)
+
+SCHEMA_BASE_URL = "https://schemas.stacspec.org"
+DEFAULT_STAC_VERSION = "1.0.0"
+
+SCHEMA_HOSTS = getattr(
+    settings,
+    "STAC_SCHEMA_HOSTS",
+    ["schemas.stacspec.org", "stac-extensions.github.io", "geojson.org"],
+)
+
+# Schemas which failed to load, so writes don't each wait for them to time out
+failed_schemas = TTLCache(
+    maxsize=1024, ttl=getattr(settings, "SCHEMA_FAILURE_CACHE_TTL", 60)
+)
+
+# Collections known to exist, so a batch of items checks its collection once
+known_collections = TTLCache(
+    maxsize=10000, ttl=getattr(settings, "COLLECTION_EXISTS_CACHE_TTL", 300)
+)
+
+
+class SchemaLoadError(Exception):
+    """
+    A schema could not be read, fetched or compiled
+    """
+
+    def __init__(self, url: str) -> None:
+        super().__init__(f"Unable to load schema {url}")
+        self.url = url
+
+
+def local_schema_path(url: str) -> Optional[str]:
+    """
+    Return the path of the copy of the schema at ``url`` in
+    ``STAC_SCHEMA_DIR``, laid out as ``<host>/<path>``, if there is one.
+    """
+    if not (schema_dir := getattr(settings, "STAC_SCHEMA_DIR", None)):
+        return None
+
+    parsed = urlparse(url)
+    root = os.path.realpath(schema_dir)
+    path = os.path.realpath(
+        os.path.join(root, parsed.netloc, parsed.path.lstrip("/"))
+    )
+
+    # Paths with .. must not leave the mirror
+    if os.path.commonpath([root, path]) != root or not os.path.isfile(path):
+        return None
+
+    return path
+
+
+def schema_allowed(url: str) -> bool:
+    """
+    Check if a schema can be used, either mirrored or fetched over https
+    from one of the ``STAC_SCHEMA_HOSTS``.
+    """
+    parsed = urlparse(url)
+    if parsed.scheme == "https" and parsed.hostname in SCHEMA_HOSTS:
+        return True
+
+    return local_schema_path(url) is not None
+
+
+@functools.lru_cache(maxsize=256)
+def load_schema(url: str) -> dict:
+    """
+    Return the schema at ``url``, from ``STAC_SCHEMA_DIR`` if it holds a
+    copy, raising a ``SchemaLoadError`` if it is not allowed or can't be
+    loaded. Failures are remembered for ``SCHEMA_FAILURE_CACHE_TTL`` seconds.
+    """
+    if path := local_schema_path(url):
+        with open(path, encoding="utf-8") as reader:
+            return json.load(reader)
+
+    if not schema_allowed(url) or url in failed_schemas:
+        raise SchemaLoadError(url)
+
+    try:
+        with urlopen(url, timeout=10) as response:
+            return json.load(response)
+    except (OSError, ValueError) as exc:
+        logger.warning("Unable to fetch schema %s: %s", url, exc)
+        failed_schemas.set(url, True)
+        raise SchemaLoadError(url) from exc
 
-from stac_fastapi.elasticsearch.models.database import (
-    ElasticsearchCollection,
-    ElasticsearchItem,
-    ElasticsearchAsset)
+
+@functools.lru_cache(maxsize=256)
+def compile_schema(url: str) -> Callable:
+    """
+    Compile the schema at ``url``, resolving remote references through the
+    schema cache.
+    """
+    try:
+        return fastjsonschema.compile(
+            load_schema(url), handlers={"http": load_schema, "https": load_schema}
+        )
+    except fastjsonschema.JsonSchemaDefinitionException as exc:
+        logger.warning("Unable to compile schema %s: %s", url, exc)
+        raise SchemaLoadError(url) from exc
+
+
+def core_schema_url(stac_type: str, stac_version: str) -> str:
+    return (
+        f"{SCHEMA_BASE_URL}/v{stac_version}/{stac_type}-spec/json-schema/{stac_type}.json"
+    )
+
+
+@functools.lru_cache(maxsize=1024)
+def schema_validators(schema_urls: Tuple[str, ...]) -> Tuple[Callable, ...]:
+    """
+    Return the compiled validators for a set of schemas. Cached per set, so
+    documents declaring the same extensions share one lookup.
+    """
+    return tuple(compile_schema(url) for url in schema_urls)
+
+
+def validation_errors(document: dict, stac_type: str) -> List[str]:
+    """
+    Return the schema errors in a STAC item or collection.
+    """
+    stac_version = document.get("stac_version") or DEFAULT_STAC_VERSION
+    extensions = document.get("stac_extensions") or []
+    schema_urls = (
+        core_schema_url(stac_type, stac_version),
+        *sorted(ext for ext in extensions if isinstance(ext, str)),
+    )
+
+    if disallowed := [url for url in schema_urls if not schema_allowed(url)]:
+        return [
+            f"Extension schemas must be https URLs on {', '.join(SCHEMA_HOSTS)}: {url}"
+            for url in disallowed
+        ]
+
+    # The schemas are allowed, so failing to load them is the server's fault
+    try:
+        validators = schema_validators(schema_urls)
+    except SchemaLoadError as exc:
+        raise HTTPException(status_code=503, detail=str(exc))
+
+    errors = []
+    for validate in validators:
+        try:
+            validate(document)
+        except fastjsonschema.JsonSchemaValueException as exc:
+            errors.append(exc.message)
+
+    return errors
+
+
+def check_collection(collection_id: str) -> None:
+    """
+    Raise a 404 if the collection does not exist. Found collections are
+    remembered for ``COLLECTION_EXISTS_CACHE_TTL`` seconds.
+    """
+    if collection_id in known_collections:
+        return
+
+    try:
+        ElasticsearchCollection.get(id=collection_id, _source=False)
+    except NotFoundError:
+        raise HTTPException(status_code=404, detail="collection not found")
+
+    known_collections.set(collection_id, True)
 
 
 class TransactionsValidator:
+    @staticmethod
+    def item_validator(item: stac_types.Item, collection_id: str) -> stac_types.Item:
+
+        return TransactionsValidator.items_validator([item], collection_id)[0]
 
     @staticmethod
-    def item_validator(item: stac_types.Item, collection_id: str) -> Item:
+    def items_validator(
+        items: Iterable[stac_types.Item], collection_id: Optional[str] = None
+    ) -> List[stac_types.Item]:
+        """
+        Validate a batch of items, raising a 422 which lists the errors of
+        every invalid item.
+        """
+        items = list(items)
+        collection_ids = {collection_id} if collection_id else set()
+        collection_ids.update(
+            item["collection"] for item in items if item.get("collection")
+        )
 
-        try:
-            ElasticsearchCollection.get(id=collection_id)
-        except NotFoundError:
-            raise HTTPException(status_code=404, detail="collection not found")
+        for item_collection_id in collection_ids:
+            check_collection(item_collection_id)
 
-        try:
-            stac_item = Item(**item)
-        except ValidationError as e:
-            raise HTTPException(status_code=422, detail=e)
+        errors = {}
+        for n, item in enumerate(items):
+            if item_errors := validation_errors(item, "item"):
+                errors[item.get("id", n)] = item_errors
+
+        if errors:
+            raise HTTPException(status_code=422, detail=errors)
 
-        return stac_item
+        return items
 
     @staticmethod
-    def collection_validator(collection: stac_types.Collection) -> Collection:
+    def collection_validator(
+        collection: stac_types.Collection,
+    ) -> stac_types.Collection:
 
-        try:
-            stac_collection = Collection(**collection)
-        except ValidationError as e:
-            raise HTTPException(status_code=422, detail=e)
+        if errors := validation_errors(collection, "collection"):
+            raise HTTPException(status_code=422, detail=errors)
+
+        return collection
 
-        return stac_collection
+    @staticmethod
+    def forget_collection(collection_id: str) -> None:
+        """Drop a deleted collection from the known collections."""
+        known_collections.pop(collection_id)
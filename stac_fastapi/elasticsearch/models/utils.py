@@ -8,7 +8,7 @@ __copyright__ = 'Copyright 2018 United Kingdom Research and Innovation'
 __license__ = 'BSD - see LICENSE file in top-level package directory'
 __contact__ = 'richard.d.smith@stfc.ac.uk'
 
-from typing import List, Union
+from typing import Dict, List, Optional, Union
 import functools
 
 NumType = Union[float, int]
@@ -19,6 +19,8 @@ class Coordinates:
     Takes care of coordinate transformations
     """
 
+    __slots__ = ('minlon', 'maxlon', 'minlat', 'maxlat')
+
     def __init__(self, minlon, maxlon, minlat, maxlat):
         self.minlon = minlon
         self.maxlon = maxlon
@@ -42,6 +44,23 @@ class Coordinates:
 
         return cls(minlon, maxlon, minlat, maxlat)
 
+    @staticmethod
+    def geojson_to_wgs84(
+        envelopes: List[Optional[List[List[NumType]]]]
+    ) -> List[Optional[List[NumType]]]:
+        """
+        Converts a batch of GeoJSON formatted coordinates to WGS84 in one
+        pass, without building an object for each. Missing coordinates give
+        None.
+
+        :param envelopes: GeoJSON formatted coordinates for a page of documents
+        """
+
+        return [
+            [c[0][0], c[1][1], c[1][0], c[0][1]] if c else None
+            for c in envelopes
+        ]
+
     @classmethod
     def from_wgs84(cls, coordinates: List) -> 'Coordinates':
         """
@@ -49,8 +68,12 @@ class Coordinates:
 
         [minLon, minLat, maxLon, maxLat]
 
+        or, with heights, [minLon, minLat, minHeight, maxLon, maxLat, maxHeight]
+
         :param coordinates: WGS84 formatted coordinates
         """
+        if len(coordinates) == 6:
+            coordinates = [coordinates[0], coordinates[1], coordinates[3], coordinates[4]]
 
         minlon = coordinates[0]
         maxlon = coordinates[2]
@@ -77,6 +100,37 @@ class Coordinates:
 
         return [[self.minlon, self.maxlat],[self.maxlon, self.minlat]]
 
+    @property
+    def crosses_antimeridian(self) -> bool:
+        return self.minlon > self.maxlon
+
+    def to_fields(self) -> Dict[str, NumType]:
+        """
+        Exports the coordinates as the numeric bbox fields. Boxes crossing the
+        antimeridian are unwrapped, so maxLon runs on past 180.
+        """
+        maxlon = self.maxlon + 360 if self.crosses_antimeridian else self.maxlon
+
+        return {
+            'bbox_minlon': self.minlon,
+            'bbox_minlat': self.minlat,
+            'bbox_maxlon': maxlon,
+            'bbox_maxlat': self.maxlat,
+        }
+
+    def centroid(self) -> Dict[str, NumType]:
+        """
+        Exports the centre of the box as a geo_point. The centre of a box
+        crossing the antimeridian is on the far side of it.
+        """
+        maxlon = self.maxlon + 360 if self.crosses_antimeridian else self.maxlon
+        lon = (self.minlon + maxlon) / 2
+
+        return {
+            'lat': (self.minlat + self.maxlat) / 2,
+            'lon': lon - 360 if lon > 180 else lon,
+        }
+
 
 def rgetattr(obj, attr, *args):
     """
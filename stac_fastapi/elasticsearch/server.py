@@ -0,0 +1,120 @@
+# encoding: utf-8
+"""
+Production server.
+
+Runs the app under gunicorn with uvicorn workers, configured from the
+settings module rather than command line flags::
+
+    stac-fastapi-elasticsearch
+
+The app is imported once in the master process and forked into the workers,
+so settings, mappings and other read-only state are shared copy-on-write.
+Connections to Elasticsearch are opened per worker after the fork. On
+``SIGTERM`` workers stop accepting connections and finish their in-flight
+requests for up to ``SERVER_GRACEFUL_TIMEOUT`` seconds.
+
+For development, ``python -m stac_fastapi.elasticsearch.run`` serves a single
+reloading process instead.
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+import gc
+import multiprocessing
+
+from stac_fastapi.elasticsearch.config import settings
+
+try:
+    from gunicorn.app.base import BaseApplication
+    from uvicorn.workers import UvicornWorker
+except ImportError:
+    raise RuntimeError(
+        "gunicorn and uvicorn must be installed to run the production server, "
+        "install stac_fastapi.elasticsearch[server]"
+    )
+
+
+class StacUvicornWorker(UvicornWorker):
+    """
+    Uvicorn worker using the event loop and HTTP parser from the settings.
+    ``auto`` picks uvloop and httptools when they are installed.
+    """
+
+    CONFIG_KWARGS = {
+        "loop": getattr(settings, "SERVER_LOOP", "auto"),
+        "http": getattr(settings, "SERVER_HTTP", "auto"),
+    }
+
+
+def default_workers() -> int:
+    """
+    One async worker per CPU keeps every core busy without oversubscribing.
+    """
+    return multiprocessing.cpu_count()
+
+
+def post_fork(server, worker) -> None:
+    """
+    Open fresh Elasticsearch connections in each worker, rather than sharing
+    any made while the app was loaded in the master.
+    """
+    from stac_fastapi.elasticsearch.session import Session
+
+    Session.create_from_settings(settings)
+
+
+def server_options() -> dict:
+    """
+    Return the gunicorn settings read from the settings module.
+    """
+    return {
+        "bind": f"{settings.APP_HOST}:{settings.APP_PORT}",
+        "workers": getattr(settings, "SERVER_WORKERS", None) or default_workers(),
+        "worker_class": f"{__name__}.StacUvicornWorker",
+        "preload_app": getattr(settings, "SERVER_PRELOAD", True),
+        "keepalive": getattr(settings, "SERVER_KEEPALIVE", 5),
+        "backlog": getattr(settings, "SERVER_BACKLOG", 2048),
+        "timeout": getattr(settings, "SERVER_TIMEOUT", 60),
+        "graceful_timeout": getattr(settings, "SERVER_GRACEFUL_TIMEOUT", 30),
+        "max_requests": getattr(settings, "SERVER_MAX_REQUESTS", 0),
+        "max_requests_jitter": getattr(settings, "SERVER_MAX_REQUESTS_JITTER", 0),
+        "forwarded_allow_ips": getattr(settings, "SERVER_FORWARDED_ALLOW_IPS", "127.0.0.1"),
+        "accesslog": getattr(settings, "SERVER_ACCESS_LOG", None),
+        "post_fork": post_fork,
+    }
+
+
+class Server(BaseApplication):
+    """
+    Gunicorn application serving the STAC API.
+    """
+
+    def __init__(self, options: dict = None) -> None:
+        self.options = options or server_options()
+        super().__init__()
+
+    def load_config(self) -> None:
+        for key, value in self.options.items():
+            if value is not None:
+                self.cfg.set(key, value)
+
+    def load(self):
+        from stac_fastapi.elasticsearch.app import app
+
+        # Keep the objects created while loading out of later collections,
+        # so the workers don't touch, and copy, the shared pages
+        if self.cfg.preload_app:
+            gc.freeze()
+
+        return app
+
+
+def main():
+    Server().run()
+
+
+if __name__ == "__main__":
+    main()
@@ -8,12 +8,30 @@ __copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
 __license__ = "BSD - see LICENSE file in top-level package directory"
 __contact__ = "richard.d.smith@stfc.ac.uk"
 
+import contextvars
+from concurrent.futures import Future, ThreadPoolExecutor
 from types import ModuleType
 
 import attr
 from elasticsearch import Elasticsearch
 from elasticsearch_dsl import connections
 
+from stac_fastapi.elasticsearch.config import settings
+
+# Shared pool for running Elasticsearch requests concurrently
+executor = ThreadPoolExecutor(
+    max_workers=getattr(settings, "SEARCH_MAX_WORKERS", 10),
+    thread_name_prefix="elasticsearch",
+)
+
+
+def submit(fn, *args, **kwargs) -> Future:
+    """
+    Run ``fn`` on the shared pool in a copy of the caller's context, so
+    context variables set for the request are seen by the job.
+    """
+    return executor.submit(contextvars.copy_context().run, fn, *args, **kwargs)
+
 
 @attr.s
 class Session:
@@ -29,6 +47,13 @@ class Session:
         # Create the 'default' connection, available globally
         connections.create_connection(**settings.ELASTICSEARCH_CONNECTION)
 
+        # Catalogs on other clusters get a connection named after the catalog
+        for catalog, config in settings.CATALOGS.items():
+            if isinstance(config, dict) and "ELASTICSEARCH_CONNECTION" in config:
+                connections.create_connection(
+                    alias=catalog, **config["ELASTICSEARCH_CONNECTION"]
+                )
+
         return cls(
             client=connections.get_connection(),
         )
@@ -0,0 +1,360 @@
+# encoding: utf-8
+"""
+Per collection statistics.
+
+Item and asset counts, the total asset size and the extent of the items are
+stored on each collection document, so collection pages read them without
+querying the item and asset indexes. Writes adjust them incrementally with a
+scripted update. Extents only grow incrementally, so after deletions they
+are brought back in line by recomputing from the indexes::
+
+    python -m stac_fastapi.elasticsearch.statistics [COLLECTION_ID ...]
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+import argparse
+import logging
+from datetime import datetime, timezone
+from typing import Iterable, Optional, Type
+
+import attr
+from dateutil.parser import parse as parse_date
+from elasticsearch import NotFoundError
+from elasticsearch_dsl import connections
+from starlette.requests import Request
+
+from stac_fastapi.elasticsearch.models import database
+
+from .utils import get_catalog, multi_search
+
+logger = logging.getLogger(__name__)
+
+STATISTICS_SCRIPT = """
+if (ctx._source.statistics == null) {
+    ctx._source.statistics = [:];
+}
+def s = ctx._source.statistics;
+for (key in ['item_count', 'asset_count', 'asset_size']) {
+    s[key] = (s[key] == null ? 0 : s[key]) + params[key];
+}
+if (params.start_datetime != null && (s.start_datetime == null || params.start_datetime.compareTo(s.start_datetime) < 0)) {
+    s.start_datetime = params.start_datetime;
+}
+if (params.end_datetime != null && (s.end_datetime == null || params.end_datetime.compareTo(s.end_datetime) > 0)) {
+    s.end_datetime = params.end_datetime;
+}
+if (params.bbox != null) {
+    if (s.bbox == null) {
+        s.bbox = params.bbox;
+    } else {
+        def a = s.bbox;
+        def b = params.bbox;
+        double aw = a[2] - a[0];
+        if (aw < 0) { aw += 360; }
+        double bw = b[2] - b[0];
+        if (bw < 0) { bw += 360; }
+        double fromA = Math.max(aw, ((b[0] - a[0]) % 360 + 360) % 360 + bw);
+        double fromB = Math.max(bw, ((a[0] - b[0]) % 360 + 360) % 360 + aw);
+        double minlon = fromA <= fromB ? a[0] : b[0];
+        double maxlon = minlon + Math.min(fromA, fromB);
+        if (maxlon - minlon >= 360) {
+            minlon = -180;
+            maxlon = 180;
+        } else if (maxlon > 180) {
+            maxlon -= 360;
+        }
+        s.bbox = [minlon, Math.min(a[1], b[1]), maxlon, Math.max(a[3], b[3])];
+    }
+}
+s.updated = params.updated;
+"""
+
+# The numeric bbox fields aggregated by compute, see Coordinates.to_fields
+EXTENT_FIELDS = ("bbox_minlon", "bbox_minlat", "bbox_maxlon", "bbox_maxlat")
+
+
+def merge_bbox(a: Optional[list], b: Optional[list]) -> Optional[list]:
+    """
+    Return the smallest bbox covering two 2D WGS84 bboxes, as
+    ``STATISTICS_SCRIPT`` merges them. Longitudes are treated as arcs, so
+    boxes crossing the antimeridian, with minLon > maxLon, merge into boxes
+    which still cross it.
+    """
+    if a is None or b is None:
+        return a or b
+
+    def width(bbox) -> float:
+        return bbox[2] - bbox[0] + (360 if bbox[0] > bbox[2] else 0)
+
+    # Start from either box and run on past the end of the other
+    from_a = max(width(a), (b[0] - a[0]) % 360 + width(b))
+    from_b = max(width(b), (a[0] - b[0]) % 360 + width(a))
+
+    minlon = a[0] if from_a <= from_b else b[0]
+    maxlon = minlon + min(from_a, from_b)
+
+    if maxlon - minlon >= 360:
+        minlon, maxlon = -180, 180
+    elif maxlon > 180:
+        maxlon -= 360
+
+    return [minlon, min(a[1], b[1]), maxlon, max(a[3], b[3])]
+
+
+def utc_timestamp(value) -> Optional[str]:
+    """
+    Normalise a date to a UTC ISO 8601 string, so timestamps compare in
+    order as strings.
+    """
+    if not value:
+        return None
+
+    if not isinstance(value, datetime):
+        value = parse_date(value)
+
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+
+    return value.astimezone(timezone.utc).strftime("%Y-%m-%dT%H:%M:%SZ")
+
+
+def item_delta(item: dict, sign: int = 1, assets: Iterable[dict] = ()) -> dict:
+    """
+    Return the change to a collection's statistics from adding (``sign=1``)
+    or removing (``sign=-1``) a STAC item and its asset documents. Asset
+    sizes are read from the documents as stored, which is what
+    :func:`compute` sums. Removals do not shrink the extent.
+    """
+    assets = list(assets)
+    properties = item.get("properties") or {}
+
+    delta = {
+        "item_count": sign,
+        "asset_count": sign * len(assets),
+        "asset_size": sign * sum(asset.get("size") or 0 for asset in assets),
+        "start_datetime": None,
+        "end_datetime": None,
+        "bbox": None,
+    }
+
+    if sign > 0:
+        delta["start_datetime"] = utc_timestamp(
+            properties.get("start_datetime") or properties.get("datetime")
+        )
+        delta["end_datetime"] = utc_timestamp(
+            properties.get("end_datetime") or properties.get("datetime")
+        )
+
+        if bbox := item.get("bbox"):
+            # Drop the heights from 3D bboxes
+            if len(bbox) == 6:
+                bbox = [bbox[0], bbox[1], bbox[3], bbox[4]]
+
+            delta["bbox"] = list(bbox)
+
+    return delta
+
+
+def write_target(catalog: str = None) -> dict:
+    """
+    Return the collection index and connection to write statistics to.
+    """
+    table = database.ElasticsearchCollection
+
+    if catalog in table.catalog_indexes:
+        return table.catalog_indexes[catalog]
+
+    return {"index": table._index._name, "using": "default"}
+
+
+def apply_delta(collection_id: str, delta: dict, catalog: str = None) -> None:
+    """
+    Adjust the statistics of a collection in place.
+    """
+    target = write_target(catalog)
+    es = connections.get_connection(target["using"])
+
+    es.update(
+        index=target["index"],
+        id=collection_id,
+        body={
+            "script": {
+                "source": STATISTICS_SCRIPT,
+                "lang": "painless",
+                "params": {**delta, "updated": utc_timestamp(datetime.utcnow())},
+            }
+        },
+        retry_on_conflict=5,
+    )
+
+
+def compute(collection_id: str, catalog: str = None) -> dict:
+    """
+    Compute the statistics of a collection from the item and asset indexes,
+    in one round trip.
+    """
+    items = (
+        database.ElasticsearchItem.search(catalog=catalog)
+        .filter("term", collection_id=collection_id)
+        .extra(size=0, track_total_hits=True)
+    )
+    items.aggs.metric("min_datetime", "min", field="properties.datetime")
+    items.aggs.metric("min_start", "min", field="properties.start_datetime")
+    items.aggs.metric("max_datetime", "max", field="properties.datetime")
+    items.aggs.metric("max_end", "max", field="properties.end_datetime")
+
+    # Boxes crossing the antimeridian are stored unwrapped, with maxLon past
+    # 180, so they are bounded apart from the others and the two merged
+    for name, bbox_maxlon in (("bbox", {"lte": 180}), ("crossing", {"gt": 180})):
+        bucket = items.aggs.bucket(name, "filter", range={"bbox_maxlon": bbox_maxlon})
+        for field in EXTENT_FIELDS:
+            metric = "max" if field.startswith("bbox_max") else "min"
+            bucket.metric(field, metric, field=field)
+
+    assets = (
+        database.ElasticsearchAsset.search(catalog=catalog)
+        .filter("term", collection_id=collection_id)
+        .extra(size=0, track_total_hits=True)
+    )
+    assets.aggs.metric("size", "sum", field="size")
+
+    responses = multi_search(
+        {"items": items, "assets": assets},
+        using=database.ElasticsearchItem.catalog_index(catalog)["using"],
+    )
+    item_aggs = responses["items"].aggregations
+
+    def timestamps(*names) -> list:
+        return [
+            utc_timestamp(getattr(item_aggs, name).value_as_string)
+            for name in names
+            if getattr(item_aggs, name).value is not None
+        ]
+
+    starts = timestamps("min_datetime", "min_start")
+    ends = timestamps("max_datetime", "max_end")
+
+    bbox = None
+    for name in ("bbox", "crossing"):
+        bucket = getattr(item_aggs, name)
+        if not bucket.doc_count:
+            continue
+
+        minlon, minlat, maxlon, maxlat = (
+            getattr(bucket, field).value for field in EXTENT_FIELDS
+        )
+        if maxlon - minlon >= 360:
+            minlon, maxlon = -180, 180
+        elif maxlon > 180:
+            maxlon -= 360
+
+        bbox = merge_bbox(bbox, [minlon, minlat, maxlon, maxlat])
+
+    return {
+        "item_count": responses["items"].hits.total.value,
+        "asset_count": responses["assets"].hits.total.value,
+        "asset_size": int(responses["assets"].aggregations.size.value or 0),
+        "start_datetime": min(starts) if starts else None,
+        "end_datetime": max(ends) if ends else None,
+        "bbox": bbox,
+        "updated": utc_timestamp(datetime.utcnow()),
+    }
+
+
+def recompute(collection_id: str, catalog: str = None) -> dict:
+    """
+    Recompute and store the statistics of a collection.
+    """
+    statistics = compute(collection_id, catalog)
+    target = write_target(catalog)
+
+    connections.get_connection(target["using"]).update(
+        index=target["index"],
+        id=collection_id,
+        body={"doc": {"statistics": statistics}},
+        retry_on_conflict=5,
+    )
+
+    return statistics
+
+
+@attr.s
+class StatisticsClient:
+    """
+    Client for the collection statistics endpoint
+    """
+
+    collection_table: Type[database.ElasticsearchCollection] = attr.ib(
+        default=database.ElasticsearchCollection
+    )
+
+    def get_statistics(
+        self, collection_id: str, request: Request, **kwargs
+    ) -> dict:
+        """Get the statistics of a collection.
+
+        Called with `GET /collections/{collection_id}/statistics`.
+
+        Returns:
+            The stored statistics of the collection.
+        """
+        try:
+            collection = self.collection_table.get(
+                id=collection_id,
+                catalog=get_catalog(request),
+                _source_includes=["statistics"],
+            )
+        except NotFoundError:
+            raise (NotFoundError(404, f"Collection: {collection_id} not found"))
+
+        return {
+            "collection": collection_id,
+            "statistics": collection.get_statistics(),
+        }
+
+
+def parse_args():
+    parser = argparse.ArgumentParser(
+        description="Recompute the statistics stored on each collection"
+    )
+    parser.add_argument(
+        "collections",
+        nargs="*",
+        help="Collections to recompute. Defaults to every collection",
+    )
+    parser.add_argument("--catalog", help="Only recompute collections in CATALOG")
+
+    return parser.parse_args()
+
+
+def main():
+
+    from stac_fastapi.elasticsearch.config import settings
+    from stac_fastapi.elasticsearch.session import Session
+
+    args = parse_args()
+    Session.create_from_settings(settings)
+
+    collection_ids = args.collections or [
+        hit.meta.id
+        for hit in database.ElasticsearchCollection.search(catalog=args.catalog)
+        .source(False)
+        .scan()
+    ]
+
+    for collection_id in collection_ids:
+        try:
+            statistics = recompute(collection_id, args.catalog)
+        except Exception as exc:
+            logger.error("Unable to recompute %s: %s", collection_id, exc)
+            continue
+
+        print(collection_id, statistics)
+
+
+if __name__ == "__main__":
+    main()
@@ -9,11 +9,14 @@ __license__ = 'BSD - see LICENSE file in top-level package directory'
 __contact__ = 'richard.d.smith@stfc.ac.uk'
 
 import http
-from typing import Dict
+from typing import Dict, List
 from urllib.error import HTTPError
 
 import starlette.requests
+from elasticsearch import ConflictError as ElasticsearchConflictError
 from elasticsearch import NotFoundError
+from elasticsearch.helpers import bulk
+from elasticsearch_dsl import connections
 from fastapi import Request, HTTPException
 from stac_fastapi.types.errors import ConflictError
 from stac_fastapi.types import stac as stac_types
@@ -28,6 +31,21 @@ from stac_fastapi.elasticsearch.models.serializers import (
     CollectionSerializer,
     AssetSerializer)
 from stac_fastapi.elasticsearch.models.transactions_validator import TransactionsValidator
+from stac_fastapi.elasticsearch import conditional, statistics
+from stac_fastapi.elasticsearch.utils import merge_patch
+
+# Replaces the STAC fields of an item, removing those the new item has no value for,
+# and leaves the rest
+ITEM_UPDATE_SCRIPT = """
+for (key in params.stac_fields) {
+    if (!params.doc.containsKey(key)) {
+        ctx._source.remove(key);
+    }
+}
+for (entry in params.doc.entrySet()) {
+    ctx._source[entry.getKey()] = entry.getValue();
+}
+"""
 
 
 class TransactionsClient(BaseTransactionsClient):
@@ -42,14 +60,10 @@ class TransactionsClient(BaseTransactionsClient):
             The item that was created.
         """
         request: Request = kwargs['request']
-        base_url = str(request.base_url)
         collection_id = str(request.path_params.get('collection_id'))
         item_id = str(item.get('id'))
 
-        try:
-            ElasticsearchCollection.get(id=collection_id)
-        except NotFoundError:
-            raise NotFoundError(404, f'Collection: {collection_id} not found')
+        TransactionsValidator.item_validator(item, collection_id)
 
         try:
             db_item = ElasticsearchItem.get(id=item_id)
@@ -61,50 +75,237 @@ class TransactionsClient(BaseTransactionsClient):
 
         db_item = ItemSerializer.stac_to_db(item)
         db_item.save()
-        if assets := item.get('assets'):
-            for asset_id, asset in assets.items():
-                self.create_asset({asset_id: asset}, db_item.meta.id)
+        asset_docs = [
+            self.create_asset({asset_id: asset}, db_item.meta.id, collection_id).to_dict()
+            for asset_id, asset in (item.get('assets') or {}).items()
+        ]
+        statistics.apply_delta(collection_id, statistics.item_delta(item, assets=asset_docs))
         item = ElasticsearchItem.get(id=db_item.meta.id)
-        item = ItemSerializer.db_to_stac(item, base_url=base_url)
+        item = ItemSerializer.db_to_stac(item, request)
         return item
 
     def update_item(self, item: stac_types.Item, **kwargs) -> stac_types.Item:
         """Perform a complete update on an existing item.
-        Called with `PUT /collections/{collection_id}/items`. It is expected that this item already exists.  The update
-        should do a diff against the saved item and perform any necessary updates.  Partial updates are not supported
-        by the transactions extension.
+        Called with `PUT /collections/{collection_id}/items`. It is expected that this item already exists. The
+        incoming assets are diffed against the stored ones and only the added, changed and removed assets are
+        written, in one bulk request. Without assets, the stored assets are kept.
         Args:
             item: the item (must be complete)
         Returns:
             The updated item.
         """
         request: Request = kwargs['request']
-        base_url = str(request.base_url)
         collection_id = str(request.path_params.get('collection_id'))
         item_id = str(item.get('id'))
 
-        try:
-            ElasticsearchCollection.get(id=collection_id)
-        except NotFoundError:
-            raise NotFoundError(404, f'Collection: {collection_id} not found')
+        TransactionsValidator.item_validator(item, collection_id)
+        item_db = self.get_item_for_update(item_id, collection_id, request)
+
+        asset_changes = {}
+        if item.get('assets'):
+            stored = self.stored_assets(item_id)
+            asset_changes = {
+                asset_id: AssetSerializer.stac_to_db(
+                    stac_data=asset, id=asset_id, item_id=item_id, collection_id=collection_id
+                ).to_dict()
+                for asset_id, asset in item['assets'].items()
+            }
+            asset_changes.update(
+                {asset_id: None for asset_id in stored if asset_id not in item['assets']}
+            )
+        else:
+            stored = {}
+
+        self.write_item(item_db, item, asset_changes, stored, collection_id)
+
+        return ItemSerializer.db_to_stac(ElasticsearchItem.get(id=item_id), request)
+
+    def patch_item(
+            self, collection_id: str, item_id: str, patch: dict, **kwargs
+    ) -> stac_types.Item:
+        """Apply a JSON merge patch (RFC 7386) to an item.
+        Called with `PATCH /collections/{collection_id}/items/{item_id}`. Assets named in the patch are merged
+        into, or removed from, the stored assets. Other assets are not read or written.
+        Args:
+            collection_id: id of the collection.
+            item_id: id of the item.
+            patch: the merge patch
+        Returns:
+            The patched item.
+        """
+        request: Request = kwargs['request']
+        patch = dict(patch)
+        asset_patch = patch.pop('assets', None) or {}
+
+        item_db = self.get_item_for_update(item_id, collection_id, request)
+
+        # Serialize without the assets, which are patched separately
+        item_db.prefetched_assets = []
+        item = merge_patch(ItemSerializer.db_to_stac(item_db, request), patch)
+
+        if item.get('id') != item_id or item.get('collection') != collection_id:
+            raise HTTPException(status_code=400, detail='The item id and collection cannot be patched')
+
+        TransactionsValidator.item_validator(item, collection_id)
+
+        stored = self.stored_assets(item_id, asset_ids=list(asset_patch))
+        asset_changes = {}
+        for asset_id, asset in asset_patch.items():
+            if asset is None:
+                asset_changes[asset_id] = None
+            elif asset_id in stored:
+                asset_changes[asset_id] = AssetSerializer.patch(
+                    stored[asset_id], asset, item_id=item_id, collection_id=collection_id
+                )
+            else:
+                asset_changes[asset_id] = AssetSerializer.stac_to_db(
+                    stac_data=asset, id=asset_id, item_id=item_id, collection_id=collection_id
+                ).to_dict()
+
+        self.write_item(item_db, item, asset_changes, stored, collection_id)
+
+        return ItemSerializer.db_to_stac(ElasticsearchItem.get(id=item_id), request)
+
+    @staticmethod
+    def get_item_for_update(item_id: str, collection_id: str, request: Request) -> ElasticsearchItem:
+        """Fetch an item to update, checking any `If-Match` header against its ETag."""
         try:
             item_db = ElasticsearchItem.get(id=item_id)
         except NotFoundError:
             raise NotFoundError(404, f'Item: {item_id} not found')
 
-        if item.get('assets'):
-            old_item = ItemSerializer.db_to_stac(item_db, base_url=base_url)
-            for asset_id, asset in old_item.get('assets').items():
-                self.delete_asset({asset_id: asset})
+        if getattr(item_db, 'collection_id', None) != collection_id:
+            raise NotFoundError(404, f'Item: {item_id} not found')
 
-            for asset_id, asset in item.get('assets').items():
-                self.create_asset({asset_id: asset}, item_db.meta.id)
+        if if_match := request.headers.get('if-match'):
+            etag = conditional.item_validators(item_db).etag
+            tags = {conditional.opaque_tag(tag) for tag in if_match.split(',')}
+            if '*' not in tags and conditional.opaque_tag(etag) not in tags:
+                raise HTTPException(status_code=412, detail=f'Item: {item_id} has changed')
 
-        item = ItemSerializer.stac_to_db(item)
-        item_db.update(**item.to_dict())
-        item = ItemSerializer.db_to_stac(item, base_url=base_url)
+        return item_db
 
-        return item
+    @staticmethod
+    def stored_assets(item_id: str, asset_ids: list = None) -> Dict[str, ElasticsearchAsset]:
+        """Return the stored assets of an item, or the named ones, with their sequence numbers."""
+        if asset_ids is not None and not asset_ids:
+            return {}
+
+        search = ElasticsearchAsset.search().filter('term', item_id__keyword=item_id)
+        if asset_ids:
+            search = search.filter('ids', values=asset_ids)
+
+        return {
+            asset.meta.id: asset
+            for asset in search.params(seq_no_primary_term=True).scan()
+        }
+
+    @staticmethod
+    def asset_actions(
+            asset_changes: Dict[str, dict], stored: Dict[str, ElasticsearchAsset], delta: dict
+    ) -> List[dict]:
+        """Return the bulk actions which write the changed assets, adjusting the statistics `delta` to match.
+
+        Stored assets are only overwritten or deleted if unchanged since they were read, and new assets are
+        only created if they do not exist. Assets whose documents are unchanged are left out.
+        """
+        actions = []
+
+        for asset_id, doc in asset_changes.items():
+            old = stored.get(asset_id)
+            old_source = old.to_dict() if old else None
+
+            if doc == old_source:
+                continue
+
+            if old:
+                delta['asset_count'] -= 1
+                delta['asset_size'] -= old_source.get('size') or 0
+
+            action = {'_index': ElasticsearchAsset._index._name, '_id': asset_id}
+            if old:
+                action.update(
+                    _index=old.meta.index, if_seq_no=old.meta.seq_no, if_primary_term=old.meta.primary_term
+                )
+                if 'routing' in old.meta:
+                    action['routing'] = old.meta.routing
+
+            if doc is None:
+                action['_op_type'] = 'delete'
+            else:
+                action['_op_type'] = 'index' if old else 'create'
+                action['_source'] = doc
+                if ElasticsearchAsset.routing_field:
+                    action['routing'] = doc.get(ElasticsearchAsset.routing_field)
+                delta['asset_count'] += 1
+                delta['asset_size'] += doc.get('size') or 0
+
+            actions.append(action)
+
+        return actions
+
+    @staticmethod
+    def restore_assets(actions: List[dict], stored: Dict[str, ElasticsearchAsset]) -> None:
+        """Undo asset writes, putting back the stored documents and removing created ones."""
+        restore = []
+
+        for action in actions:
+            undo = {key: action[key] for key in ('_index', '_id', 'routing') if key in action}
+            if old := stored.get(action['_id']):
+                undo.update(_op_type='index', _source=old.to_dict())
+            else:
+                undo['_op_type'] = 'delete'
+            restore.append(undo)
+
+        if restore:
+            bulk(connections.get_connection(), restore, raise_on_error=False)
+
+    def write_item(
+            self,
+            item_db: ElasticsearchItem,
+            item: stac_types.Item,
+            asset_changes: Dict[str, dict],
+            stored: Dict[str, ElasticsearchAsset],
+            collection_id: str,
+    ) -> None:
+        """Write an item and its changed assets.
+
+        The changed assets are written first, in one bulk request, and the item only once they all are. The
+        item is only updated if it is unchanged since it was read, using its `_seq_no` and `_primary_term`.
+        If any write conflicts, the assets already written are restored and a 409 is raised.
+
+        Args:
+            item_db: the stored item, as read
+            item: the new item
+            asset_changes: new asset documents by id, or None for assets to remove
+            stored: the stored assets that may change, by id
+            collection_id: id of the collection.
+        """
+        item_id = item_db.meta.id
+
+        delta = statistics.item_delta(item)
+        delta['item_count'] = 0
+        actions = self.asset_actions(asset_changes, stored, delta)
+
+        if actions:
+            _, errors = bulk(connections.get_connection(), actions, raise_on_error=False)
+            if errors:
+                failed = {result.get('_id') for error in errors for result in error.values()}
+                self.restore_assets([a for a in actions if a['_id'] not in failed], stored)
+                raise ConflictError(f'Item: {item_id} assets were not all updated: {errors[:5]}')
+
+        # Replace the STAC fields wholesale, so removed properties and stale derived fields go, and keep any others
+        try:
+            item_db.update(
+                script=ITEM_UPDATE_SCRIPT,
+                doc=ItemSerializer.stac_to_db(item).to_dict(),
+                stac_fields=list(ItemSerializer.stac_fields),
+            )
+        except ElasticsearchConflictError:
+            self.restore_assets(actions, stored)
+            raise ConflictError(f'Item: {item_id} was changed by another request.')
+
+        statistics.apply_delta(collection_id, delta)
 
     def delete_item(
             self, item_id: str, collection_id: str, **kwargs
@@ -118,7 +319,6 @@ class TransactionsClient(BaseTransactionsClient):
             The deleted item.
         """
         request: Request = kwargs['request']
-        base_url = str(request.base_url)
 
         try:
             ElasticsearchCollection.get(id=collection_id)
@@ -130,14 +330,24 @@ class TransactionsClient(BaseTransactionsClient):
         except NotFoundError:
             raise NotFoundError(404, f'Item: {item_id} not found')
 
-        item = ItemSerializer.db_to_stac(db_model=item_db, base_url=base_url)
+        item = ItemSerializer.db_to_stac(item_db, request)
 
-        for asset_id, asset in item.get('assets').items():
-            self.delete_asset({asset_id: asset})
+        # Every asset of the item goes, not just those embedded in the serialized item. Their
+        # total size is read first for the collection statistics.
+        assets = ElasticsearchAsset.search().filter('term', item_id__keyword=item_id)
+        sizes = assets.extra(size=0)
+        sizes.aggs.metric('size', 'sum', field='size')
+        asset_size = int(sizes.execute().aggregations.size.value or 0)
+        deleted = assets.params(conflicts='proceed').delete()
 
         # delete item from elastic search item index
         item_db.delete()
 
+        delta = statistics.item_delta(item, sign=-1)
+        delta['asset_count'] = -deleted.deleted
+        delta['asset_size'] = -asset_size
+        statistics.apply_delta(collection_id, delta)
+
         return item
 
     def create_collection(self, collection: stac_types.Collection, **kwargs) -> stac_types.Collection:
@@ -150,6 +360,8 @@ class TransactionsClient(BaseTransactionsClient):
         """
         collection_id = str(collection.get('id'))
 
+        TransactionsValidator.collection_validator(collection)
+
         try:
             db_collection = ElasticsearchCollection.get(id=collection_id)
         except NotFoundError:
@@ -180,6 +392,8 @@ class TransactionsClient(BaseTransactionsClient):
         base_url = str(request.base_url)
         collection_id = str(collection.get('id'))
 
+        TransactionsValidator.collection_validator(collection)
+
         try:
             collection_db = ElasticsearchCollection.get(id=collection_id)
         except NotFoundError:
@@ -222,15 +436,17 @@ class TransactionsClient(BaseTransactionsClient):
         for item in items:
             self.delete_item(item.meta.id, collection_id, request)
         collection_db.delete()
+        TransactionsValidator.forget_collection(collection_id)
 
         return collection
 
     @staticmethod
-    def create_asset(asset: Dict, item_id: str):
+    def create_asset(asset: Dict, item_id: str, collection_id: str = None):
         for asset_id, data in asset.items():
             db_asset = AssetSerializer.stac_to_db(stac_data=data,
                                                   id=asset_id,
-                                                  collection_id=item_id)
+                                                  item_id=item_id,
+                                                  collection_id=collection_id)
             db_asset.save()
         return db_asset
 
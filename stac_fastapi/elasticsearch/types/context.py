@@ -16,4 +16,5 @@ class ResultContext(TypedDict, total=False):
 
     returned: int
     limit: int
-    matched: int
\ No newline at end of file
+    matched: int
+    catalogs: dict
\ No newline at end of file
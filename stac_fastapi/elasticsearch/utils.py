@@ -10,27 +10,50 @@ __contact__ = "richard.d.smith@stfc.ac.uk"
 
 # Python imports
 import collections
+import importlib
 import re
-from string import Template
+from typing import Callable, Dict
 
 from elasticsearch_dsl import Document
-from elasticsearch_dsl.query import QueryString
 
 # Typing imports
+from elasticsearch_dsl import MultiSearch as BaseMultiSearch
+from elasticsearch_dsl.response import Response
 from elasticsearch_dsl.search import Q, Search
 
 # Third-party imports
 from fastapi import HTTPException
-from pygeofilter.parsers.cql2_json import parse as parse_json2
-from pygeofilter.parsers.cql2_text import parse as parse_text
-
-# CQL Filters imports
-from pygeofilter.parsers.cql_json import parse as parse_json
-from pygeofilter_elasticsearch import to_filter
 
 # Package imports
+from stac_fastapi.elasticsearch.config import settings
+from stac_fastapi.elasticsearch.mappings import registry
 from stac_fastapi.elasticsearch.models.utils import Coordinates
 
+# Field types without doc values
+UNSORTABLE_TYPES = ("text", "geo_shape", "object", "nested")
+
+# Free text syntax accepted: boolean operators, phrases, grouping and
+# trailing wildcards. Fuzzy and proximity searches are left out.
+FREE_TEXT_FLAGS = "AND|OR|NOT|PHRASE|PRECEDENCE|PREFIX|WHITESPACE|ESCAPE"
+
+# CQL parser for each filter language. They are imported on first use, as
+# importing them builds their grammars.
+FILTER_PARSERS = {
+    "cql2-json": "pygeofilter.parsers.cql2_json",
+    "cql-text": "pygeofilter.parsers.cql2_text",
+    "cql2-text": "pygeofilter.parsers.cql2_text",
+    "cql-json": "pygeofilter.parsers.cql_json",
+}
+
+
+def get_catalog(request) -> str:
+    """
+    Return the catalog a request is scoped to, as resolved by
+    :class:`stac_fastapi.elasticsearch.middleware.CatalogMiddleware`.
+    Unscoped requests return an empty string.
+    """
+    return request.scope.get("catalog", "")
+
 
 def dict_merge(*args, add_keys=True) -> dict:
     assert len(args) >= 2, "dict_merge requires at least two dicts to merge"
@@ -76,6 +99,226 @@ def dict_merge(*args, add_keys=True) -> dict:
     return rtn_dct
 
 
+def filter_parser(filter_lang: str) -> Callable:
+    """
+    Return the CQL parser for ``filter_lang``, importing it if needed.
+    """
+    if filter_lang not in FILTER_PARSERS:
+        raise (
+            HTTPException(
+                status_code=400,
+                detail=f"Unknown filter-lang: {filter_lang}, use one of {list(FILTER_PARSERS)}",
+            )
+        )
+
+    return importlib.import_module(FILTER_PARSERS[filter_lang]).parse
+
+
+def bbox_query(coordinates: Coordinates) -> Q:
+    """
+    Return range filters on the numeric bbox fields matching documents whose
+    bbox intersects ``coordinates``.
+
+    Boxes crossing the antimeridian are split in two. Documents crossing it
+    are stored unwrapped, with maxLon past 180, so each span is also checked
+    shifted by 360.
+    """
+    if coordinates.crosses_antimeridian:
+        spans = [(coordinates.minlon, 180), (-180, coordinates.maxlon)]
+    else:
+        spans = [(coordinates.minlon, coordinates.maxlon)]
+
+    longitude = [
+        Q(
+            "bool",
+            filter=[
+                Q("range", bbox_minlon={"lte": east + shift}),
+                Q("range", bbox_maxlon={"gte": west + shift}),
+            ],
+        )
+        for west, east in spans
+        for shift in (0, 360)
+    ]
+
+    return Q(
+        "bool",
+        filter=[
+            Q("range", bbox_minlat={"lte": coordinates.maxlat}),
+            Q("range", bbox_maxlat={"gte": coordinates.minlat}),
+        ],
+        should=longitude,
+        minimum_should_match=1,
+    )
+
+
+def free_text_query(q: str) -> Q:
+    """
+    Return a ``simple_query_string`` query for the free text ``q``, searching
+    the ``FREE_TEXT_FIELDS``.
+
+    Terms starting with a wildcard, and prefixes shorter than
+    ``FREE_TEXT_MIN_PREFIX``, would expand to most of the terms in the index
+    and are rejected.
+    """
+    min_prefix = getattr(settings, "FREE_TEXT_MIN_PREFIX", 3)
+
+    for term in re.findall(r'[^\s"()|+\-~]+', q):
+        if term.startswith("*"):
+            raise (
+                HTTPException(
+                    status_code=400,
+                    detail=f"Free text terms can't start with a wildcard: {term}",
+                )
+            )
+
+        if term.endswith("*") and len(term.rstrip("*")) < min_prefix:
+            raise (
+                HTTPException(
+                    status_code=400,
+                    detail=f"Free text prefixes need at least {min_prefix} characters: {term}",
+                )
+            )
+
+    return Q(
+        "simple_query_string",
+        query=q,
+        fields=getattr(settings, "FREE_TEXT_FIELDS", ["search_text"]),
+        flags=FREE_TEXT_FLAGS,
+        lenient=True,
+    )
+
+
+def merge_patch(target, patch):
+    """
+    Apply a JSON merge patch (RFC 7386) to ``target`` and return the result.
+    ``null`` values remove keys, objects are merged and anything else replaces
+    the target value.
+    """
+    if not isinstance(patch, dict):
+        return patch
+
+    result = dict(target) if isinstance(target, dict) else {}
+
+    for key, value in patch.items():
+        if value is None:
+            result.pop(key, None)
+        else:
+            result[key] = merge_patch(result.get(key), value)
+
+    return result
+
+
+def sort_field(table: Document, name: str, catalog: str = "") -> tuple:
+    """
+    Return the field to sort on for the STAC sort field ``name`` and the type
+    to assume where an index does not map it. Only fields with doc values can
+    be sorted on.
+    """
+    if name.startswith("properties."):
+        name = name[len("properties.") :]
+
+    if name in table.sort_fields:
+        return table.sort_fields[name], None
+
+    field = registry.properties(table, catalog).get(name)
+
+    if field is None:
+        return f"properties.{name}.keyword", "keyword"
+
+    if field.type == "text" and field.keyword:
+        return field.field, "keyword"
+
+    if field.type in UNSORTABLE_TYPES:
+        raise (HTTPException(status_code=400, detail=f"Cannot sort on {name}"))
+
+    return field.field, field.type
+
+
+def get_sort(
+    table: Document, sortby: list = None, catalog: str = "", scored: bool = False
+) -> list:
+    """
+    Turn a STAC ``sortby`` into an Elasticsearch sort, ending with the table's
+    tiebreaker. Without a ``sortby``, scored searches sort by relevance and
+    the rest by ``DEFAULT_SORTBY``.
+    :param table: The table to sort
+    :param sortby: ``[{"field": ..., "direction": ...}]`` or ``["-field", ...]``
+    :param catalog: The catalog the search is scoped to
+    :param scored: Whether the search has a relevance score
+    """
+    if not sortby:
+        sortby = ["_score"] if scored else getattr(settings, "DEFAULT_SORTBY", [])
+
+    sort = []
+
+    for clause in sortby:
+        if isinstance(clause, str):
+            clause = clause.strip()
+            direction = "desc" if clause.startswith("-") else "asc"
+            name = clause.lstrip("+-")
+        else:
+            name = clause["field"]
+            direction = getattr(clause["direction"], "value", clause["direction"])
+
+        if name == "_score":
+            sort.append("_score")
+            continue
+
+        field, unmapped_type = sort_field(table, name, catalog)
+        options = {"order": direction}
+
+        if unmapped_type:
+            options["unmapped_type"] = unmapped_type
+
+        sort.append({field: options})
+
+    sort.append({table.sort_tiebreaker: {"order": "asc"}})
+
+    return sort
+
+
+class MultiSearch(BaseMultiSearch):
+    """
+    Run several searches in one ``_msearch`` round trip. Each search keeps
+    its own indexes, sent as a comma separated string.
+    """
+
+    def to_dict(self) -> list:
+        out = super().to_dict()
+
+        for header in out[::2]:
+            if isinstance(header.get("index"), list):
+                header["index"] = ",".join(header["index"])
+
+        return out
+
+
+def multi_search(
+    searches: Dict[str, Search], using: str = "default"
+) -> Dict[str, Response]:
+    """
+    Execute ``searches`` in a single round trip, returning the response to
+    each under the same key.
+    """
+    ms = MultiSearch(using=using)
+
+    for search in searches.values():
+        ms = ms.add(search)
+
+    return dict(zip(searches, ms.execute()))
+
+
+def cacheable(search: Search) -> Search:
+    """
+    Use the shard request cache for searches which return no hits, such as
+    counts and aggregations. Elasticsearch only caches these.
+    """
+    if search.to_dict().get("size") == 0:
+        return search.params(request_cache=True)
+
+    return search
+
+
 def get_queryset(client, table: Document, catalog: str = "", **kwargs) -> Search:
     """
     Turn the query into an `elasticsearch_dsl.Search object <https://elasticsearch-dsl.readthedocs.io/en/latest/api.html#search>`_
@@ -87,14 +330,14 @@ def get_queryset(client, table: Document, catalog: str = "", **kwargs) -> Search
 
     qs = table.search(catalog=catalog)
 
-    # Query list for must match queries. Equivalent to a logical AND.
+    # Query list for filter queries. Equivalent to a logical AND.
     filter_queries = []
 
     # Query list for should queries. Equivalent to a logical OR.
     should_queries = []
 
     if asset_ids := kwargs.get("asset_ids"):
-        filter_queries.append(Q("terms", asset_id=asset_ids))
+        filter_queries.append(Q("ids", values=asset_ids))
 
     if item_ids := kwargs.get("item_ids"):
         filter_queries.append(Q("terms", item_id=item_ids))
@@ -102,6 +345,9 @@ def get_queryset(client, table: Document, catalog: str = "", **kwargs) -> Search
     if collection_ids := kwargs.get("collection_ids"):
         filter_queries.append(Q("terms", collection_id=collection_ids))
 
+        if getattr(table, "routing_field", None) == "collection_id":
+            qs = qs.params(routing=",".join(collection_ids))
+
     if intersects := kwargs.get("intersects"):
         filter_queries.append(
             Q(
@@ -116,18 +362,22 @@ def get_queryset(client, table: Document, catalog: str = "", **kwargs) -> Search
         )
 
     if bbox := kwargs.get("bbox"):
-        bbox = [float(x) for x in bbox]
-        filter_queries.append(
-            Q(
-                "geo_shape",
-                spatial__bbox={
-                    "shape": {
-                        "type": "envelope",
-                        "coordinates": Coordinates.from_wgs84(bbox).to_geojson(),
-                    }
-                },
+        coordinates = Coordinates.from_wgs84([float(x) for x in bbox])
+
+        if getattr(settings, "BBOX_FIELDS", False):
+            filter_queries.append(bbox_query(coordinates))
+        else:
+            filter_queries.append(
+                Q(
+                    "geo_shape",
+                    spatial__bbox={
+                        "shape": {
+                            "type": "envelope",
+                            "coordinates": coordinates.to_geojson(),
+                        }
+                    },
+                )
             )
-        )
 
     if datetime := kwargs.get("datetime"):
         # currently based on datetime being provided in item
@@ -270,55 +520,43 @@ def get_queryset(client, table: Document, catalog: str = "", **kwargs) -> Search
         filter_queries.append(Q("terms", categories=role))
 
     if client.extension_is_enabled("FilterExtension"):
-
-        field_mapping = {
-            "datetime": "properties.datetime",
-            "bbox": "spatial.bbox.coordinates",
-        }
-
         if qfilter := kwargs.get("filter"):
-            if filter_lang := kwargs.get("filter-lang"):
-                if filter_lang == "cql2-json":
-                    ast = parse_json2(qfilter)
-                elif filter_lang == "cql-text":
-                    ast = parse_text(qfilter)
-                elif filter_lang == "cql-json":
-                    ast = parse_json(qfilter)
-            else:
-                ast = parse_json(qfilter)
+            from stac_fastapi.elasticsearch.cql import CQLCompiler
+
+            ast = filter_parser(kwargs.get("filter-lang") or "cql-json")(qfilter)
 
+            # Properties are compared by their mapped type, so numeric and
+            # date properties get range queries rather than keyword terms
             try:
-                # TODO: Add support beyond just keyword for boolean and integer filtering.
-                qfilter = to_filter(
-                    ast,
-                    field_mapping,
-                    field_default=Template("properties__${name}__keyword"),
-                )
+                qfilter = CQLCompiler.for_table(table, catalog).compile(ast)
             except NotImplementedError:
                 raise (
                     HTTPException(status_code=400, detail=f"Invalid filter expression")
                 )
             else:
-                qs = qs.query(qfilter)
+                qs = qs.filter(qfilter)
 
     if client.extension_is_enabled("FreeTextExtension"):
         if q := kwargs.get("q"):
-            qs = qs.query(QueryString(query=q, fields=["properties.*"], lenient=True))
-
-    if client.extension_is_enabled("ContextCollectionExtension"):
-        if (
-            "context_collection" in kwargs
-            and kwargs["context_collection"]
-            and not collection_ids
-        ):
-            qs.aggs.bucket("collections", "terms", field="collection_id.keyword")
+            qs = qs.query(free_text_query(q))
 
-    qs = qs.query(
-        Q(
-            "bool",
-            must=[Q("bool", should=should_queries), Q("bool", filter=filter_queries)],
+    # Structured predicates run in filter context, so they are not scored and
+    # can be cached. Only the free text query contributes a score.
+    if should_queries:
+        filter_queries.append(
+            Q("bool", should=should_queries, minimum_should_match=1)
         )
-    )
+
+    if filter_queries:
+        qs = qs.query(Q("bool", filter=filter_queries))
+
+    if getattr(table, "sort_tiebreaker", None):
+        sortby = None
+        if client.extension_is_enabled("SortExtension"):
+            sortby = kwargs.get("sortby")
+
+        scored = client.extension_is_enabled("FreeTextExtension") and kwargs.get("q")
+        qs = qs.sort(*get_sort(table, sortby, catalog, scored=bool(scored)))
 
     if client.extension_is_enabled("FieldsExtension"):
         if fields := kwargs.get("fields"):
@@ -0,0 +1,274 @@
+# encoding: utf-8
+"""
+Warm a new worker up before it reports ready.
+
+On startup the worker opens its pooled connections to Elasticsearch, reads
+the index mappings, loads the ids of the collections and sends a set of
+representative requests through the app, so that the first real requests
+don't pay for them. The requests are read from ``WARMUP_FILE``, a JSON lines
+log in the format written by ``scripts/seed_synthetic_catalogue.py``, or a
+small default set is used.
+
+``/_mgmt/ready`` answers ``503`` until warmup has finished, and ``200``
+after. Warmup failures are logged and reported but don't hold the worker
+back.
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+import asyncio
+import json
+import logging
+import time
+from contextlib import contextmanager
+from typing import List, Optional
+from urllib.parse import urlencode
+
+import attr
+from elasticsearch_dsl import connections
+from fastapi import FastAPI
+from starlette.concurrency import run_in_threadpool
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+
+from stac_fastapi.elasticsearch.config import settings
+from stac_fastapi.elasticsearch.mappings import registry
+from stac_fastapi.elasticsearch.models import database
+from stac_fastapi.elasticsearch.models.transactions_validator import known_collections
+from stac_fastapi.elasticsearch.session import executor
+
+logger = logging.getLogger(__name__)
+
+READY_PATH = "/_mgmt/ready"
+
+DEFAULT_REQUESTS = [
+    {"method": "GET", "path": "/"},
+    {"method": "GET", "path": "/collections"},
+    {"method": "GET", "path": "/search", "query": {"limit": 1}},
+    {
+        "method": "POST",
+        "path": "/search",
+        "body": {
+            "limit": 1,
+            "filter-lang": "cql-json",
+            "filter": {"eq": [{"property": "datetime"}, "2000-01-01T00:00:00Z"]},
+        },
+    },
+]
+
+
+def read_requests(path: str) -> List[dict]:
+    with open(path, encoding="utf-8") as reader:
+        return [json.loads(line) for line in reader if line.strip()]
+
+
+def connection_names() -> List[str]:
+    """
+    Return the names of the Elasticsearch connections, one per cluster.
+    """
+    return list(
+        dict.fromkeys(
+            ["default", *(database.catalog_using(c) for c in database.CATALOG_NAMES)]
+        )
+    )
+
+
+async def asgi_request(
+    app: FastAPI,
+    method: str = "GET",
+    path: str = "/",
+    query: Optional[dict] = None,
+    body: Optional[dict] = None,
+) -> int:
+    """
+    Send a request straight to the app and return the response status.
+    """
+    content = json.dumps(body).encode() if body is not None else b""
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": method.upper(),
+        "scheme": "http",
+        "path": path,
+        "raw_path": path.encode(),
+        "root_path": "",
+        "query_string": urlencode(query or {}, doseq=True).encode(),
+        "headers": [
+            (b"host", b"warmup"),
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(content)).encode()),
+        ],
+        "client": ("127.0.0.1", 0),
+        "server": ("warmup", 80),
+    }
+    messages = [{"type": "http.request", "body": content, "more_body": False}]
+    status = []
+
+    async def receive():
+        if messages:
+            return messages.pop()
+        return {"type": "http.disconnect"}
+
+    async def send(message):
+        if message["type"] == "http.response.start":
+            status.append(message["status"])
+
+    await app(scope, receive, send)
+
+    return status[0] if status else 500
+
+
+@attr.s
+class Warmup:
+    """
+    Warms a worker up and tracks when it is ready
+
+    :param app: The app to send the warmup requests to
+    :param requests_file: JSON lines file of warmup requests
+    :param connections: Number of connections to open to each cluster
+    """
+
+    app: FastAPI = attr.ib()
+    requests_file: Optional[str] = attr.ib(default=None)
+    connections: int = attr.ib(default=10)
+    finished: bool = attr.ib(default=False)
+    timings: dict = attr.ib(factory=dict)
+    errors: list = attr.ib(factory=list)
+    task: Optional[asyncio.Task] = attr.ib(default=None)
+
+    @contextmanager
+    def stage(self, name: str):
+        """
+        Time a stage of the warmup, recording rather than raising its errors.
+        """
+        started = time.perf_counter()
+        try:
+            yield
+        except Exception as exc:
+            logger.warning("Warmup %s failed: %s", name, exc)
+            self.errors.append(f"{name}: {exc}")
+        finally:
+            self.timings[f"{name}_s"] = round(time.perf_counter() - started, 3)
+
+    def open_connections(self) -> None:
+        """
+        Fill the connection pools by sending concurrent pings to each cluster.
+        """
+        for name in connection_names():
+            es = connections.get_connection(name)
+            list(executor.map(lambda _: es.ping(), range(self.connections)))
+
+    def load_mappings(self) -> None:
+        for table in (
+            database.ElasticsearchCollection,
+            database.ElasticsearchItem,
+            database.ElasticsearchAsset,
+        ):
+            for catalog in [None, *database.CATALOG_NAMES]:
+                registry.get(table, catalog)
+
+    def load_collections(self) -> None:
+        """
+        Remember the existing collections, so the first writes to each skip
+        the existence check.
+        """
+        search = database.ElasticsearchCollection.search().source(False)
+
+        for hit in search[: known_collections.maxsize].execute():
+            known_collections.set(hit.meta.id, True)
+
+    async def send_requests(self) -> None:
+        requests = (
+            read_requests(self.requests_file)
+            if self.requests_file
+            else DEFAULT_REQUESTS
+        )
+
+        for request in requests:
+            status = await asgi_request(
+                self.app,
+                method=request.get("method", "GET"),
+                path=request["path"],
+                query=request.get("query"),
+                body=request.get("body"),
+            )
+
+            if status >= 500:
+                self.errors.append(f"requests: {request['path']} returned {status}")
+
+    async def run(self) -> None:
+        started = time.perf_counter()
+
+        for name, stage in (
+            ("connections", self.open_connections),
+            ("mappings", self.load_mappings),
+            ("collections", self.load_collections),
+        ):
+            with self.stage(name):
+                await run_in_threadpool(stage)
+
+        with self.stage("requests"):
+            await self.send_requests()
+
+        self.timings["total_s"] = round(time.perf_counter() - started, 3)
+        self.finished = True
+
+        logger.info(
+            "Warmed up in %ss with %d errors: %s",
+            self.timings["total_s"],
+            len(self.errors),
+            self.timings,
+        )
+
+    async def start(self) -> None:
+        """
+        Startup handler running the warmup in the background, so the worker
+        can answer readiness checks meanwhile.
+        """
+        self.task = asyncio.ensure_future(self.run())
+
+    def status(self) -> dict:
+        return {
+            "ready": self.finished,
+            "warmup": self.timings,
+            "errors": self.errors,
+        }
+
+
+async def ready(request: Request) -> JSONResponse:
+    """
+    Readiness check, failing until warmup has finished.
+    """
+    warmup = request.app.state.warmup
+    status = warmup.status()
+    status["startup"] = getattr(request.app.state, "startup_timings", {})
+
+    return JSONResponse(status, status_code=200 if warmup.finished else 503)
+
+
+def install_warmup(
+    app: FastAPI,
+    enabled: bool = True,
+    requests_file: Optional[str] = None,
+    connections: Optional[int] = None,
+) -> Warmup:
+    """
+    Add the readiness check to ``app`` and warm it up on startup.
+    """
+    warmup = Warmup(
+        app=app,
+        requests_file=requests_file,
+        connections=connections or getattr(settings, "SEARCH_MAX_WORKERS", 10),
+        finished=not enabled,
+    )
+    app.state.warmup = warmup
+    app.add_api_route(READY_PATH, ready, include_in_schema=False)
+
+    if enabled:
+        app.add_event_handler("startup", warmup.start)
+
+    return warmup
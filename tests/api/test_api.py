@@ -220,6 +220,24 @@ def test_bbox(app_client):
     assert len(resp_json["features"]) == 1
 
 
+def test_bbox_fields(app_client, monkeypatch):
+    """Searches on the numeric bbox fields match the geo_shape search"""
+    from stac_fastapi.elasticsearch.config import settings
+
+    def search_ids(bbox):
+        resp = app_client.post("/search", json={"bbox": bbox, "limit": 100})
+        assert resp.status_code == 200
+        return {feature["id"] for feature in resp.json()["features"]}
+
+    bbox = [-20.0, 40.0, 20.0, 70.0]
+    expected = search_ids(bbox)
+
+    monkeypatch.setattr(settings, "BBOX_FIELDS", True, raising=False)
+
+    assert search_ids(bbox) == expected
+    assert search_ids([-20.0, 40.0, 0.0, 20.0, 70.0, 1000.0]) == expected
+
+
 @pytest.mark.skip(reason="Skipping for now. Need to change the mapping on the indices to "
                          "make collection_id and item_id keyword fields then update the "
                          "filter to reflect this change. There is a mismatch between the "
@@ -351,3 +369,219 @@ def test_asset_datetime_non_interval(app_client):
         resp_json = resp.json()
         assert resp_json["context"]["returned"] == resp_json["context"]["matched"] == 2
         assert resp_json["features"][0]["properties"]["datetime"][0:19] == date[0:19]
+
+
+def test_collection_queryables_typed(app_client):
+    """Queryables take their types from the item index mappings"""
+
+    resp = app_client.get("/collections/d5337672a8ca3a389964454059767426/queryables")
+    assert resp.status_code == 200
+    properties = resp.json()["properties"]
+
+    assert properties["flight_number"]["type"] == "string"
+    assert properties["flight_number"]["enum"] == ["b069"]
+
+    # Ranges are only given for numbers
+    for prop in properties.values():
+        if prop["type"] in ("string", "boolean"):
+            assert "minimum" not in prop and "maximum" not in prop
+        if prop["type"] in ("number", "integer") and "minimum" in prop:
+            assert isinstance(prop["minimum"], (int, float))
+
+
+def test_facets(app_client):
+    """Facets return every bucket for the search"""
+
+    resp = app_client.get("/facets", params={"facets": "collection"})
+    assert resp.status_code == 200
+
+    buckets = resp.json()["facets"]["collection"]
+    assert {"key": "d5337672a8ca3a389964454059767426", "count": 1} in buckets
+
+
+def test_item_assets_scoped_by_collection(app_client, monkeypatch):
+    """Item assets are listed at the item's assets link, filtered on the
+    denormalised collection id"""
+    from urllib.parse import urlparse
+
+    from stac_fastapi.elasticsearch.models.database import ElasticsearchItem
+
+    item_id = "ac7d81d52fd1541e18e3819927725bbf"
+
+    # Items embedding fewer assets than they have link to the rest
+    monkeypatch.setattr(ElasticsearchItem, "max_embedded_assets", 0)
+    resp = app_client.get(f"/collections/badc/items/{item_id}")
+    assert resp.status_code == 200
+    links = [link for link in resp.json()["links"] if link["rel"] == "assets"]
+    assert len(links) == 1
+    path = urlparse(links[0]["href"]).path
+    assert path == f"/collection/badc/items/{item_id}/assets"
+
+    resp = app_client.get(path)
+    assert resp.status_code == 200
+    assert resp.json()["features"]
+
+    resp = app_client.get(path.replace("/badc/", "/cmip5/"))
+    assert resp.status_code == 200
+    assert resp.json()["features"] == []
+
+
+def test_search_sortby_id(app_client):
+    """Items are returned in the requested order"""
+
+    resp = app_client.get("/search", params={"sortby": "id", "limit": 20})
+    assert resp.status_code == 200
+
+    ids = [feature["id"] for feature in resp.json()["features"]]
+    assert ids == sorted(ids)
+
+
+def test_search_filter_date_range(app_client):
+    """Date comparisons in a filter are merged into one range"""
+
+    resp = app_client.post(
+        "/search",
+        json={
+            "filter-lang": "cql2-json",
+            "filter": {
+                "op": "and",
+                "args": [
+                    {"op": ">=", "args": [{"property": "datetime"}, "2000-01-01T00:00:00Z"]},
+                    {"op": "<", "args": [{"property": "datetime"}, "2100-01-01T00:00:00Z"]},
+                ],
+            },
+        },
+    )
+    assert resp.status_code == 200
+    assert len(resp.json()["features"]) > 0
+
+
+def test_search_free_text(app_client):
+    """Free text searches match the copied text properties"""
+
+    for q in ("sentinel5p", "sentinel*"):
+        resp = app_client.get("/search", params={"q": q, "limit": 100})
+        assert resp.status_code == 200
+
+        features = resp.json()["features"]
+        assert features
+        assert all(
+            "sentinel5p" in feature["properties"].get("platform", [])
+            for feature in features
+        )
+
+
+def test_search_free_text_leading_wildcard(app_client):
+    """Free text terms can't start with a wildcard"""
+
+    resp = app_client.get("/search", params={"q": "*ozone"})
+    assert resp.status_code == 400
+
+
+def test_grid(app_client):
+    """The grid endpoint returns cells as GeoJSON"""
+
+    resp = app_client.get("/grid", params={"precision": 2})
+    assert resp.status_code == 200
+    assert resp.json()["type"] == "FeatureCollection"
+
+    resp = app_client.get("/grid", params={"grid": "geohash", "precision": 0})
+    assert resp.status_code == 400
+
+
+def test_histogram(app_client):
+    """The histogram counts every matching item"""
+
+    resp = app_client.get(
+        "/histogram",
+        params={"interval": "year", "collections": "d5337672a8ca3a389964454059767426"},
+    )
+    assert resp.status_code == 200
+    assert sum(bucket["count"] for bucket in resp.json()["buckets"]) == 1
+
+    resp = app_client.get("/histogram", params={"interval": "fortnight"})
+    assert resp.status_code == 400
+
+
+def test_collection_statistics(app_client):
+    """Collection statistics are read from the collection and follow writes"""
+    from stac_fastapi.elasticsearch import statistics
+
+    collection_id = "d5337672a8ca3a389964454059767426"
+    url = f"/collections/{collection_id}/statistics"
+    keys = ("item_count", "asset_count", "asset_size")
+
+    def counts():
+        resp = app_client.get(url)
+        assert resp.status_code == 200
+        assert resp.json()["collection"] == collection_id
+        stats = resp.json()["statistics"] or {}
+        return {key: stats.get(key) or 0 for key in keys}
+
+    before = counts()
+    item = {"id": "statistics-test", "properties": {}}
+    assets = [{"size": 100}, {"size": 20}]
+
+    statistics.apply_delta(collection_id, statistics.item_delta(item, assets=assets))
+    assert counts() == {
+        "item_count": before["item_count"] + 1,
+        "asset_count": before["asset_count"] + 2,
+        "asset_size": before["asset_size"] + 120,
+    }
+
+    statistics.apply_delta(
+        collection_id, statistics.item_delta(item, sign=-1, assets=assets)
+    )
+    assert counts() == before
+
+
+def test_get_item_not_modified(app_client):
+    """Items are not resent to clients with a current ETag"""
+
+    url = "/collections/badc/items/ac7d81d52fd1541e18e3819927725bbf"
+
+    resp = app_client.get(url)
+    assert resp.status_code == 200
+    etag = resp.headers["etag"]
+
+    resp = app_client.get(url, headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+    assert resp.headers["etag"] == etag
+
+
+def test_item_collection_not_modified(app_client):
+    """Pages of a collection's items are validated by the items on them"""
+
+    url = "/collections/cmip5/items"
+
+    resp = app_client.get(url, params={"limit": 2})
+    assert resp.status_code == 200
+    etag = resp.headers["etag"]
+
+    resp = app_client.get(url, params={"limit": 2}, headers={"If-None-Match": etag})
+    assert resp.status_code == 304
+
+    # Another page has other items
+    resp = app_client.get(url, params={"limit": 2, "page": 2})
+    assert resp.headers["etag"] != etag
+
+
+def test_ready_after_warmup(api_client):
+    """Readiness is reported once the worker has warmed up"""
+    import time
+
+    from starlette.testclient import TestClient
+
+    from stac_fastapi.elasticsearch.warmup import install_warmup
+
+    warmup = install_warmup(api_client.app)
+
+    with TestClient(api_client.app) as client:
+        for _ in range(100):
+            if warmup.finished:
+                break
+            time.sleep(0.1)
+
+        resp = client.get("/_mgmt/ready")
+        assert resp.status_code == 200
+        assert resp.json()["errors"] == []
@@ -15,6 +15,11 @@ from stac_fastapi.api.app import StacApi
 from stac_fastapi.elasticsearch.asset_search import AssetSearchClient
 from stac_fastapi.elasticsearch.config import settings
 from stac_fastapi.elasticsearch.core import CoreCrudClient
+from stac_fastapi.elasticsearch.extensions.facets import FacetExtension
+from stac_fastapi.elasticsearch.extensions.grid import GridExtension
+from stac_fastapi.elasticsearch.extensions.histogram import HistogramExtension
+from stac_fastapi.elasticsearch.extensions.patch import ItemPatchExtension  # noqa: F401
+from stac_fastapi.elasticsearch.extensions.statistics import StatisticsExtension
 from stac_fastapi.elasticsearch.filters import FiltersClient
 from stac_fastapi.elasticsearch.session import Session
 from stac_fastapi.elasticsearch.transactions import TransactionsClient
@@ -42,12 +47,13 @@ def extensions() -> List:
     return [
         ContextExtension(),
         # FieldsExtension(),
-        # SortExtension(),
+        SortExtension(),
         FilterExtension(client=FiltersClient()),
         FreeTextExtension(),
         ContextCollectionExtension(),
         PaginationExtension(),
         # TransactionExtension(client=TransactionsClient(), settings=settings),
+        # ItemPatchExtension(client=TransactionsClient()),
     ]
 
 
@@ -70,6 +76,10 @@ def api_client(db_session, extensions):
             settings=settings,
         )
     )
+    extensions.append(FacetExtension(extensions=extensions))
+    extensions.append(GridExtension(extensions=extensions))
+    extensions.append(HistogramExtension(extensions=extensions))
+    extensions.append(StatisticsExtension())
     return StacApi(
         settings=settings,
         extensions=extensions,
@@ -0,0 +1,110 @@
+# encoding: utf-8
+"""
+
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+import pytest
+
+from stac_fastapi.elasticsearch.models.utils import Coordinates
+from stac_fastapi.elasticsearch.utils import bbox_query
+
+
+def matches(query: dict, doc: dict) -> bool:
+    """Evaluate the bool and range queries built by bbox_query against a document"""
+    kind, body = next(iter(query.items()))
+
+    if kind == "range":
+        field, bounds = next(iter(body.items()))
+        value = doc[field]
+        return all(
+            {"lt": value < bound, "lte": value <= bound, "gt": value > bound, "gte": value >= bound}[op]
+            for op, bound in bounds.items()
+        )
+
+    filters = all(matches(q, doc) for q in body.get("filter", []))
+    should = body.get("should", [])
+    return filters and (not should or any(matches(q, doc) for q in should))
+
+
+def intersects(query_bbox: list, doc_bbox: list) -> bool:
+    query = bbox_query(Coordinates.from_wgs84(query_bbox)).to_dict()
+    return matches(query, Coordinates.from_wgs84(doc_bbox).to_fields())
+
+
+def test_to_fields():
+    assert Coordinates.from_wgs84([-10, -5, 10, 5]).to_fields() == {
+        "bbox_minlon": -10,
+        "bbox_minlat": -5,
+        "bbox_maxlon": 10,
+        "bbox_maxlat": 5,
+    }
+
+
+def test_to_fields_crossing_antimeridian():
+    """Boxes crossing the antimeridian are stored unwrapped"""
+    fields = Coordinates.from_wgs84([170, -5, -170, 5]).to_fields()
+
+    assert fields["bbox_minlon"] == 170
+    assert fields["bbox_maxlon"] == 190
+
+
+def test_to_fields_3d():
+    """Heights are dropped from 3D bboxes"""
+    assert Coordinates.from_wgs84([-10, -5, 0, 10, 5, 100]).to_fields() == (
+        Coordinates.from_wgs84([-10, -5, 10, 5]).to_fields()
+    )
+
+
+def test_bbox_query_spans():
+    """Each span is checked as given and shifted by 360"""
+    query = bbox_query(Coordinates.from_wgs84([-10, -5, 10, 5])).to_dict()
+    spans = [
+        [q["range"] for q in should["bool"]["filter"]]
+        for should in query["bool"]["should"]
+    ]
+
+    assert spans == [
+        [{"bbox_minlon": {"lte": 10}}, {"bbox_maxlon": {"gte": -10}}],
+        [{"bbox_minlon": {"lte": 370}}, {"bbox_maxlon": {"gte": 350}}],
+    ]
+    assert query["bool"]["minimum_should_match"] == 1
+
+
+def test_bbox_query_crossing_antimeridian_spans():
+    """Query boxes crossing the antimeridian are split in two"""
+    query = bbox_query(Coordinates.from_wgs84([170, -5, -170, 5])).to_dict()
+
+    assert len(query["bool"]["should"]) == 4
+
+
+@pytest.mark.parametrize(
+    "query_bbox,doc_bbox,expected",
+    [
+        # Neither crosses
+        ([-10, -10, 10, 10], [5, 5, 20, 20], True),
+        ([-10, -10, 10, 10], [20, 20, 30, 30], False),
+        ([-10, -10, 10, 10], [0, 20, 5, 30], False),
+        # The query crosses
+        ([170, -10, -170, 10], [175, 0, 178, 5], True),
+        ([170, -10, -170, 10], [-179, 0, -175, 5], True),
+        ([170, -10, -170, 10], [0, 0, 10, 10], False),
+        ([170, -10, -170, 10], [175, 20, 178, 25], False),
+        # The document crosses
+        ([172, 0, 175, 5], [170, -10, -170, 10], True),
+        ([-175, 0, -172, 5], [170, -10, -170, 10], True),
+        ([0, 0, 10, 10], [170, -10, -170, 10], False),
+        ([-160, 0, -150, 5], [170, -10, -170, 10], False),
+        # Both cross
+        ([175, -5, -175, 5], [170, -10, -170, 10], True),
+        # 3D query boxes
+        ([-10, -10, 0, 10, 10, 100], [5, 5, 20, 20], True),
+        ([170, -10, 0, -170, 10, 100], [-179, 0, -175, 5], True),
+    ],
+)
+def test_bbox_query_intersects(query_bbox, doc_bbox, expected):
+    assert intersects(query_bbox, doc_bbox) is expected
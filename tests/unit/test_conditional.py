@@ -0,0 +1,43 @@
+# encoding: utf-8
+"""
+
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+from elasticsearch_dsl import AttrDict
+
+from stac_fastapi.elasticsearch.conditional import Validators
+
+
+def doc(id, seq_no, index="stac-items"):
+    return AttrDict(
+        {"meta": {"index": index, "id": id, "seq_no": seq_no, "primary_term": 1}}
+    )
+
+
+def test_validators_follow_every_document():
+    """A page's ETag changes when any of its documents is written"""
+    page = [doc("i1", 1), doc("a1", 7, "stac-assets"), doc("i2", 3)]
+    etag = Validators.from_documents(page, 2).etag
+
+    assert Validators.from_documents(page, 2).etag == etag
+    assert Validators.from_documents(
+        [page[0], doc("a1", 8, "stac-assets"), page[2]], 2
+    ).etag != etag
+    assert Validators.from_documents(page[::-1], 2).etag != etag
+    assert Validators.from_documents(page, 3).etag != etag
+
+
+def test_validators_from_document():
+    """A single document is validated as a page of one"""
+    item = doc("i1", 1)
+
+    assert (
+        Validators.from_document(item, "v").etag
+        == Validators.from_documents([item], "v").etag
+    )
+    assert Validators.from_document(item).etag.startswith('W/"')
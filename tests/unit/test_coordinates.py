@@ -0,0 +1,33 @@
+# encoding: utf-8
+"""
+
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+from stac_fastapi.elasticsearch.models.utils import Coordinates
+
+
+def test_centroid():
+    coordinates = Coordinates.from_wgs84([-10, 40, 10, 60])
+
+    assert coordinates.centroid() == {"lat": 50, "lon": 0}
+
+
+def test_centroid_crossing_antimeridian():
+    """The centre of a box over the antimeridian is on the far side"""
+    assert Coordinates.from_wgs84([170, -10, -170, 10]).centroid() == {
+        "lat": 0,
+        "lon": 180,
+    }
+    assert Coordinates.from_wgs84([160, -10, -170, 10]).centroid() == {
+        "lat": 0,
+        "lon": 175,
+    }
+    assert Coordinates.from_wgs84([170, -10, -160, 10]).centroid() == {
+        "lat": 0,
+        "lon": -175,
+    }
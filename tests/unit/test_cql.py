@@ -0,0 +1,213 @@
+# encoding: utf-8
+"""
+
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+from datetime import datetime, timezone
+
+import pytest
+from fastapi import HTTPException
+from pygeofilter import ast
+
+from stac_fastapi.elasticsearch.cql import CQLCompiler
+from stac_fastapi.elasticsearch.mappings import FieldType
+
+compiler = CQLCompiler(
+    fields={
+        "cloud_cover": FieldType(path="properties.cloud_cover", type="float"),
+        "datetime": FieldType(path="properties.datetime", type="date"),
+        "public": FieldType(path="properties.public", type="boolean"),
+        "platform": FieldType(path="properties.platform", type="keyword"),
+    }
+)
+
+cloud_cover = ast.Attribute("cloud_cover")
+date = ast.Attribute("datetime")
+platform = ast.Attribute("platform")
+
+
+def compile(node) -> dict:
+    return compiler.compile(node).to_dict()
+
+
+def all_of(*nodes) -> ast.Node:
+    node = nodes[0]
+    for other in nodes[1:]:
+        node = ast.And(node, other)
+    return node
+
+
+def any_of(*nodes) -> ast.Node:
+    node = nodes[0]
+    for other in nodes[1:]:
+        node = ast.Or(node, other)
+    return node
+
+
+def test_flatten_and_dedupe():
+    """Nested ANDs compile to one filter, without repeated predicates"""
+    query = compile(
+        ast.And(
+            ast.Equal(platform, "sentinel5p"),
+            ast.And(ast.Equal(platform, "sentinel5p"), ast.Equal(ast.Attribute("public"), True)),
+        )
+    )
+
+    assert query == {
+        "bool": {
+            "filter": [
+                {"term": {"properties.platform": "sentinel5p"}},
+                {"term": {"properties.public": True}},
+            ]
+        }
+    }
+
+
+def test_double_negation():
+    assert compile(ast.Not(ast.Not(ast.Equal(platform, "a")))) == {
+        "term": {"properties.platform": "a"}
+    }
+
+
+def test_range_merge():
+    """Numeric bounds on one field merge into the tightest range"""
+    query = compile(
+        all_of(
+            ast.GreaterThan(cloud_cover, 1),
+            ast.GreaterEqual(cloud_cover, 3),
+            ast.LessThan(cloud_cover, 50),
+            ast.LessEqual(cloud_cover, 20),
+        )
+    )
+
+    assert query == {"range": {"properties.cloud_cover": {"gte": 3, "lte": 20}}}
+
+
+def test_range_merge_flipped():
+    """Literals on the left are flipped before merging"""
+    query = compile(all_of(ast.LessThan(5, cloud_cover), ast.GreaterEqual(cloud_cover, 5)))
+
+    assert query == {"range": {"properties.cloud_cover": {"gt": 5}}}
+
+
+def test_range_merge_dates():
+    """Dates are ordered as dates, not strings"""
+    query = compile(
+        all_of(
+            ast.GreaterThan(date, datetime(2020, 1, 1, tzinfo=timezone.utc)),
+            ast.GreaterThan(date, "2020-01-01T03:00:00+05:00"),
+            ast.LessThan(date, "2021-01-01T00:00:00Z"),
+        )
+    )
+
+    assert query == {
+        "range": {
+            "properties.datetime": {
+                "gt": "2020-01-01T00:00:00+00:00",
+                "lt": "2021-01-01T00:00:00Z",
+            }
+        }
+    }
+
+
+def test_range_unordered_bounds():
+    """Bounds which can't be ordered are kept as separate ranges"""
+    query = compile(
+        all_of(
+            ast.GreaterThan(platform, "b"),
+            ast.GreaterThan(platform, "a"),
+            ast.LessThan(platform, "z"),
+        )
+    )
+
+    assert query == {
+        "bool": {
+            "filter": [
+                {"range": {"properties.platform": {"gt": "b", "lt": "z"}}},
+                {"range": {"properties.platform": {"gt": "a"}}},
+            ]
+        }
+    }
+
+
+def test_range_unparsed_dates():
+    """Dates which don't parse are not compared as strings"""
+    query = compile(
+        all_of(ast.GreaterThan(date, "2020-01-01"), ast.GreaterThan(date, "now-1d"))
+    )
+
+    assert len(query["bool"]["filter"]) == 2
+
+
+def test_or_terms():
+    """Equalities on one field within an OR become a terms query"""
+    query = compile(
+        any_of(
+            ast.Equal(platform, "a"),
+            ast.Equal(platform, "b"),
+            ast.Equal(platform, "a"),
+            ast.Equal(cloud_cover, 1),
+        )
+    )
+
+    assert query == {
+        "bool": {
+            "should": [
+                {"terms": {"properties.platform": ["a", "b"]}},
+                {"term": {"properties.cloud_cover": 1}},
+            ],
+            "minimum_should_match": 1,
+        }
+    }
+
+
+def test_not_between():
+    """NOT flips BETWEEN rather than wrapping it"""
+    query = compile(ast.Not(ast.Between(cloud_cover, 1, 2, False)))
+
+    assert query == {
+        "bool": {"must_not": [{"range": {"properties.cloud_cover": {"gte": 1, "lte": 2}}}]}
+    }
+    assert compile(ast.Not(ast.Between(cloud_cover, 1, 2, True))) == {
+        "range": {"properties.cloud_cover": {"gte": 1, "lte": 2}}
+    }
+
+
+def test_not_in():
+    assert compile(ast.Not(ast.In(platform, ["a", "b"], False))) == {
+        "bool": {"must_not": [{"terms": {"properties.platform": ["a", "b"]}}]}
+    }
+    assert compile(ast.Not(ast.In(platform, ["a", "b"], True))) == {
+        "terms": {"properties.platform": ["a", "b"]}
+    }
+
+
+def test_is_null():
+    exists = {"exists": {"field": "properties.platform"}}
+
+    assert compile(ast.IsNull(platform, False)) == {"bool": {"must_not": [exists]}}
+    assert compile(ast.IsNull(platform, True)) == exists
+    assert compile(ast.Not(ast.IsNull(platform, False))) == exists
+
+
+@pytest.mark.parametrize(
+    "node",
+    [
+        ast.GreaterThan(cloud_cover, "high"),
+        ast.Equal(cloud_cover, True),
+        ast.Equal(ast.Attribute("public"), "yes"),
+        ast.Between(cloud_cover, "low", "high", False),
+        ast.In(cloud_cover, [1, "two"], False),
+    ],
+)
+def test_type_errors(node):
+    """Literals which can't be compared with the field are a 400"""
+    with pytest.raises(HTTPException) as exc_info:
+        compile(node)
+
+    assert exc_info.value.status_code == 400
@@ -0,0 +1,109 @@
+# encoding: utf-8
+"""
+
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+from types import SimpleNamespace
+
+from stac_fastapi.elasticsearch.models.database import (
+    ElasticsearchAsset,
+    ElasticsearchItem,
+)
+
+
+class Hits(list):
+    def __init__(self, hits, total):
+        super().__init__(hits)
+        self.total = SimpleNamespace(value=total)
+
+
+def assets_response(assets: dict, total: int = None) -> SimpleNamespace:
+    """A batched assets response, sorted by item id then asset id"""
+    hits = [
+        ElasticsearchAsset(meta={"id": asset_id}, item_id=item_id)
+        for item_id in sorted(assets)
+        for asset_id in sorted(assets[item_id])
+    ]
+    return SimpleNamespace(hits=Hits(hits, len(hits) if total is None else total))
+
+
+def items(*item_ids) -> list:
+    return [ElasticsearchItem(meta={"id": item_id}) for item_id in item_ids]
+
+
+def test_prefetch_assets_complete(monkeypatch):
+    monkeypatch.setattr(ElasticsearchItem, "max_embedded_assets", 2)
+    page = items("a", "b", "c")
+
+    ElasticsearchItem.prefetch_assets(
+        page, assets_response({"a": ["a1"], "b": ["b1", "b2", "b3"]})
+    )
+
+    assert [asset.meta.id for asset in page[0].prefetched_assets] == ["a1"]
+    assert not page[0].assets_truncated
+    assert [asset.meta.id for asset in page[1].prefetched_assets] == ["b1", "b2"]
+    assert page[1].assets_truncated
+    assert page[2].prefetched_assets == []
+
+
+def test_prefetch_assets_incomplete(monkeypatch):
+    """Items after the last asset in a partial batch fetch their own assets"""
+    monkeypatch.setattr(ElasticsearchItem, "max_embedded_assets", 2)
+    page = items("a", "b", "c", "d")
+
+    ElasticsearchItem.prefetch_assets(
+        page, assets_response({"a": ["a1"], "c": ["c1"]}, total=10)
+    )
+
+    assert [asset.meta.id for asset in page[0].prefetched_assets] == ["a1"]
+    assert page[1].prefetched_assets == []
+    assert page[2].prefetched_assets is None
+    assert page[3].prefetched_assets is None
+
+
+def test_asset_search_sorted_by_id():
+    """Embedded assets are read in a stable order, so the cap cuts the same ones"""
+    search = items("a")[0].asset_search().to_dict()
+
+    assert search["sort"] == [{"asset_id": {"order": "asc"}}]
+
+
+def test_embedded_assets_capped(monkeypatch):
+    """Items embed at most max_embedded_assets and link to the rest"""
+    monkeypatch.setattr(ElasticsearchItem, "max_embedded_assets", 2)
+    monkeypatch.setattr(
+        ElasticsearchItem,
+        "asset_search",
+        lambda self: [ElasticsearchAsset(meta={"id": f"a{i}"}) for i in range(3)],
+    )
+    item = ElasticsearchItem(meta={"id": "a"}, collection_id="c")
+
+    assert [asset.meta.id for asset in item.elasticsearch_assets] == ["a0", "a1"]
+    assert item.assets_truncated
+
+    assets_links = [
+        link for link in item.get_links("http://test/") if link["rel"] == "assets"
+    ]
+    assert [link["href"] for link in assets_links] == [
+        "http://test/collection/c/items/a/assets"
+    ]
+
+
+def test_embedded_assets_within_cap(monkeypatch):
+    """Items with no more assets than the cap embed them all without a link"""
+    monkeypatch.setattr(ElasticsearchItem, "max_embedded_assets", 2)
+    monkeypatch.setattr(
+        ElasticsearchItem,
+        "asset_search",
+        lambda self: [ElasticsearchAsset(meta={"id": f"a{i}"}) for i in range(2)],
+    )
+    item = ElasticsearchItem(meta={"id": "a"}, collection_id="c")
+
+    assert len(item.elasticsearch_assets) == 2
+    assert not item.assets_truncated
+    assert "assets" not in {link["rel"] for link in item.get_links("http://test/")}
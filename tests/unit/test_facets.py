@@ -0,0 +1,26 @@
+# encoding: utf-8
+"""
+
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+from elasticsearch_dsl import Search
+
+from stac_fastapi.elasticsearch.facets import filter_key
+
+
+def test_filter_key_same_for_every_page():
+    search = Search(using="default", index="stac-items").filter("term", type="item")
+
+    assert filter_key(search[0:10]) == filter_key(search[10:20])
+
+
+def test_filter_key_per_connection():
+    """Catalogs on other clusters with the same index names don't share keys"""
+    search = Search(index="stac-items").filter("term", type="item")
+
+    assert filter_key(search.using("default")) != filter_key(search.using("archive"))
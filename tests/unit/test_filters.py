@@ -0,0 +1,58 @@
+# encoding: utf-8
+"""
+
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+from stac_fastapi.elasticsearch.filters import summary_property
+from stac_fastapi.elasticsearch.mappings import FieldType
+
+
+def test_summary_property_string():
+    prop = summary_property("flight_number", ["b069"], None)
+
+    assert prop["type"] == "string"
+    assert prop["enum"] == ["b069"]
+    assert "minimum" not in prop
+
+
+def test_summary_property_numeric():
+    field = FieldType(path="properties.size", type="double")
+    prop = summary_property("size", [12.5, 3, None], field)
+
+    assert prop["type"] == "number"
+    assert prop["minimum"] == 3
+    assert prop["maximum"] == 12.5
+
+    field = FieldType(path="properties.year", type="long")
+    prop = summary_property("year", [2005, 1980], field)
+
+    assert prop["type"] == "integer"
+    assert (prop["minimum"], prop["maximum"]) == (1980, 2005)
+
+
+def test_summary_property_date():
+    """minimum and maximum are numeric keywords, dates don't get them"""
+    field = FieldType(path="properties.start_datetime", type="date")
+    prop = summary_property(
+        "start_datetime", ["2005-01-05T00:00:00Z", "2004-01-05T00:00:00Z"], field
+    )
+
+    assert prop == {
+        "title": "Start Datetime",
+        "type": "string",
+        "format": "date-time",
+    }
+
+
+def test_summary_property_boolean():
+    field = FieldType(path="properties.processed", type="boolean")
+
+    assert summary_property("processed", [True, False], field) == {
+        "title": "Processed",
+        "type": "boolean",
+    }
@@ -0,0 +1,31 @@
+# encoding: utf-8
+"""
+
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+import pytest
+
+from stac_fastapi.elasticsearch.middleware import ProfilingMiddleware
+
+
+@pytest.mark.parametrize(
+    "scope,requested",
+    [
+        ({"query_string": b"profile=s%C3%A9cret"}, True),
+        ({"headers": [(b"x-profile", "sécret".encode())]}, True),
+        ({"query_string": b"profile=%C3%A9"}, False),
+        ({"query_string": b"profile=%FF"}, False),
+        ({"headers": [(b"x-profile", b"\xff\xfe")]}, False),
+        ({}, False),
+    ],
+)
+def test_profiling_requested(scope, requested):
+    """Tokens are compared as bytes, so any header or parameter value is safe"""
+    middleware = ProfilingMiddleware(app=None, token="sécret")
+
+    assert middleware.requested(scope) is requested
@@ -0,0 +1,98 @@
+# encoding: utf-8
+"""
+
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+from stac_fastapi.elasticsearch.models.database import ElasticsearchAsset
+from stac_fastapi.elasticsearch.models.serializers import AssetSerializer, ItemSerializer
+
+
+def test_item_stac_to_db_sets_item_id():
+    """Items written through the API get the item_id sort tiebreaker"""
+    db_item = ItemSerializer.stac_to_db(
+        {"id": "item-1", "collection": "faam", "properties": {}}
+    )
+
+    assert db_item.meta.id == "item-1"
+    assert db_item.item_id == "item-1"
+    assert db_item.collection_id == "faam"
+
+
+def test_item_stac_to_db_sets_spatial():
+    """Items written through the API can be found by geo_shape bbox searches"""
+    db_item = ItemSerializer.stac_to_db(
+        {"id": "item-1", "bbox": [-10, -5, 10, 5], "properties": {}}
+    ).to_dict()
+
+    assert db_item["spatial"]["bbox"] == {
+        "type": "envelope",
+        "coordinates": [[-10, 5], [10, -5]],
+    }
+
+
+def test_asset_stac_to_db_sets_asset_id():
+    """Assets written through the API get the asset_id sort tiebreaker"""
+    db_asset = AssetSerializer.stac_to_db(
+        {"uri": "/badc/faam/data.nc"}, id="asset-1", item_id="item-1"
+    )
+
+    assert db_asset.meta.id == "asset-1"
+    assert db_asset.asset_id == "asset-1"
+    assert db_asset.item_id == "item-1"
+
+
+def stored_asset() -> ElasticsearchAsset:
+    return ElasticsearchAsset(
+        meta={"id": "asset-1"},
+        id="asset-1",
+        item_id="item-1",
+        collection_id="faam",
+        location="/badc/faam/data.nc",
+        roles=["data"],
+        bbox=[0, 0, 10, 10],
+        bbox_minlon=0,
+        bbox_minlat=0,
+        bbox_maxlon=10,
+        bbox_maxlat=10,
+        size=100,
+        status="new",
+    )
+
+
+def test_asset_db_to_input():
+    """Stored assets are read back in the form clients send"""
+    stac_data = AssetSerializer.db_to_input(stored_asset())
+
+    assert stac_data["uri"] == "/badc/faam/data.nc"
+    assert stac_data["categories"] == ["data"]
+    assert stac_data["item"] == "item-1"
+    assert "location" not in stac_data
+    assert "bbox_minlon" not in stac_data
+
+
+def test_asset_patch():
+    """Asset patches update the stored fields, not keys named like the input"""
+    doc = AssetSerializer.patch(
+        stored_asset(),
+        {"uri": "/badc/faam/new.nc", "categories": ["metadata"], "bbox": [20, 0, 30, 10], "size": None},
+        item_id="item-1",
+        collection_id="faam",
+    )
+
+    assert doc["location"] == "/badc/faam/new.nc"
+    assert doc["roles"] == ["metadata"]
+    assert doc["bbox"] == [20, 0, 30, 10]
+    assert doc["bbox_minlon"] == 20
+    assert doc["bbox_maxlon"] == 30
+    assert "size" not in doc
+    assert not {"uri", "categories"} & set(doc)
+
+    # Fields clients don't send are kept
+    assert doc["status"] == "new"
+    assert doc["item_id"] == "item-1"
+    assert doc["asset_id"] == "asset-1"
@@ -0,0 +1,26 @@
+# encoding: utf-8
+"""
+
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+import contextvars
+
+from stac_fastapi.elasticsearch.session import submit
+
+request_id = contextvars.ContextVar("request_id", default=None)
+
+
+def test_submit_copies_context():
+    """Jobs on the shared pool see the context of the request submitting them"""
+    token = request_id.set("abc")
+    try:
+        assert submit(request_id.get).result() == "abc"
+    finally:
+        request_id.reset(token)
+
+    assert submit(request_id.get).result() is None
@@ -0,0 +1,105 @@
+# encoding: utf-8
+"""
+
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+from elasticsearch_dsl import Search
+from elasticsearch_dsl.response import Response
+
+from stac_fastapi.elasticsearch import statistics
+from stac_fastapi.elasticsearch.statistics import item_delta, merge_bbox
+
+
+def test_item_delta_sums_stored_asset_sizes():
+    """Asset sizes come from the asset documents, not the STAC assets"""
+    item = {
+        "properties": {"datetime": "2020-01-01T00:00:00Z"},
+        "bbox": [-10, -5, 0, 10, 5, 100],
+        "assets": {"data": {"href": "https://example.com/data.nc"}},
+    }
+
+    delta = item_delta(item, assets=[{"size": 100}, {"size": None}, {}])
+
+    assert delta["item_count"] == 1
+    assert delta["asset_count"] == 3
+    assert delta["asset_size"] == 100
+    assert delta["start_datetime"] == delta["end_datetime"] == "2020-01-01T00:00:00Z"
+    assert delta["bbox"] == [-10, -5, 10, 5]
+
+
+def test_item_delta_removal():
+    """Removals subtract the stored sizes and leave the extent alone"""
+    item = {"properties": {"datetime": "2020-01-01T00:00:00Z"}, "bbox": [0, 0, 1, 1]}
+
+    delta = item_delta(item, sign=-1, assets=[{"size": 100}, {"size": 20}])
+
+    assert delta["item_count"] == -1
+    assert delta["asset_count"] == -2
+    assert delta["asset_size"] == -120
+    assert delta["start_datetime"] is None
+    assert delta["bbox"] is None
+
+
+def test_merge_bbox():
+    assert merge_bbox(None, [0, 0, 1, 1]) == [0, 0, 1, 1]
+    assert merge_bbox([0, 0, 1, 1], [-10, -5, 0.5, 0.5]) == [-10, -5, 1, 1]
+
+
+def test_merge_bbox_across_antimeridian():
+    """Boxes crossing the antimeridian merge into boxes which still cross it"""
+    assert merge_bbox([170, -10, -170, 10], [160, 0, 175, 20]) == [160, -10, -170, 20]
+    assert merge_bbox([170, -10, -170, 10], [-175, 0, -160, 5]) == [170, -10, -160, 10]
+
+    # Boxes either side of it join over it rather than round the world
+    assert merge_bbox([170, 0, 180, 1], [-180, 0, -170, 1]) == [170, 0, -170, 1]
+
+    assert merge_bbox([10, 0, -10, 1], [-20, 0, 20, 1]) == [-180, 0, 180, 1]
+    assert merge_bbox([-180, -90, 180, 90], [170, 0, -170, 1]) == [-180, -90, 180, 90]
+
+
+def extent_bucket(doc_count, minlon=None, minlat=None, maxlon=None, maxlat=None):
+    return {
+        "doc_count": doc_count,
+        "bbox_minlon": {"value": minlon},
+        "bbox_minlat": {"value": minlat},
+        "bbox_maxlon": {"value": maxlon},
+        "bbox_maxlat": {"value": maxlat},
+    }
+
+
+def test_compute_extent_across_antimeridian(monkeypatch):
+    """Unwrapped boxes crossing the antimeridian are wrapped back"""
+
+    def multi_search(searches, using=None):
+        aggregations = {
+            name: {"value": None, "value_as_string": None}
+            for name in ("min_datetime", "min_start", "max_datetime", "max_end")
+        }
+        aggregations["bbox"] = extent_bucket(2, 160, -10, 175, 10)
+        aggregations["crossing"] = extent_bucket(1, 170, -20, 190, 0)
+
+        return {
+            "items": Response(
+                Search(),
+                {
+                    "hits": {"total": {"value": 3}, "hits": []},
+                    "aggregations": aggregations,
+                },
+            ),
+            "assets": Response(
+                Search(),
+                {
+                    "hits": {"total": {"value": 0}, "hits": []},
+                    "aggregations": {"size": {"value": 0}},
+                },
+            ),
+        }
+
+    monkeypatch.setattr(statistics, "multi_search", multi_search)
+
+    assert statistics.compute("faam")["bbox"] == [160, -20, -170, 10]
@@ -0,0 +1,187 @@
+# encoding: utf-8
+"""
+
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+from types import SimpleNamespace
+
+import pytest
+from elasticsearch import ConflictError as ElasticsearchConflictError
+from fastapi import HTTPException
+from stac_fastapi.types.errors import ConflictError
+
+from stac_fastapi.elasticsearch import conditional, transactions
+from stac_fastapi.elasticsearch.models.database import (
+    ElasticsearchAsset,
+    ElasticsearchItem,
+)
+from stac_fastapi.elasticsearch.transactions import TransactionsClient
+
+
+def stored_asset(asset_id: str, **source) -> ElasticsearchAsset:
+    return ElasticsearchAsset(
+        meta={"id": asset_id, "index": "stac-assets", "seq_no": 7, "primary_term": 1},
+        **source,
+    )
+
+
+def stored_item() -> ElasticsearchItem:
+    item = ElasticsearchItem(
+        meta={"id": "item-1", "index": "stac-items", "seq_no": 3, "primary_term": 1},
+        collection_id="faam",
+        properties={},
+    )
+    item.prefetched_assets = []
+    return item
+
+
+def new_item() -> dict:
+    return {"type": "Feature", "id": "item-1", "collection": "faam", "properties": {}}
+
+
+def zero_delta() -> dict:
+    return {"asset_count": 0, "asset_size": 0}
+
+
+@pytest.fixture
+def es(monkeypatch):
+    """Records the bulk requests, which fail for the asset ids in ``failing``"""
+    es = SimpleNamespace(bulks=[], failing=set(), updates=[], conflict=False)
+
+    def bulk(client, actions, raise_on_error=True):
+        actions = list(actions)
+        es.bulks.append(actions)
+        errors = [
+            {action["_op_type"]: {"_id": action["_id"], "status": 409}}
+            for action in actions
+            if action["_id"] in es.failing
+        ]
+        return len(actions) - len(errors), errors
+
+    def update(self, **fields):
+        if es.conflict:
+            raise ElasticsearchConflictError(409, "version_conflict_engine_exception", {})
+        es.updates.append(fields)
+
+    monkeypatch.setattr(transactions, "bulk", bulk)
+    monkeypatch.setattr(transactions.connections, "get_connection", lambda: None)
+    monkeypatch.setattr(ElasticsearchItem, "update", update)
+    monkeypatch.setattr(
+        transactions.statistics, "apply_delta", lambda *args, **kwargs: None
+    )
+
+    return es
+
+
+def test_asset_actions():
+    """Only the changed assets are written, guarded by their sequence numbers"""
+    stored = {
+        "same": stored_asset("same", location="/same", size=1),
+        "changed": stored_asset("changed", location="/old", size=10),
+        "removed": stored_asset("removed", location="/removed", size=100),
+    }
+    changes = {
+        "same": {"location": "/same", "size": 1},
+        "changed": {"location": "/new", "size": 20},
+        "removed": None,
+        "added": {"location": "/added", "size": 1000},
+    }
+    delta = zero_delta()
+
+    actions = TransactionsClient.asset_actions(changes, stored, delta)
+    by_id = {action["_id"]: action for action in actions}
+
+    assert set(by_id) == {"changed", "removed", "added"}
+    assert by_id["changed"]["_op_type"] == "index"
+    assert by_id["changed"]["if_seq_no"] == 7
+    assert by_id["changed"]["_source"] == changes["changed"]
+    assert by_id["removed"]["_op_type"] == "delete"
+    assert by_id["removed"]["if_primary_term"] == 1
+    assert by_id["added"]["_op_type"] == "create"
+    assert "if_seq_no" not in by_id["added"]
+
+    assert delta == {"asset_count": 0, "asset_size": 1000 + 20 - 10 - 100}
+
+
+def test_write_item(es):
+    """Assets are written before the item"""
+    stored = {"a1": stored_asset("a1", location="/old")}
+
+    TransactionsClient().write_item(
+        stored_item(), new_item(), {"a1": {"location": "/new"}}, stored, "faam"
+    )
+
+    assert [[action["_id"] for action in actions] for actions in es.bulks] == [["a1"]]
+    assert len(es.updates) == 1
+
+
+def test_write_item_clears_derived_fields(es):
+    """Derived fields the new item has no value for are removed, not left stale"""
+    TransactionsClient().write_item(stored_item(), new_item(), {}, {}, "faam")
+
+    update = es.updates[0]
+    assert update["doc"]["item_id"] == "item-1"
+    assert "bbox" not in update["doc"]
+    assert {"bbox", "bbox_minlon", "centroid", "spatial"} <= set(update["stac_fields"])
+
+
+def test_write_item_asset_conflict(es):
+    """A conflicting asset leaves the item alone and restores the other assets"""
+    stored = {"a1": stored_asset("a1", location="/a1"), "a2": stored_asset("a2", location="/a2")}
+    es.failing = {"a2"}
+
+    with pytest.raises(ConflictError):
+        TransactionsClient().write_item(
+            stored_item(),
+            new_item(),
+            {"a1": {"location": "/new"}, "a2": {"location": "/new"}, "a3": {"location": "/a3"}},
+            stored,
+            "faam",
+        )
+
+    assert es.updates == []
+
+    restore = {action["_id"]: action for action in es.bulks[1]}
+    assert set(restore) == {"a1", "a3"}
+    assert restore["a1"]["_op_type"] == "index"
+    assert restore["a1"]["_source"] == {"location": "/a1"}
+    assert restore["a3"]["_op_type"] == "delete"
+
+
+def test_write_item_conflict(es):
+    """An item changed since it was read restores the assets written for it"""
+    stored = {"a1": stored_asset("a1", location="/a1")}
+    es.conflict = True
+
+    with pytest.raises(ConflictError):
+        TransactionsClient().write_item(
+            stored_item(), new_item(), {"a1": None}, stored, "faam"
+        )
+
+    assert [action["_op_type"] for action in es.bulks[0]] == ["delete"]
+    assert [action["_op_type"] for action in es.bulks[1]] == ["index"]
+
+
+def test_get_item_for_update_if_match(monkeypatch):
+    """Updates with a stale If-Match get a 412"""
+    monkeypatch.setattr(
+        ElasticsearchItem, "get", classmethod(lambda cls, id, **kwargs: stored_item())
+    )
+    etag = conditional.item_validators(stored_item()).etag
+
+    def request(if_match: str) -> SimpleNamespace:
+        return SimpleNamespace(headers={"if-match": if_match})
+
+    for if_match in (etag, "*", f'"other", {etag}'):
+        item = TransactionsClient.get_item_for_update("item-1", "faam", request(if_match))
+        assert item.meta.id == "item-1"
+
+    with pytest.raises(HTTPException) as exc_info:
+        TransactionsClient.get_item_for_update("item-1", "faam", request('W/"stale"'))
+
+    assert exc_info.value.status_code == 412
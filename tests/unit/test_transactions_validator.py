@@ -0,0 +1,164 @@
+# encoding: utf-8
+"""
+
+"""
+__author__ = "Richard Smith"
+__date__ = "19 Oct 2026"
+__copyright__ = "Copyright 2018 United Kingdom Research and Innovation"
+__license__ = "BSD - see LICENSE file in top-level package directory"
+__contact__ = "richard.d.smith@stfc.ac.uk"
+
+import io
+import json
+
+import pytest
+from fastapi import HTTPException
+
+from stac_fastapi.elasticsearch.config import settings
+from stac_fastapi.elasticsearch.models import transactions_validator
+from stac_fastapi.elasticsearch.models.transactions_validator import (
+    core_schema_url,
+    local_schema_path,
+    validation_errors,
+)
+
+EXTENSION_URL = "https://stac-extensions.github.io/test/v1.0.0/schema.json"
+
+FEATURE_URL = "https://geojson.org/schema/Feature.json"
+
+ITEM_SCHEMA = {
+    "type": "object",
+    "required": ["type", "id", "properties"],
+    "properties": {"type": {"const": "Feature"}, "id": {"type": "string"}},
+}
+
+EXTENSION_SCHEMA = {
+    "type": "object",
+    "properties": {
+        "properties": {
+            "type": "object",
+            "properties": {"test:level": {"type": "integer"}},
+        }
+    },
+}
+
+
+def mirror(root, url: str, schema: dict) -> None:
+    path = root.joinpath(*url.split("://", 1)[1].split("/"))
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(json.dumps(schema))
+
+
+@pytest.fixture
+def schema_dir(tmp_path, monkeypatch):
+    """A schema mirror holding the item schema and one extension schema"""
+    mirror(tmp_path, core_schema_url("item", "1.0.0"), ITEM_SCHEMA)
+    mirror(tmp_path, EXTENSION_URL, EXTENSION_SCHEMA)
+    monkeypatch.setattr(settings, "STAC_SCHEMA_DIR", str(tmp_path), raising=False)
+
+    fetched = []
+
+    def urlopen(url, timeout=None):
+        fetched.append(url)
+        raise OSError("connection refused")
+
+    monkeypatch.setattr(transactions_validator, "urlopen", urlopen)
+
+    for cached in (
+        transactions_validator.load_schema,
+        transactions_validator.compile_schema,
+        transactions_validator.schema_validators,
+    ):
+        cached.cache_clear()
+    transactions_validator.failed_schemas.clear()
+
+    return fetched
+
+
+def item(**properties) -> dict:
+    return {"type": "Feature", "id": "item-1", "properties": properties}
+
+
+def test_valid_item(schema_dir):
+    assert validation_errors(item(), "item") == []
+    assert schema_dir == []
+
+
+def test_invalid_item(schema_dir):
+    errors = validation_errors({"type": "Feature", "properties": {}}, "item")
+
+    assert len(errors) == 1
+    assert "id" in errors[0]
+
+
+def test_extension_schema(schema_dir):
+    """Items are validated against the schemas of their extensions"""
+    valid = {**item(**{"test:level": 2}), "stac_extensions": [EXTENSION_URL]}
+    invalid = {**item(**{"test:level": "high"}), "stac_extensions": [EXTENSION_URL]}
+
+    assert validation_errors(valid, "item") == []
+    assert len(validation_errors(invalid, "item")) == 1
+
+
+@pytest.mark.parametrize(
+    "url",
+    [
+        "file:///etc/passwd",
+        "http://stac-extensions.github.io/other/v1.0.0/schema.json",
+        "https://169.254.169.254/latest/meta-data",
+        "not a url",
+    ],
+)
+def test_extension_schema_not_allowed(schema_dir, url):
+    """Schemas off the allowed hosts are rejected without being fetched"""
+    errors = validation_errors({**item(), "stac_extensions": [url]}, "item")
+
+    assert len(errors) == 1
+    assert url in errors[0]
+    assert schema_dir == []
+
+
+def test_schema_fetch_failure(schema_dir):
+    """Schemas which can't be fetched are a server error, and not retried at once"""
+    url = "https://stac-extensions.github.io/missing/v1.0.0/schema.json"
+    document = {**item(), "stac_extensions": [url]}
+
+    for _ in range(2):
+        with pytest.raises(HTTPException) as exc_info:
+            validation_errors(document, "item")
+
+        assert exc_info.value.status_code == 503
+        assert "connection refused" not in exc_info.value.detail
+
+    assert schema_dir == [url]
+
+
+def test_local_schema_path_stays_in_mirror(schema_dir):
+    assert local_schema_path(EXTENSION_URL)
+    assert local_schema_path("https://stac-extensions.github.io/../../../etc/passwd") is None
+
+
+def test_core_schema_geojson_reference(schema_dir, tmp_path, monkeypatch):
+    """The GeoJSON schemas the core schemas reference are allowed by default"""
+    mirror(
+        tmp_path,
+        core_schema_url("item", "1.0.0"),
+        {"allOf": [{"$ref": FEATURE_URL}, ITEM_SCHEMA]},
+    )
+    feature_schema = {
+        "type": "object",
+        "required": ["type", "properties"],
+        "properties": {"type": {"const": "Feature"}},
+    }
+
+    fetched = []
+
+    def urlopen(url, timeout=None):
+        fetched.append(url)
+        return io.BytesIO(json.dumps(feature_schema).encode())
+
+    monkeypatch.setattr(transactions_validator, "urlopen", urlopen)
+
+    assert validation_errors(item(), "item") == []
+    assert len(validation_errors({**item(), "type": "Polygon"}, "item")) == 1
+    assert fetched == [FEATURE_URL]